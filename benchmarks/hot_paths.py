@@ -0,0 +1,280 @@
+"""
+Micro-benchmarks for SDK hot paths, compared against stored baselines.
+
+Covers SSE decoding, `StreamChunk.from_sse_data`, incremental JSON
+parsing of streamed deltas, the tensor conversions used by on-chain
+inference at several tensor sizes, LangChain message conversion in
+`OpenGradientChatModel._generate` (with the LLM call stubbed out), `Client`
+construction and ``import opengradient``.
+
+Every case reports the best time per operation over ``--repeat`` rounds;
+fast cases run enough operations per round to last at least 0.2 s. Results
+are compared with ``benchmarks/baselines.json`` and cases slower than the
+baseline by more than ``--threshold`` are flagged. Baselines are machine
+specific: record them with ``--save-baseline`` on the machine that runs the
+comparison.
+
+Usage:
+    python benchmarks/hot_paths.py                  # run all cases and compare
+    python benchmarks/hot_paths.py -k convert       # only cases whose name contains "convert"
+    python benchmarks/hot_paths.py --check          # exit with status 1 on a regression
+    python benchmarks/hot_paths.py --save-baseline  # record the current results
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from web3.datastructures import AttributeDict
+
+BASELINE_FILE = Path(__file__).with_name("baselines.json")
+TENSOR_SIZES = [16, 1024, 16384]
+TEST_PRIVATE_KEY = "0x" + "11" * 32
+
+# name -> (setup returning the function to time, operations per round or None to calibrate)
+CASES: Dict[str, Tuple[Callable[[], Callable[[], object]], Optional[int]]] = {}
+
+
+def case(name: str, number: Optional[int] = None):
+    def register(setup: Callable[[], Callable[[], object]]):
+        CASES[name] = (setup, number)
+        return setup
+
+    return register
+
+
+def _sse_body(events: int) -> bytes:
+    lines = []
+    for i in range(events):
+        payload = json.dumps({"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": f"token {i} "}}]})
+        lines.append(f"data: {payload}\n\n")
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+@case("sse_decode[1000 events/4KiB chunks]")
+def _sse_decode():
+    from opengradient._sse import SSEDecoder
+
+    body = _sse_body(1000)
+    chunks = [body[i : i + 4096] for i in range(0, len(body), 4096)]
+
+    def run():
+        decoder = SSEDecoder()
+        for chunk in chunks:
+            decoder.feed(chunk)
+        decoder.flush()
+
+    return run
+
+
+@case("stream_chunk_from_sse_data")
+def _from_sse_data():
+    from opengradient.types import StreamChunk
+
+    data = {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": "token "}, "finish_reason": None}]}
+    return lambda: StreamChunk.from_sse_data(data)
+
+
+@case("sse_event_to_stream_chunk")
+def _parse_sse_event():
+    from opengradient._sse import SSEEvent
+    from opengradient.client.llm import _parse_sse_event
+
+    event = SSEEvent(data=json.dumps({"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": "token "}}]}))
+    return lambda: _parse_sse_event(event)
+
+
+@case("incremental_json[64 KiB/8-char deltas]")
+def _incremental_json():
+    from opengradient.client.llm_json import IncrementalJSONParser
+
+    rows = [{"id": i, "name": f"row {i}", "score": i / 2, "tags": ["a", "b"]} for i in range(800)]
+    text = json.dumps({"rows": rows, "summary": "word " * 800})
+    deltas = [text[i : i + 8] for i in range(0, len(text), 8)]
+
+    def run():
+        parser = IncrementalJSONParser()
+        for delta in deltas:
+            parser.feed(delta)
+        parser.close()
+
+    return run
+
+
+def _tensor(size: int) -> np.ndarray:
+    return np.random.default_rng(0).random(size, dtype=np.float32).reshape(-1, 4) if size >= 4 else np.zeros(size)
+
+
+def _fixed_point_values(size: int) -> List[Tuple[int, int]]:
+    from opengradient.client._conversions import convert_to_fixed_point
+
+    return [convert_to_fixed_point(float(v)) for v in _tensor(size).flatten()]
+
+
+def _register_conversions(size: int) -> None:
+    @case(f"convert_to_model_input[{size}]")
+    def _to_input():
+        from opengradient.client._conversions import convert_to_model_input
+
+        inputs = {"x": _tensor(size), "labels": np.array(["a", "b", "c"])}
+        return lambda: convert_to_model_input(inputs)
+
+    @case(f"convert_to_model_output[{size}]")
+    def _to_output():
+        from opengradient.client._conversions import convert_to_model_output
+
+        values = [AttributeDict({"value": value, "decimals": decimals}) for value, decimals in _fixed_point_values(size)]
+        event = AttributeDict({"output": AttributeDict({"numbers": [AttributeDict({"name": "y", "shape": [size // 4, 4], "values": values})]})})
+        return lambda: convert_to_model_output(event)
+
+    @case(f"convert_array_to_model_output[{size}]")
+    def _array_to_output():
+        from opengradient.client._conversions import convert_array_to_model_output
+
+        array_data = [[("y", _fixed_point_values(size), [size // 4, 4])], [("labels", ["a", "b"], [2])], [("meta", '{"k": [1, 2]}')], False]
+        return lambda: convert_array_to_model_output(array_data)
+
+
+for _size in TENSOR_SIZES:
+    _register_conversions(_size)
+
+
+@case("langchain_generate[20 messages]")
+def _langchain_generate():
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+    from opengradient.agents import OpenGradientChatModel
+    from opengradient.types import TEE_LLM, TextGenerationOutput
+
+    class _StubLLM:
+        def chat(self, **kwargs):
+            return TextGenerationOutput(transaction_hash="external", finish_reason="stop", chat_output={"role": "assistant", "content": "ok"})
+
+    class _StubClient:
+        llm = _StubLLM()
+
+    model = OpenGradientChatModel(private_key=TEST_PRIVATE_KEY, model_cid=TEE_LLM.GPT_5)
+    model._client.close()
+    model._client = _StubClient()
+
+    messages = [SystemMessage(content="You are helpful.")]
+    for i in range(6):
+        messages.append(HumanMessage(content=[{"type": "text", "text": f"Question {i}"}]))
+        messages.append(AIMessage(content="", tool_calls=[{"id": f"call_{i}", "name": "lookup", "args": {"q": i}}]))
+        messages.append(ToolMessage(content=f"result {i}", tool_call_id=f"call_{i}"))
+    messages.append(HumanMessage(content="Summarize"))
+
+    return lambda: model._generate(messages)
+
+
+@case("client_construction", number=1)
+def _client_construction():
+    import opengradient as og
+
+    def run():
+        og.Client(private_key=TEST_PRIVATE_KEY).close()
+
+    return run
+
+
+@case("import_opengradient", number=1)
+def _import_time():
+    script = "import time; start = time.perf_counter(); import opengradient; print(time.perf_counter() - start)"
+
+    def run():
+        # A fresh interpreter each round, so nothing is already imported
+        output = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+        return float(output.strip().splitlines()[-1])
+
+    run.reports_own_time = True
+    return run
+
+
+def measure(setup: Callable[[], Callable[[], object]], number: Optional[int], repeat: int) -> float:
+    """Return the best seconds per operation over ``repeat`` rounds."""
+    fn = setup()
+    if getattr(fn, "reports_own_time", False):
+        return min(fn() for _ in range(repeat))
+    timer = timeit.Timer(fn)
+    if number is None:
+        number, _ = timer.autorange()
+        number = max(1, number)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def machine_info() -> Dict[str, str]:
+    return {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.machine()}
+
+
+def report(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Print the comparison table and return the names of regressed cases."""
+    regressions = []
+    width = max(len(name) for name in results)
+    print(f"\n{'case':<{width}} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<{width}} {'-':>12} {format_time(current):>12} {'new':>9}")
+            continue
+        ratio = current / previous
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<{width}} {format_time(previous):>12} {format_time(current):>12} {(ratio - 1) * 100:>+8.1f}%{flag}")
+    return regressions
+
+
+def main(pattern: Optional[str], repeat: int, threshold: float, save: bool, check: bool) -> int:
+    stored = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {"machine": {}, "results": {}}
+    if stored["results"] and stored["machine"] != machine_info():
+        print(f"Note: baselines were recorded on {stored['machine']}; comparisons across machines are approximate.")
+
+    results = {}
+    for name, (setup, number) in CASES.items():
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(setup, number, repeat)
+        print(f"{name}: {format_time(results[name])}", flush=True)
+
+    regressions = report(results, stored["results"], threshold)
+
+    if save:
+        stored = {"machine": machine_info(), "results": {**stored["results"], **results}}
+        BASELINE_FILE.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved baselines to {BASELINE_FILE}")
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than baseline by more than {threshold:.0%}: {', '.join(regressions)}")
+    return 1 if check and regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SDK hot paths against stored baselines")
+    parser.add_argument("-k", dest="pattern", default=None, help="Only run cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds per case; the best round is reported")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown reported as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baselines")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any case regressed")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    status = main(args.pattern, args.repeat, args.threshold, args.save_baseline, args.check)
+    print(f"\nFinished in {time.perf_counter() - started:.1f} s")
+    sys.exit(status)
@@ -0,0 +1,91 @@
+"""
+Micro-benchmark for the incremental SSE decoder used by LLM streaming.
+
+Feeds a synthetic chat-completions stream through `SSEDecoder` at several
+network chunk sizes and reports the cost per byte. The decoder should stay
+flat; the previous ``buffer += chunk`` / ``buffer.split(b"\\n", 1)`` loop is
+included for comparison and grows with the number of lines per chunk.
+
+Usage:
+    python benchmarks/sse_parser.py
+"""
+
+import argparse
+import json
+import time
+
+from opengradient._sse import SSEDecoder
+
+CHUNK_SIZES = [1024, 4096, 16384, 65536, 262144]
+
+
+def build_stream(total_bytes: int) -> bytes:
+    """Build an OpenAI-style SSE body of roughly ``total_bytes`` bytes."""
+    events = []
+    size = 0
+    i = 0
+    while size < total_bytes:
+        payload = json.dumps({"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": f"token {i} "}}]})
+        event = f"data: {payload}\n\n".encode()
+        events.append(event)
+        size += len(event)
+        i += 1
+    events.append(b"data: [DONE]\n\n")
+    return b"".join(events)
+
+
+def split_chunks(body: bytes, chunk_size: int):
+    return [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+
+def decode_incremental(chunks) -> int:
+    decoder = SSEDecoder()
+    count = 0
+    for chunk in chunks:
+        count += len(decoder.feed(chunk))
+    return count + len(decoder.flush())
+
+
+def decode_legacy(chunks) -> int:
+    """The parser previously used by `LLM._tee_llm_chat_stream_async`."""
+    count = 0
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        while b"\n" in buffer:
+            line_bytes, buffer = buffer.split(b"\n", 1)
+            if not line_bytes.strip():
+                continue
+            line = line_bytes.decode("utf-8").strip()
+            if line.startswith("data: "):
+                count += 1
+    return count
+
+
+def time_per_byte(fn, chunks, total_bytes: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best / total_bytes * 1e9
+
+
+def main(total_bytes: int, repeat: int):
+    body = build_stream(total_bytes)
+    print(f"SSE decode cost for a {len(body) / 1024:.0f} KiB stream (best of {repeat})\n")
+    print(f"{'chunk size':>12} {'incremental ns/B':>18} {'legacy ns/B':>14}")
+    for chunk_size in CHUNK_SIZES:
+        chunks = split_chunks(body, chunk_size)
+        incremental = time_per_byte(decode_incremental, chunks, len(body), repeat)
+        legacy = time_per_byte(decode_legacy, chunks, len(body), repeat)
+        print(f"{chunk_size:>12} {incremental:>18.2f} {legacy:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SSE decoding")
+    parser.add_argument("--bytes", type=int, default=4 * 1024 * 1024, help="Approximate stream size in bytes")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement")
+    args = parser.parse_args()
+
+    main(args.bytes, args.repeat)
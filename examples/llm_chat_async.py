@@ -0,0 +1,27 @@
+import asyncio
+import os
+
+import opengradient as og
+
+
+async def main():
+    async with og.Client(private_key=os.environ.get("OG_PRIVATE_KEY")) as client:
+        await client.llm_async.ensure_opg_approval(opg_amount=2)
+
+        questions = ["What is the capital of France?", "What is the capital of Japan?", "What is the capital of Peru?"]
+
+        results = await asyncio.gather(
+            *(
+                client.llm_async.chat(
+                    model=og.TEE_LLM.GEMINI_2_5_FLASH,
+                    messages=[{"role": "user", "content": question}],
+                    max_tokens=100,
+                )
+                for question in questions
+            )
+        )
+        for question, result in zip(questions, results):
+            print(f"{question} -> {result.chat_output['content']}")
+
+
+asyncio.run(main())
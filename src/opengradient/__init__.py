@@ -103,6 +103,7 @@ from .types import (
     ModelOutput,
     ModelRepository,
     SchedulerParams,
+    StreamAccumulator,
     TextGenerationOutput,
     TextGenerationStream,
     x402SettlementMode,
@@ -166,6 +167,7 @@ __all__ = [
     "CandleOrder",
     "TextGenerationOutput",
     "TextGenerationStream",
+    "StreamAccumulator",
     "x402SettlementMode",
     "agents",
     "alphasense",
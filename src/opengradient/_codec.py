@@ -0,0 +1,119 @@
+"""
+JSON codec for the SDK's request and response hot paths.
+
+Uses ``orjson`` or ``msgspec`` when one is installed (``pip install
+'opengradient[fast-json]'`` for orjson, ``'opengradient[msgspec]'`` for
+msgspec) and falls back to the standard library. Both fast backends decode
+straight from ``bytes``, so response bodies are parsed without first being
+decoded to ``str``. Set ``OPENGRADIENT_JSON_BACKEND`` to ``orjson``,
+``msgspec`` or ``json`` to pick a backend explicitly; an unknown or missing
+backend logs a warning and the standard library is used instead.
+"""
+
+import importlib.util
+import json
+import logging
+import os
+from typing import Any, Callable, Tuple, Type, Union
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+JSONInput = Union[str, bytes, bytearray, memoryview]
+
+logger = logging.getLogger(__name__)
+
+backend: str = "json"
+"""Name of the backend in use."""
+
+DecodeError: Tuple[Type[Exception], ...] = (ValueError,)
+"""Exceptions raised by `loads` on malformed input, for use in ``except`` clauses."""
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # Same output as httpx's ``json=`` encoding
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def _stdlib_loads(data: JSONInput) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+_loads: Callable[[JSONInput], Any] = _stdlib_loads
+_dumps: Callable[[Any], bytes] = _stdlib_dumps
+
+
+def use_backend(name: str) -> None:
+    """
+    Switch the JSON backend used by the SDK.
+
+    Args:
+        name: One of ``"orjson"``, ``"msgspec"`` or ``"json"``.
+
+    Raises:
+        ValueError: If ``name`` is not a known backend.
+        ImportError: If the backend's package is not installed.
+    """
+    global backend, DecodeError, _loads, _dumps
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    if name != "json" and importlib.util.find_spec(name) is None:
+        raise ImportError(f"The {name!r} JSON backend is not installed. Install it with: pip install {name}")
+
+    if name == "orjson":
+        import orjson
+
+        _loads, _dumps = orjson.loads, orjson.dumps
+        DecodeError = (orjson.JSONDecodeError,)
+    elif name == "msgspec":
+        import msgspec
+
+        encoder, decoder = msgspec.json.Encoder(), msgspec.json.Decoder()
+        _loads, _dumps = decoder.decode, encoder.encode
+        DecodeError = (msgspec.DecodeError, ValueError)
+    else:
+        _loads, _dumps = _stdlib_loads, _stdlib_dumps
+        DecodeError = (ValueError,)
+    backend = name
+
+
+def _available(name: str) -> bool:
+    return name == "json" or (name in BACKENDS and importlib.util.find_spec(name) is not None)
+
+
+def _default_backend() -> str:
+    requested = os.environ.get("OPENGRADIENT_JSON_BACKEND")
+    if requested:
+        if _available(requested):
+            return requested
+        # Runs on import, so a bad setting must not break ``import opengradient``
+        logger.warning("OPENGRADIENT_JSON_BACKEND=%r is not an installed JSON backend; using the standard library json module", requested)
+        return "json"
+    for name in BACKENDS[:-1]:
+        if importlib.util.find_spec(name) is not None:
+            return name
+    return "json"
+
+
+def loads(data: JSONInput) -> Any:
+    """Decode a JSON document from ``str`` or UTF-8 ``bytes``."""
+    return _loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode ``obj`` as compact UTF-8 JSON.
+
+    Falls back to the standard library for values the fast backend rejects
+    (e.g. integers wider than 64 bits), so the result never depends on
+    which backend is installed.
+    """
+    try:
+        return _dumps(obj)
+    except (TypeError, OverflowError):
+        return _stdlib_dumps(obj)
+
+
+use_backend(_default_backend())
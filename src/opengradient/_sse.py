@@ -0,0 +1,165 @@
+"""Incremental Server-Sent Events decoder shared by the LLM streaming paths."""
+
+from dataclasses import dataclass
+from typing import AsyncGenerator, AsyncIterable, List, Optional
+
+
+@dataclass
+class SSEEvent:
+    """
+    A single dispatched Server-Sent Event.
+
+    Attributes:
+        data: Event payload. Multiple ``data:`` lines are joined with ``\\n``.
+        event: Event type, ``"message"`` unless an ``event:`` field was sent.
+        id: Last event ID seen on the stream, if any.
+        retry: Reconnection time in milliseconds, if the event carried a ``retry:`` field.
+    """
+
+    data: str
+    event: str = "message"
+    id: Optional[str] = None
+    retry: Optional[int] = None
+
+
+class SSEDecoder:
+    """
+    Incremental decoder for a ``text/event-stream`` body, following the
+    HTML Living Standard event-stream interpretation rules.
+
+    Bytes are appended to a single ``bytearray`` and only the unscanned tail
+    is searched for line terminators, so total work is linear in the size of
+    the stream regardless of how the network splits it. Handles ``\\r\\n``/``\\r``/``\\n``
+    line endings (including a CRLF split across chunks), multi-line ``data:``
+    fields, ``event:``/``id:``/``retry:`` fields and ``:`` comments.
+
+    Usage:
+        decoder = SSEDecoder()
+        async for raw in response.aiter_raw():
+            for event in decoder.feed(raw):
+                handle(event.data)
+        for event in decoder.flush():
+            handle(event.data)
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        # Bytes at the start of the buffer already known to contain no line terminator
+        self._scanned = 0
+        # A chunk ended with CR; a LF at the start of the next chunk belongs to it
+        self._skip_lf = False
+
+        self._data: List[str] = []
+        self._event_type = ""
+        self._last_event_id: Optional[str] = None
+        self._retry: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """Decode a chunk of raw bytes and return the events it completed."""
+        if not chunk:
+            return []
+
+        view = memoryview(chunk)
+        if self._skip_lf:
+            self._skip_lf = False
+            if view[0] == 0x0A:
+                view = view[1:]
+
+        buffer = self._buffer
+        buffer += view
+
+        # End of the last complete line; only the not-yet-scanned tail is searched
+        end = max(buffer.rfind(b"\n", self._scanned), buffer.rfind(b"\r", self._scanned)) + 1
+        if not end:
+            self._scanned = len(buffer)
+            return []
+
+        # Only a CR ending the buffer can pair with a LF still to arrive
+        if end == len(buffer) and buffer[end - 1] == 0x0D:
+            self._skip_lf = True
+
+        events: List[SSEEvent] = []
+        # bytes.splitlines() splits on exactly the SSE terminators: CRLF, CR and LF
+        for raw_line in buffer[:end].splitlines():
+            event = self.decode_line(raw_line.decode("utf-8", "replace"))
+            if event is not None:
+                events.append(event)
+
+        del buffer[:end]
+        self._scanned = len(buffer)
+        return events
+
+    def flush(self) -> List[SSEEvent]:
+        """
+        Signal the end of the stream and return any event still pending.
+
+        The specification discards an event that was not terminated by a
+        blank line; servers commonly omit the final blank line, so it is
+        dispatched here instead.
+        """
+        events: List[SSEEvent] = []
+        if self._buffer:
+            event = self.decode_line(self._buffer.decode("utf-8", "replace"))
+            if event is not None:
+                events.append(event)
+            self._buffer.clear()
+            self._scanned = 0
+        event = self.decode_line("")
+        if event is not None:
+            events.append(event)
+        return events
+
+    def decode_line(self, line: str) -> Optional[SSEEvent]:
+        """
+        Process one line (without its terminator).
+
+        Returns the dispatched event when ``line`` is the blank line closing
+        an event with data, otherwise None.
+        """
+        if not line:
+            return self._dispatch()
+
+        if line[0] == ":":
+            return None
+
+        name, sep, value = line.partition(":")
+        if sep and value[:1] == " ":
+            value = value[1:]
+
+        if name == "data":
+            self._data.append(value)
+        elif name == "event":
+            self._event_type = value
+        elif name == "id":
+            if "\0" not in value:
+                self._last_event_id = value
+        elif name == "retry":
+            if value.isdigit():
+                self._retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        if not self._data:
+            self._event_type = ""
+            return None
+
+        event = SSEEvent(
+            data="\n".join(self._data),
+            event=self._event_type or "message",
+            id=self._last_event_id,
+            retry=self._retry,
+        )
+        self._data = []
+        self._event_type = ""
+        self._retry = None
+        return event
+
+
+async def aiter_sse_events(byte_stream: AsyncIterable[bytes]) -> AsyncGenerator[SSEEvent, None]:
+    """Decode an async stream of raw bytes (e.g. ``response.aiter_raw()``) into SSE events."""
+    decoder = SSEDecoder()
+    async for chunk in byte_stream:
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
@@ -18,9 +18,11 @@ from .defaults import (
     DEFAULT_HUB_SIGNUP_URL,
     DEFAULT_INFERENCE_CONTRACT_ADDRESS,
     DEFAULT_OG_FAUCET_URL,
+    DEFAULT_OPENGRADIENT_LLM_SERVER_URL,
+    DEFAULT_OPENGRADIENT_LLM_STREAMING_SERVER_URL,
     DEFAULT_RPC_URL,
 )
-from .types import InferenceMode, x402SettlementMode
+from .types import InferenceMode, StreamAccumulator, x402SettlementMode
 
 OG_CONFIG_FILE = Path.home() / ".opengradient_config.json"
 
@@ -121,8 +123,14 @@ def initialize_config(ctx):
 
 
 @click.group()
+@click.option(
+    "--llm-server-url",
+    envvar="OPENGRADIENT_LLM_SERVER_URL",
+    default=None,
+    help="TEE LLM server to send LLM requests to (e.g. a local 'opengradient mock-server')",
+)
 @click.pass_context
-def cli(ctx):
+def cli(ctx, llm_server_url: Optional[str]):
     """
     CLI for OpenGradient SDK.
 
@@ -132,7 +140,7 @@ def cli(ctx):
     """
     ctx.obj = load_og_config()
 
-    no_client_commands = ["config", "create-account", "version"]
+    no_client_commands = ["config", "create-account", "version", "mock-server"]
 
     if ctx.invoked_subcommand in no_client_commands:
         return
@@ -147,6 +155,8 @@ def cli(ctx):
                 contract_address=DEFAULT_INFERENCE_CONTRACT_ADDRESS,
                 email=ctx.obj.get("email"),
                 password=ctx.obj.get("password"),
+                og_llm_server_url=llm_server_url or DEFAULT_OPENGRADIENT_LLM_SERVER_URL,
+                og_llm_streaming_server_url=llm_server_url or DEFAULT_OPENGRADIENT_LLM_STREAMING_SERVER_URL,
             )
         except Exception as e:
             click.echo(f"Failed to create OpenGradient client: {str(e)}")
@@ -378,6 +388,7 @@ def infer(ctx, model_cid: str, inference_mode: str, input_data, input_file: Path
     default="settle-batch",
     help="Settlement mode for x402 payments: settle (payment only), settle-batch (batched, default), settle-metadata (full data)",
 )
+@click.option("--stream", is_flag=True, default=False, help="Stream the output from the LLM")
 @click.pass_context
 def completion(
     ctx,
@@ -387,6 +398,7 @@ def completion(
     max_tokens: int,
     stop_sequence: List[str],
     temperature: float,
+    stream: bool,
 ):
     """
     Run completion inference on an LLM model via TEE.
@@ -398,6 +410,7 @@ def completion(
     \b
     opengradient completion --model anthropic/claude-haiku-4-5 --prompt "Hello, how are you?" --max-tokens 50
     opengradient completion --model openai/gpt-5 --prompt "Write a haiku" --max-tokens 100
+    opengradient completion --model openai/gpt-5 --prompt "Tell me a story" --max-tokens 500 --stream
     """
     client: Client = ctx.obj["client"]
 
@@ -411,9 +424,13 @@ def completion(
             stop_sequence=list(stop_sequence),
             temperature=temperature,
             x402_settlement_mode=x402SettlementModes[x402_settlement_mode],
+            stream=stream,
         )
 
-        print_llm_completion_result(model_cid, completion_output.transaction_hash, completion_output.completion_output, is_vanilla=False)
+        if stream:
+            print_streaming_completion_result(model_cid, completion_output)
+        else:
+            print_llm_completion_result(model_cid, completion_output.transaction_hash, completion_output.completion_output, is_vanilla=False)
 
     except Exception as e:
         click.echo(f"Error running LLM completion: {str(e)}")
@@ -442,6 +459,59 @@ def print_llm_completion_result(model_cid, tx_hash, llm_output, is_vanilla=True)
     click.echo()
 
 
+def print_streaming_completion_result(model_cid, stream):
+    """Handle streaming completion response - prints text as it arrives"""
+    click.secho("🌊 Streaming LLM Completion", fg="green", bold=True)
+    click.echo("──────────────────────────────────────")
+    click.echo("Model: ", nl=False)
+    click.secho(model_cid, fg="cyan", bold=True)
+    click.echo("Source: ", nl=False)
+    click.secho("OpenGradient TEE", fg="cyan", bold=True)
+
+    click.echo("──────────────────────────────────────")
+    click.secho("LLM Output:", fg="yellow", bold=True)
+    click.echo()
+
+    try:
+        accumulator = StreamAccumulator()
+
+        for chunk in stream:
+            accumulator.add(chunk)
+
+            if chunk.choices and chunk.choices[0].delta.content:
+                sys.stdout.write(chunk.choices[0].delta.content)
+                sys.stdout.flush()
+
+        sys.stdout.write("\n\n")
+        sys.stdout.flush()
+        click.echo("──────────────────────────────────────")
+
+        if accumulator.usage:
+            click.secho("Token Usage:", fg="cyan")
+            click.echo(f"  Prompt tokens: {accumulator.usage.prompt_tokens}")
+            click.echo(f"  Completion tokens: {accumulator.usage.completion_tokens}")
+            click.echo(f"  Total tokens: {accumulator.usage.total_tokens}")
+            click.echo()
+
+        if accumulator.finish_reason:
+            click.echo("Finish reason: ", nl=False)
+            click.secho(accumulator.finish_reason, fg="green")
+
+        click.echo(f"Chunks received: {accumulator.chunks}")
+        click.echo()
+
+    except KeyboardInterrupt:
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+        click.secho("Stream interrupted by user", fg="yellow")
+        click.echo()
+    except Exception as e:
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+        click.secho(f"Streaming error: {str(e)}", fg="red", bold=True)
+        click.echo()
+
+
 @cli.command()
 @click.option(
     "--model",
@@ -635,47 +705,45 @@ def print_streaming_chat_result(model_cid, stream, is_tee=True):
     click.echo()
 
     try:
-        content_parts = []
-        chunk_count = 0
+        accumulator = StreamAccumulator()
 
         for chunk in stream:
-            chunk_count += 1
+            accumulator.add(chunk)
 
-            if chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
-                sys.stdout.write(content)
+            if chunk.choices and chunk.choices[0].delta.content:
+                sys.stdout.write(chunk.choices[0].delta.content)
                 sys.stdout.flush()
-                content_parts.append(content)
-
-            # Handle tool calls
-            if chunk.choices[0].delta.tool_calls:
-                sys.stdout.write("\n")
-                sys.stdout.flush()
-                click.secho("Tool Calls:", fg="yellow", bold=True)
-                for tool_call in chunk.choices[0].delta.tool_calls:
-                    click.echo(f"  Function: {tool_call['function']['name']}")
-                    click.echo(f"  Arguments: {tool_call['function']['arguments']}")
 
             # Print final info when stream completes
             if chunk.is_final:
+                result = accumulator.result()
                 sys.stdout.write("\n\n")
                 sys.stdout.flush()
+
+                # Tool call arguments arrive in fragments; print them once merged
+                if result.chat_output.get("tool_calls"):
+                    click.secho("Tool Calls:", fg="yellow", bold=True)
+                    for tool_call in result.chat_output["tool_calls"]:
+                        click.echo(f"  Function: {tool_call['function']['name']}")
+                        click.echo(f"  Arguments: {tool_call['function']['arguments']}")
+                    click.echo()
+
                 click.echo("──────────────────────────────────────")
 
-                if chunk.usage:
+                if accumulator.usage:
                     click.secho("Token Usage:", fg="cyan")
-                    click.echo(f"  Prompt tokens: {chunk.usage.prompt_tokens}")
-                    click.echo(f"  Completion tokens: {chunk.usage.completion_tokens}")
-                    click.echo(f"  Total tokens: {chunk.usage.total_tokens}")
+                    click.echo(f"  Prompt tokens: {accumulator.usage.prompt_tokens}")
+                    click.echo(f"  Completion tokens: {accumulator.usage.completion_tokens}")
+                    click.echo(f"  Total tokens: {accumulator.usage.total_tokens}")
                     click.echo()
 
-                if chunk.choices[0].finish_reason:
+                if result.finish_reason:
                     click.echo("Finish reason: ", nl=False)
-                    click.secho(chunk.choices[0].finish_reason, fg="green")
+                    click.secho(result.finish_reason, fg="green")
 
                 click.echo("──────────────────────────────────────")
-                click.echo(f"Chunks received: {chunk_count}")
-                click.echo(f"Content length: {len(''.join(content_parts))} characters")
+                click.echo(f"Chunks received: {accumulator.chunks}")
+                click.echo(f"Content length: {len(result.chat_output['content'])} characters")
                 click.echo()
 
     except KeyboardInterrupt:
@@ -733,6 +801,70 @@ def create_account_impl() -> EthAccount:
     return eth_account
 
 
+@cli.command()
+@click.option("--host", default="127.0.0.1", help="Interface to listen on")
+@click.option("--port", type=int, default=8402, help="Port to listen on")
+@click.option("--latency", type=float, default=0.0, help="Seconds before each response or stream starts")
+@click.option("--ttft", type=float, default=0.0, help="Additional seconds before the first streamed token")
+@click.option("--tokens-per-second", type=float, default=None, help="Streaming token rate (unlimited by default)")
+@click.option("--completion-tokens", type=int, default=16, help="Tokens generated per request, capped by max_tokens")
+@click.option("--error-rate", type=float, default=0.0, help="Fraction of requests failed on purpose (0.0 to 1.0)")
+@click.option("--error-status", type=int, default=500, help="HTTP status of injected errors")
+@click.option("--price", default="1000", help="x402 price per request in the token's smallest unit")
+@click.option("--no-payment", is_flag=True, default=False, help="Serve requests without the x402 402-challenge flow")
+@click.option("--sign", is_flag=True, default=False, help="Sign outputs with a generated TEE key and print its public key")
+@click.option("--seed", type=int, default=None, help="Seed for error injection")
+def mock_server(
+    host: str,
+    port: int,
+    latency: float,
+    ttft: float,
+    tokens_per_second: Optional[float],
+    completion_tokens: int,
+    error_rate: float,
+    error_status: int,
+    price: str,
+    no_payment: bool,
+    sign: bool,
+    seed: Optional[int],
+):
+    """
+    Run a local stand-in TEE LLM server for offline testing and benchmarking.
+
+    Payments are checked for shape only and never settled, so no OPG is spent.
+
+    Example usage:
+
+    \b
+    opengradient mock-server --ttft 0.3 --tokens-per-second 40
+    opengradient --llm-server-url http://127.0.0.1:8402 completion --model openai/gpt-5 --prompt "Hi" --stream
+    """
+    from .mock_server import MockServerConfig, MockTEEServer
+
+    config = MockServerConfig(
+        latency=latency,
+        ttft=ttft,
+        tokens_per_second=tokens_per_second,
+        completion_tokens=completion_tokens,
+        error_rate=error_rate,
+        error_status=error_status,
+        price=None if no_payment else price,
+        sign=sign,
+        seed=seed,
+    )
+    server = MockTEEServer(config, host=host, port=port)
+    click.secho(f"Mock TEE LLM server listening on {server.url}", fg="green", bold=True)
+    if sign:
+        click.echo("TEE public key:\n" + server.public_key_pem)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        click.echo(f"\n{server.stats}")
+
+
 @cli.command()
 @click.option("--repo", "-r", "repo_name", required=True, help="Name of the model repository")
 @click.option("--version", "-v", required=True, help='Version of the model (e.g., "0.01")')
@@ -0,0 +1,99 @@
+"""Per-request latency measurement for the LLM client."""
+
+import bisect
+import time
+from typing import Dict, Optional
+
+from x402v2.http import PAYMENT_SIGNATURE_HEADER, X_PAYMENT_HEADER
+
+from ..types import INTER_CHUNK_GAP_BUCKETS, RequestTiming, StreamChunk
+
+_PAYMENT_HEADERS = (PAYMENT_SIGNATURE_HEADER.lower().encode(), X_PAYMENT_HEADER.lower().encode())
+
+
+class RequestTimer:
+    """
+    Collects a `RequestTiming` for one LLM request.
+
+    Connection and payment timings come from httpcore's ``trace`` request
+    extension: pass ``{"trace": timer.trace}`` in the request extensions. The
+    x402 transport copies extensions onto the paid retry, so both legs of a
+    payment challenge are observed. Streams report chunks via `chunk`.
+    """
+
+    def __init__(self, model: str, streaming: bool):
+        self.timing = RequestTiming(model=model, streaming=streaming)
+        self._start = time.monotonic()
+        self._phase_started: Dict[str, float] = {}
+        self._last_unpaid_send: Optional[float] = None
+        self._headers_received: Optional[float] = None
+        self._last_chunk: Optional[float] = None
+        self._finished = False
+
+    async def trace(self, event_name: str, info: Dict) -> None:
+        now = time.monotonic()
+        phase, _, stage = event_name.rpartition(".")
+
+        if phase in ("connection.connect_tcp", "connection.start_tls", "connection.connect_unix_socket"):
+            if stage == "started":
+                self._phase_started[phase] = now
+            elif stage == "complete" and phase in self._phase_started:
+                self.timing.connect_time += now - self._phase_started.pop(phase)
+
+        elif phase.endswith(".send_request_headers") and stage == "started":
+            request = info.get("request")
+            headers = getattr(request, "headers", [])
+            if any(name.lower() in _PAYMENT_HEADERS for name, _ in headers):
+                if self._last_unpaid_send is not None:
+                    self.timing.payment_time += now - self._last_unpaid_send
+                    self._last_unpaid_send = None
+            else:
+                self._last_unpaid_send = now
+
+        elif phase.endswith(".receive_response_headers") and stage == "complete":
+            self._headers_received = now
+
+    def chunk(self, chunk: StreamChunk) -> None:
+        """Record the arrival of a stream chunk."""
+        now = time.monotonic()
+        timing = self.timing
+        timing.chunks += 1
+
+        if self._last_chunk is not None:
+            gap = now - self._last_chunk
+            timing.inter_chunk_gaps[bisect.bisect_left(INTER_CHUNK_GAP_BUCKETS, gap)] += 1
+            timing.max_inter_chunk_gap = max(timing.max_inter_chunk_gap, gap)
+        self._last_chunk = now
+
+        if timing.time_to_first_token is None and any(c.delta.content or c.delta.tool_calls for c in chunk.choices):
+            timing.time_to_first_token = now - self._start
+
+    @property
+    def finished(self) -> bool:
+        """Whether `finish` has been called."""
+        return self._finished
+
+    def finish(self, completion_tokens: Optional[int] = None) -> RequestTiming:
+        """
+        Stamp the total duration and throughput and return the timing.
+
+        Only the first call stamps the duration. Later calls (e.g. for a
+        usage chunk following the finish chunk) return the same
+        `RequestTiming` and only record ``completion_tokens``.
+        """
+        timing = self.timing
+        if not self._finished:
+            self._finished = True
+            timing.total_duration = time.monotonic() - self._start
+            if not timing.streaming and self._headers_received is not None:
+                timing.time_to_first_token = self._headers_received - self._start
+
+        if completion_tokens is not None:
+            timing.completion_tokens = completion_tokens
+        if timing.completion_tokens:
+            generation_time = timing.total_duration
+            if timing.streaming and timing.time_to_first_token is not None:
+                generation_time -= timing.time_to_first_token
+            if generation_time > 0:
+                timing.tokens_per_second = timing.completion_tokens / generation_time
+        return timing
@@ -0,0 +1,174 @@
+"""Trust-on-first-use TLS certificate pinning for TEE servers."""
+
+import json
+import os
+import socket
+import ssl
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+DEFAULT_PIN_CACHE_PATH = Path.home() / ".cache" / "opengradient" / "tls_pins.json"
+CERT_FETCH_TIMEOUT = 10
+
+
+def _fetch_server_pem(hostname: str, port: int) -> Optional[str]:
+    """Connect without verification and return the server's certificate as PEM, or None if unreachable."""
+    fetch_ctx = ssl.create_default_context()
+    fetch_ctx.check_hostname = False
+    fetch_ctx.verify_mode = ssl.CERT_NONE
+
+    try:
+        with socket.create_connection((hostname, port), timeout=CERT_FETCH_TIMEOUT) as sock:
+            with fetch_ctx.wrap_socket(sock, server_hostname=hostname) as ssock:
+                der_cert = ssock.getpeercert(binary_form=True)
+                return ssl.DER_cert_to_PEM_cert(der_cert)
+    except Exception:
+        return None
+
+
+def _ssl_context_from_pem(pem_cert: str) -> ssl.SSLContext:
+    """
+    Build an SSLContext that trusts ONLY ``pem_cert``.
+
+    Hostname verification is disabled because the TEE server's cert
+    is typically issued for a hostname but we may connect via IP address.
+    The pinned certificate itself provides the trust anchor.
+    """
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.load_verify_locations(cadata=pem_cert)
+    ctx.check_hostname = False  # Cert is for a hostname, but we connect via IP
+    ctx.verify_mode = ssl.CERT_REQUIRED  # Still verify the cert itself
+    return ctx
+
+
+def is_certificate_error(error: BaseException) -> bool:
+    """Return True if ``error`` (or anything in its cause chain) is a TLS certificate verification failure."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, ssl.SSLCertVerificationError):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class TLSPinStore:
+    """
+    Cache of pinned TEE server certificates keyed by ``host:port``.
+
+    Certificates are fetched trust-on-first-use and kept both in memory (as
+    ready-to-use ``ssl.SSLContext`` objects) and in a small JSON file, so
+    neither later clients in the same process nor later processes need to
+    probe the server again. Call `refresh` when a handshake against the pinned
+    certificate fails (e.g. after the enclave rotated its key).
+
+    The store is thread-safe; concurrent lookups of the same server are
+    coalesced into a single probe.
+    """
+
+    def __init__(self, disk_path: Optional[Union[str, Path]] = DEFAULT_PIN_CACHE_PATH):
+        self._disk_path = Path(disk_path).expanduser() if disk_path is not None else None
+        self._pems: Optional[Dict[str, str]] = None
+        self._contexts: Dict[str, ssl.SSLContext] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def ssl_context(self, server_url: str) -> Union[ssl.SSLContext, bool]:
+        """
+        Return the ``verify`` setting to use for ``server_url``.
+
+        An ``ssl.SSLContext`` trusting only the pinned certificate for HTTPS
+        servers, or ``True`` (default verification) for non-HTTPS or
+        unreachable servers. Blocks on a network probe on the first lookup of
+        a server that has no stored pin.
+        """
+        key = self._key(server_url)
+        if key is None:
+            return True
+
+        with self._key_lock(key):
+            ctx = self._contexts.get(key)
+            if ctx is not None:
+                return ctx
+
+            pem = self._load_pems().get(key)
+            if pem is None:
+                pem = _fetch_server_pem(*self._host_port(server_url))
+                if pem is None:
+                    return True
+                self._store_pem(key, pem)
+
+            ctx = _ssl_context_from_pem(pem)
+            self._contexts[key] = ctx
+            return ctx
+
+    def refresh(self, server_url: str) -> Union[ssl.SSLContext, bool]:
+        """Drop the stored pin for ``server_url`` and probe the server again."""
+        key = self._key(server_url)
+        if key is None:
+            return True
+
+        with self._key_lock(key):
+            self._contexts.pop(key, None)
+            with self._lock:
+                pems = self._load_pems_locked()
+                if pems.pop(key, None) is not None:
+                    self._save_pems_locked(pems)
+        return self.ssl_context(server_url)
+
+    @staticmethod
+    def _host_port(server_url: str) -> Tuple[str, int]:
+        parsed = urlparse(server_url)
+        return parsed.hostname, parsed.port or 443
+
+    def _key(self, server_url: str) -> Optional[str]:
+        if urlparse(server_url).scheme != "https":
+            return None
+        hostname, port = self._host_port(server_url)
+        return f"{hostname}:{port}"
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _load_pems(self) -> Dict[str, str]:
+        with self._lock:
+            return self._load_pems_locked()
+
+    def _load_pems_locked(self) -> Dict[str, str]:
+        if self._pems is None:
+            self._pems = {}
+            if self._disk_path is not None:
+                try:
+                    with open(self._disk_path, "r") as f:
+                        self._pems = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._pems
+
+    def _store_pem(self, key: str, pem: str) -> None:
+        with self._lock:
+            pems = self._load_pems_locked()
+            pems[key] = pem
+            self._save_pems_locked(pems)
+
+    def _save_pems_locked(self, pems: Dict[str, str]) -> None:
+        if self._disk_path is None:
+            return
+        try:
+            self._disk_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent processes never read a partial file
+            fd, tmp_path = tempfile.mkstemp(prefix=".tls_pins_", dir=self._disk_path.parent)
+            with os.fdopen(fd, "w") as f:
+                json.dump(pems, f)
+            os.replace(tmp_path, self._disk_path)
+        except OSError:
+            # The disk tier is an optimisation only
+            pass
+
+
+default_pin_store = TLSPinStore()
+"""Process-wide pin store used by LLM clients unless another is supplied."""
@@ -1,7 +1,8 @@
+import asyncio
 import json
 import time
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, Iterable
 
 from .exceptions import OpenGradientError
 
@@ -63,3 +64,28 @@ def run_with_retry(
                 continue
 
             raise
+
+
+def close_stream(stream: Any) -> None:
+    """Close ``stream`` if it can be closed, releasing the HTTP stream under it as soon as the caller stops."""
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
+
+
+async def aclose_stream(stream: Any, ignore_errors: bool = False) -> None:
+    """Async version of `close_stream`. With ``ignore_errors``, a failure to close is swallowed, e.g. during teardown."""
+    aclose = getattr(stream, "aclose", None)
+    if aclose is None:
+        return
+    try:
+        await aclose()
+    except Exception:
+        if not ignore_errors:
+            raise
+
+
+def cancel_losers(tasks: Iterable["asyncio.Future"]) -> None:
+    """Cancel the requests that lost a race. A cancelled request may still be charged if its payment was already sent."""
+    for task in tasks:
+        task.cancel()
@@ -0,0 +1,345 @@
+"""x402 transport that attaches payments pre-emptively from cached payment requirements."""
+
+import asyncio
+import dataclasses
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Hashable, Optional, Tuple
+
+import httpx
+from x402v2.http.clients import x402AsyncTransport
+from x402v2.http.clients.httpx import PaymentError
+
+from .. import _codec
+from ..types import PaymentStats, PresignStats
+from .exceptions import OpenGradientError
+
+# Payment requirements older than this are re-learned through a 402 challenge
+DEFAULT_REQUIREMENTS_TTL = 300.0
+# Pre-signed payments older than this are discarded instead of handed out
+DEFAULT_PRESIGN_MAX_AGE = 120.0
+# Number of distinct payment requirements the pre-signing pool keeps buffers for
+PRESIGN_MAX_REQUIREMENTS = 16
+
+# Private members of x402AsyncTransport that PrepaidX402Transport relies on. x402v2
+# offers no public hook for attaching a payment up front, so the dependency is pinned
+# to an exact version and these are checked when the transport is created.
+_BASE_TRANSPORT_MEMBERS = ("RETRY_KEY", "SESSION_HEADER", "_get_session", "_store_session", "_client", "_http_client", "_transport")
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentRequirementsCache:
+    """
+    Last payment requirements seen per endpoint and request shape, shared by
+    all transports of an LLM client.
+
+    Entries are keyed by method, URL, model, ``max_tokens`` and settlement
+    mode, since the price of a request may depend on any of them. Callers
+    that build the request body pass its model and ``max_tokens`` in the
+    ``EXTENSION`` request extension (see `request_shape`), so the body does
+    not have to be parsed again; other requests fall back to parsing it.
+    """
+
+    EXTENSION = "opengradient.request_shape"
+
+    def __init__(self, ttl: float = DEFAULT_REQUIREMENTS_TTL):
+        self._ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = PaymentStats()
+
+    @staticmethod
+    def request_shape(payload: Dict) -> Tuple[Any, Any]:
+        """Return the fields of a request body that its price may depend on."""
+        return payload.get("model"), payload.get("max_tokens")
+
+    @staticmethod
+    def key(request: httpx.Request) -> Hashable:
+        shape = request.extensions.get(PaymentRequirementsCache.EXTENSION)
+        if shape is None:
+            try:
+                body = _codec.loads(request.content)
+            except (*_codec.DecodeError, httpx.RequestNotRead):
+                body = None
+            shape = PaymentRequirementsCache.request_shape(body if isinstance(body, dict) else {})
+        return (request.method, str(request.url.copy_with(query=None)), *shape, request.headers.get("X-SETTLEMENT-TYPE"))
+
+    def count(self, counter: str) -> None:
+        """Increment the ``stats`` counter named ``counter``."""
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def stats_snapshot(self) -> PaymentStats:
+        """Return a consistent copy of ``stats``."""
+        with self._lock:
+            return dataclasses.replace(self.stats)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored, payment_required = entry
+            if time.monotonic() - stored > self._ttl:
+                del self._entries[key]
+                return None
+            return payment_required
+
+    def put(self, key: Hashable, payment_required: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), payment_required)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class _PresignBuffer:
+    """Ready payloads for one set of payment requirements and the number of signatures in progress."""
+
+    __slots__ = ("payment_required", "ready", "pending")
+
+    def __init__(self, payment_required: Any):
+        self.payment_required = payment_required
+        self.ready: Deque[Tuple[float, Any]] = deque()
+        self.pending = 0
+
+
+class PresigningPool:
+    """
+    Signs x402 payment payloads ahead of time in worker threads.
+
+    Each payment payload is an EIP-712 authorization with a fresh nonce, so it
+    can only be used once, but it does not depend on the request it pays for.
+    For every payment requirements the pool has been asked about, it keeps up
+    to ``buffer_size`` signed payloads ready and tops the buffer up in the
+    background after each `take`. A miss (e.g. the first request after a 402
+    challenge) is signed on a worker thread as well, so signing never blocks
+    the event loop.
+
+    Payloads are only valid for a limited window after signing, so buffered
+    ones older than ``max_age`` (or half the requirement's
+    ``max_timeout_seconds``, whichever is shorter) are thrown away.
+
+    Args:
+        client: The ``x402Client`` used to sign payloads.
+        buffer_size: Ready payloads to keep per payment requirements.
+        workers: Number of signing threads.
+        max_age: Maximum age in seconds of a payload that is handed out.
+    """
+
+    def __init__(self, client, buffer_size: int, workers: int = 2, max_age: float = DEFAULT_PRESIGN_MAX_AGE):
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self._client = client
+        self._buffer_size = buffer_size
+        self._max_age = max_age
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="og-x402-presign")
+        # Least recently used requirements first
+        self._buffers: "OrderedDict[str, _PresignBuffer]" = OrderedDict()
+        # Reentrant because a future that is already done runs its callback inside add_done_callback
+        self._lock = threading.RLock()
+        self._closed = False
+        self.stats = PresignStats()
+
+    @staticmethod
+    def _key(payment_required: Any) -> str:
+        dump = getattr(payment_required, "model_dump_json", None)
+        return dump() if dump is not None else repr(payment_required)
+
+    def _sign(self, payment_required: Any) -> Any:
+        # Runs on a worker thread; the x402 client's hooks may be coroutines, so drive it on a private loop
+        start = time.monotonic()
+        payload = asyncio.run(self._client.create_payment_payload(payment_required))
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self.stats.signed += 1
+            self.stats.signing_time += elapsed
+        return payload
+
+    def _payload_max_age(self, payload: Any) -> float:
+        timeout = getattr(getattr(payload, "accepted", None), "max_timeout_seconds", None)
+        return min(self._max_age, timeout / 2) if timeout else self._max_age
+
+    def _pop_fresh(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            return None
+        while buffer.ready:
+            signed_at, payload = buffer.ready.popleft()
+            if now - signed_at <= self._payload_max_age(payload):
+                return payload
+            self.stats.expired += 1
+        return None
+
+    def _refill(self, key: str, payment_required: Any) -> None:
+        # Called with the lock held
+        if self._closed:
+            return
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = _PresignBuffer(payment_required)
+            while len(self._buffers) > PRESIGN_MAX_REQUIREMENTS:
+                self._buffers.popitem(last=False)
+        self._buffers.move_to_end(key)
+
+        missing = self._buffer_size - len(buffer.ready) - buffer.pending
+        for _ in range(max(missing, 0)):
+            buffer.pending += 1
+            future = self._executor.submit(self._sign, payment_required)
+            future.add_done_callback(lambda f, buffer=buffer: self._on_signed(buffer, f))
+
+    def _on_signed(self, buffer: _PresignBuffer, future: "Future[Any]") -> None:
+        with self._lock:
+            buffer.pending -= 1
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                logger.warning("Pre-signing x402 payment failed: %s", error)
+                return
+            # Evicted buffers are no longer reachable, so appending to them is harmless
+            buffer.ready.append((time.monotonic(), future.result()))
+
+    async def take(self, payment_required: Any) -> Any:
+        """
+        Return a signed payment payload for ``payment_required``, from the
+        ready buffer if possible, and schedule the buffer to be topped up.
+
+        Raises:
+            Exception: Whatever the x402 client raised while signing on a miss.
+        """
+        key = self._key(payment_required)
+        with self._lock:
+            payload = self._pop_fresh(key)
+            if payload is not None:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            self._refill(key, payment_required)
+
+        if payload is not None:
+            return payload
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._sign, payment_required)
+
+    def close(self) -> None:
+        """Drop buffered payloads and stop the signing threads. Pending signatures are cancelled."""
+        with self._lock:
+            self._closed = True
+            self._buffers.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PrepaidX402Transport(x402AsyncTransport):
+    """
+    ``x402AsyncTransport`` that skips the 402 challenge round trip when it
+    already knows what an endpoint charges.
+
+    The first request to an endpoint goes through the normal challenge: it is
+    sent unpaid, the server answers 402 with its payment requirements, and the
+    request is re-sent with a signed payment. The requirements are remembered,
+    and later requests with the same key are signed and sent paid straight
+    away. If the server still answers 402 (e.g. the price changed), the fresh
+    requirements replace the cached ones and the request is re-sent once,
+    which costs the same two round trips as the plain challenge flow.
+
+    Requests on an active ``upto`` session are left to the base transport,
+    since the session header already authorizes them.
+
+    With a `PresigningPool`, payloads are taken from the pool instead of being
+    signed on the request path.
+    """
+
+    def __init__(
+        self,
+        client,
+        requirements: PaymentRequirementsCache,
+        transport: httpx.AsyncBaseTransport,
+        presigner: Optional[PresigningPool] = None,
+    ):
+        super().__init__(client, transport=transport)
+        missing = [name for name in _BASE_TRANSPORT_MEMBERS if not hasattr(self, name)]
+        if missing:
+            raise OpenGradientError(
+                f"Installed x402v2 package lacks {', '.join(missing)}; prepaid x402 payments need og-test-v2-x402==0.0.11. "
+                "Install that version or pass prepay=False."
+            )
+        self._requirements = requirements
+        self._presigner = presigner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.extensions.get(self.RETRY_KEY) or self._get_session(request):
+            return await super().handle_async_request(request)
+
+        requirements = self._requirements
+        key = requirements.key(request)
+        payment_required = requirements.get(key)
+
+        if payment_required is not None:
+            response = await self._send_paid(request, payment_required)
+            if response.status_code != 402:
+                requirements.count("avoided_challenges")
+                return self._capture_session(request, response)
+            requirements.count("stale_requirements")
+            requirements.discard(key)
+        else:
+            response = await self._transport.handle_async_request(request)
+            if response.status_code != 402:
+                return self._capture_session(request, response)
+            requirements.count("challenges")
+
+        try:
+            payment_required = await self._read_payment_required(response)
+        except Exception as e:
+            raise PaymentError(f"Failed to handle payment: {e}") from e
+        self._requirements.put(key, payment_required)
+
+        return self._capture_session(request, await self._send_paid(request, payment_required))
+
+    async def _read_payment_required(self, response: httpx.Response) -> Any:
+        await response.aread()
+        body = None
+        try:
+            body = _codec.loads(response.content)
+        except _codec.DecodeError:
+            pass
+        return self._http_client.get_payment_required_response(response.headers.get, body)
+
+    async def _send_paid(self, request: httpx.Request, payment_required: Any) -> httpx.Response:
+        try:
+            if self._presigner is not None:
+                payment_payload = await self._presigner.take(payment_required)
+            else:
+                payment_payload = await self._client.create_payment_payload(payment_required)
+            headers = dict(request.headers)
+            headers.update(self._http_client.encode_payment_signature_header(payment_payload))
+            headers["Access-Control-Expose-Headers"] = "PAYMENT-RESPONSE,X-PAYMENT-RESPONSE"
+            headers.pop(self.SESSION_HEADER, None)
+
+            paid_request = httpx.Request(
+                method=request.method,
+                url=request.url,
+                headers=headers,
+                content=request.content,
+                extensions={**request.extensions, self.RETRY_KEY: True},
+            )
+            return await self._transport.handle_async_request(paid_request)
+        except PaymentError:
+            raise
+        except Exception as e:
+            raise PaymentError(f"Failed to handle payment: {e}") from e
+
+    def _capture_session(self, request: httpx.Request, response: httpx.Response) -> httpx.Response:
+        if 200 <= response.status_code < 300:
+            session = response.headers.get(self.SESSION_HEADER)
+            if session:
+                self._store_session(request, session)
+        return response
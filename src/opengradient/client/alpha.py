@@ -6,7 +6,6 @@ including on-chain ONNX model inference, workflow management, and ML model execu
 """
 
 import base64
-import json
 import urllib.parse
 from typing import Dict, List, Optional, Union
 
@@ -17,6 +16,7 @@ from web3 import Web3
 from web3.exceptions import ContractLogicError
 from web3.logs import DISCARD
 
+from .. import _codec
 from ..defaults import DEFAULT_SCHEDULER_ADDRESS
 from ..types import HistoricalInputQuery, InferenceMode, InferenceResult, ModelOutput, SchedulerParams
 from ._conversions import convert_array_to_model_output, convert_to_model_input, convert_to_model_output
@@ -192,12 +192,10 @@ class Alpha:
 
             response = requests.get(url)
             if response.status_code == 200:
-                resp = response.json()
+                resp = _codec.loads(response.content)
                 inference_result = resp.get("inference_results", {})
                 if inference_result:
-                    decoded_bytes = base64.b64decode(inference_result[0])
-                    decoded_string = decoded_bytes.decode("utf-8")
-                    output = json.loads(decoded_string).get("InferenceResult", {})
+                    output = _codec.loads(base64.b64decode(inference_result[0])).get("InferenceResult", {})
                     if output is None:
                         raise OpenGradientError("Missing InferenceResult in inference output")
 
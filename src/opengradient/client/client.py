@@ -1,7 +1,9 @@
 """Main Client class that unifies all OpenGradient service namespaces."""
 
-from typing import Optional
+import asyncio
+from typing import Callable, List, Optional
 
+import httpx
 from web3 import Web3
 
 from ..defaults import (
@@ -11,8 +13,12 @@ from ..defaults import (
     DEFAULT_OPENGRADIENT_LLM_STREAMING_SERVER_URL,
     DEFAULT_RPC_URL,
 )
+from ..types import RequestTiming
 from .alpha import Alpha
-from .llm import LLM
+from .llm import DEFAULT_RETRY_POLICY, DEFAULT_STREAM_BUFFER_SIZE, LIMITS, AsyncLLM, LLM
+from .llm_balancer import DEFAULT_BALANCING_POLICY, BalancingPolicy
+from .llm_cache import LLMResponseCache
+from .llm_retry import HedgePolicy, RetryPolicy
 from .model_hub import ModelHub
 from .twins import Twins
 
@@ -37,6 +43,7 @@ class Client:
         client = og.Client(private_key="0xBASE_KEY", alpha_private_key="0xALPHA_KEY")
         client.llm.ensure_opg_approval(opg_amount=5)  # one-time Permit2 approval
         result = client.llm.chat(model=TEE_LLM.CLAUDE_HAIKU_4_5, messages=[...])
+        result = await client.llm_async.chat(model=TEE_LLM.CLAUDE_HAIKU_4_5, messages=[...])
         result = client.alpha.infer(model_cid, InferenceMode.VANILLA, input_data)
     """
 
@@ -46,6 +53,9 @@ class Client:
     llm: LLM
     """LLM chat and completion via TEE-verified execution."""
 
+    llm_async: AsyncLLM
+    """Asyncio-native counterpart of ``llm`` that runs on the caller's event loop."""
+
     alpha: Alpha
     """Alpha Testnet features including on-chain inference, workflow management, and ML model execution."""
 
@@ -64,6 +74,20 @@ class Client:
         contract_address: str = DEFAULT_INFERENCE_CONTRACT_ADDRESS,
         og_llm_server_url: Optional[str] = DEFAULT_OPENGRADIENT_LLM_SERVER_URL,
         og_llm_streaming_server_url: Optional[str] = DEFAULT_OPENGRADIENT_LLM_STREAMING_SERVER_URL,
+        llm_max_connections: Optional[int] = LIMITS.max_connections,
+        llm_max_keepalive_connections: Optional[int] = LIMITS.max_keepalive_connections,
+        llm_keepalive_expiry: Optional[float] = LIMITS.keepalive_expiry,
+        llm_http2: bool = False,
+        llm_cache: Optional[LLMResponseCache] = None,
+        llm_retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        llm_hedge_policy: Optional[HedgePolicy] = None,
+        llm_single_flight: bool = False,
+        llm_stream_buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE,
+        llm_metrics_callback: Optional[Callable[[RequestTiming], None]] = None,
+        llm_prepay: bool = True,
+        llm_presign_buffer_size: int = 0,
+        llm_server_urls: Optional[List[str]] = None,
+        llm_balancing_policy: BalancingPolicy = DEFAULT_BALANCING_POLICY,
     ):
         """
         Initialize the OpenGradient client.
@@ -88,6 +112,54 @@ class Client:
             contract_address: Inference contract address.
             og_llm_server_url: OpenGradient LLM server URL.
             og_llm_streaming_server_url: OpenGradient LLM streaming server URL.
+            llm_max_connections: Maximum number of concurrent connections per LLM
+                HTTP client (request and streaming each have their own pool).
+                ``None`` for no limit.
+            llm_max_keepalive_connections: Maximum number of idle keep-alive
+                connections kept open per LLM HTTP client.
+            llm_keepalive_expiry: Seconds an idle LLM connection is kept open
+                before being closed.
+            llm_http2: Enable HTTP/2 so concurrent LLM requests are multiplexed
+                over fewer connections. Requires the ``h2`` package
+                (``pip install 'opengradient[http2]'``).
+            llm_cache: Response cache for deterministic (``temperature=0``),
+                non-streaming LLM requests. Repeated requests are served
+                locally without a new payment. Disabled when None.
+            llm_retry_policy: Retry policy for failed LLM requests. Retries
+                never resend a paid request the server may have processed;
+                a 429 or 5xx answer without an x402 settlement header counts
+                as unprocessed. See ``RetryPolicy``.
+                Pass ``RetryPolicy(max_attempts=1)`` to disable retries.
+            llm_hedge_policy: Send a second copy of non-streaming LLM requests
+                that are slower than recent latencies suggest, and use the
+                first answer. Disabled when None.
+            llm_single_flight: Coalesce identical concurrent LLM requests so
+                only one is sent and paid for; the others await its result.
+                Identical streams share one upstream stream, late joiners
+                replay the chunks they missed, and a reader that falls too far
+                behind is dropped. See ``client.llm.single_flight_stats()``.
+            llm_stream_buffer_size: Maximum number of chunks ``client.llm``
+                buffers for a streaming response that is consumed slowly. Once
+                full, reading from the server pauses until the consumer catches up.
+            llm_metrics_callback: Called with a ``RequestTiming`` (connect and
+                payment time, time to first token, inter-chunk gaps, tokens/sec)
+                after each LLM request completes. Streams closed early are
+                reported with ``complete=False``. Runs on the event loop that
+                made the request, so it should return quickly.
+            llm_prepay: Remember each LLM endpoint's x402 payment requirements
+                and attach the signed payment to later requests up front,
+                skipping the 402 challenge round trip. Falls back to the
+                challenge when the server rejects the cached requirements.
+            llm_presign_buffer_size: Number of x402 payments to sign ahead of
+                time on background threads for each known price, so signing
+                stays off the request path under high concurrency. Disabled
+                when 0. See ``client.llm.presign_stats()``.
+            llm_server_urls: Several equivalent TEE LLM servers to balance
+                requests and streams over. Overrides ``og_llm_server_url`` and
+                ``og_llm_streaming_server_url``. Each server gets its own TLS
+                pin and connection pool. See ``client.llm.endpoint_stats()``.
+            llm_balancing_policy: Routing strategy, ejection of failing servers
+                and background health checks used with ``llm_server_urls``.
         """
         blockchain = Web3(Web3.HTTPProvider(rpc_url))
         wallet_account = blockchain.eth.account.from_key(private_key)
@@ -110,7 +182,25 @@ class Client:
             wallet_account=wallet_account,
             og_llm_server_url=og_llm_server_url,
             og_llm_streaming_server_url=og_llm_streaming_server_url,
+            limits=httpx.Limits(
+                max_connections=llm_max_connections,
+                max_keepalive_connections=llm_max_keepalive_connections,
+                keepalive_expiry=llm_keepalive_expiry,
+            ),
+            http2=llm_http2,
+            cache=llm_cache,
+            retry_policy=llm_retry_policy,
+            hedge_policy=llm_hedge_policy,
+            single_flight=llm_single_flight,
+            stream_buffer_size=llm_stream_buffer_size,
+            metrics_callback=llm_metrics_callback,
+            prepay=llm_prepay,
+            presign_buffer_size=llm_presign_buffer_size,
+            server_urls=llm_server_urls,
+            balancing_policy=llm_balancing_policy,
         )
+        # Shares TLS pins and the x402 signer with ``llm``; HTTP clients bind to the caller's loop on first use
+        self.llm_async = self.llm._async_llm._fork()
 
         self.alpha = Alpha(
             blockchain=blockchain,
@@ -125,8 +215,20 @@ class Client:
         """Close underlying SDK resources."""
         self.llm.close()
 
+    async def aclose(self) -> None:
+        """Close underlying SDK resources, including the async LLM clients bound to the running loop."""
+        await self.llm_async.aclose()
+        # Joins the sync client's loop thread, so it must not block this loop
+        await asyncio.to_thread(self.llm.close)
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc, tb):
         self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
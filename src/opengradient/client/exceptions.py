@@ -69,6 +69,12 @@ class InvalidInputError(OpenGradientError):
         self.invalid_fields = invalid_fields or []
 
 
+class SignatureVerificationError(OpenGradientError):
+    """Raised when a TEE signature over an LLM output is missing or invalid"""
+
+    pass
+
+
 class ServerError(OpenGradientError):
     """Raised when a server error occurs"""
 
@@ -1,25 +1,50 @@
 """LLM chat and completion via TEE-verified execution with x402 payments."""
 
 import asyncio
-import json
+import copy
+import dataclasses
+import importlib.util
+import logging
 import threading
+import time
 from queue import Queue
-from typing import AsyncGenerator, Dict, List, Optional, Union
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
 import ssl
-import socket
-import tempfile
-from urllib.parse import urlparse
 
 import httpx
 from eth_account.account import LocalAccount
 from x402v2 import x402Client as x402Clientv2
-from x402v2.http.clients import x402HttpxClient as x402HttpxClientv2
+from x402v2.http.clients import x402AsyncTransport as x402AsyncTransportv2
 from x402v2.mechanisms.evm import EthAccountSigner as EthAccountSignerv2
 from x402v2.mechanisms.evm.exact.register import register_exact_evm_client as register_exact_evm_clientv2
 from x402v2.mechanisms.evm.upto.register import register_upto_evm_client as register_upto_evm_clientv2
 
-from ..types import TEE_LLM, StreamChunk, TextGenerationOutput, TextGenerationStream, x402SettlementMode
+from .. import _codec
+from .._sse import SSEEvent, aiter_sse_events
+from ..types import (
+    TEE_LLM,
+    BatchResult,
+    ConnectionPoolStats,
+    EndpointStats,
+    PaymentStats,
+    PresignStats,
+    RequestTiming,
+    SingleFlightStats,
+    StreamChunk,
+    TextGenerationOutput,
+    TextGenerationStream,
+    x402SettlementMode,
+)
+from ._timing import RequestTimer
+from ._tls import TLSPinStore, default_pin_store, is_certificate_error
+from ._utils import cancel_losers
+from ._x402 import PaymentRequirementsCache, PrepaidX402Transport, PresigningPool
 from .exceptions import OpenGradientError
+from .llm_balancer import DEFAULT_BALANCING_POLICY, BalancingPolicy, BalancingTransport, EndpointBalancer
+from .llm_cache import LLMResponseCache, request_key
+from .llm_multiplex import StreamMultiplexer
+from .llm_retry import Attempt, HedgePolicy, LatencyTracker, RetryPolicy
+from .llm_stop import StopCondition, stop_stream
 from .opg_token import Permit2ApprovalResult, ensure_opg_approval
 
 X402_PROCESSING_HASH_HEADER = "x-processing-hash"
@@ -39,52 +64,946 @@ LIMITS = httpx.Limits(
     keepalive_expiry=60 * 20,  # 20 minutes
 )
 
+# Default number of in-flight requests for chat_many / completion_many
+DEFAULT_BATCH_CONCURRENCY = 16
+
+# Items buffered between the background loop and a thread consuming a sync stream
+DEFAULT_STREAM_BUFFER_SIZE = 64
+# How long a sync stream waits for its HTTP response to be closed after the consumer stops
+STREAM_CLOSE_TIMEOUT = 5.0
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+T = TypeVar("T")
+
+
+class _PoolTransport(httpx.AsyncHTTPTransport):
+    """``httpx.AsyncHTTPTransport`` that keeps counters for `ConnectionPoolStats`."""
+
+    def __init__(self, verify: Union[ssl.SSLContext, bool], limits: httpx.Limits, http2: bool):
+        super().__init__(verify=verify, limits=limits, http2=http2)
+        self._max_connections = limits.max_connections
+        self._http2 = http2
+        self._requests = 0
+        self._pool_waits = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._requests += 1
+        attempt = request.extensions.get(Attempt.EXTENSION)
+        if attempt is not None:
+            attempt.observe(request)
+        connections = self._pool.connections
+        if (
+            self._max_connections is not None
+            and len(connections) >= self._max_connections
+            and not any(connection.is_available() for connection in connections)
+        ):
+            self._pool_waits += 1
+        return await super().handle_async_request(request)
+
+    def stats(self) -> ConnectionPoolStats:
+        connections = self._pool.connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return ConnectionPoolStats(
+            active_connections=len(connections) - idle,
+            idle_connections=idle,
+            queued_requests=sum(1 for request in self._pool._requests if request.is_queued()),
+            pool_waits=self._pool_waits,
+            requests=self._requests,
+            max_connections=self._max_connections,
+            http2=self._http2,
+        )
 
-def _fetch_tls_cert_as_ssl_context(server_url: str) -> Optional[ssl.SSLContext]:
-    """
-    Connect to a server, retrieve its TLS certificate (TOFU),
-    and return an ssl.SSLContext that trusts ONLY that certificate.
 
-    Hostname verification is disabled because the TEE server's cert
-    is typically issued for a hostname but we may connect via IP address.
-    The pinned certificate itself provides the trust anchor.
+def _transport_busy(transport: Optional[httpx.AsyncBaseTransport]) -> bool:
+    """Whether a client's connection pools still carry a request or an open stream."""
+    if not isinstance(transport, (_PoolTransport, BalancingTransport)):
+        return False
+    stats = transport.stats()
+    return stats.active_connections > 0 or stats.queued_requests > 0
 
-    Returns None if the server is not HTTPS or unreachable.
-    """
-    parsed = urlparse(server_url)
-    if parsed.scheme != "https":
+
+def _parse_sse_event(event: SSEEvent) -> Optional[StreamChunk]:
+    """Parse one SSE event into a StreamChunk, skipping malformed payloads."""
+    try:
+        return StreamChunk.from_sse_data(_codec.loads(event.data))
+    except _codec.DecodeError:
         return None
 
-    hostname = parsed.hostname
-    port = parsed.port or 443
 
-    # Connect without verification to retrieve the server's certificate
-    fetch_ctx = ssl.create_default_context()
-    fetch_ctx.check_hostname = False
-    fetch_ctx.verify_mode = ssl.CERT_NONE
+def _parse_completion_result(result: Dict) -> TextGenerationOutput:
+    return TextGenerationOutput(
+        transaction_hash="external",
+        completion_output=result.get("completion"),
+        tee_signature=result.get("tee_signature"),
+        tee_timestamp=result.get("tee_timestamp"),
+    )
 
-    try:
-        with socket.create_connection((hostname, port), timeout=10) as sock:
-            with fetch_ctx.wrap_socket(sock, server_hostname=hostname) as ssock:
-                der_cert = ssock.getpeercert(binary_form=True)
-                pem_cert = ssl.DER_cert_to_PEM_cert(der_cert)
-    except Exception:
-        return None
 
-    # Write PEM to a temp file so we can load it into the SSLContext
-    cert_file = tempfile.NamedTemporaryFile(
-        prefix="og_tee_tls_", suffix=".pem", delete=False, mode="w"
+def _parse_chat_result(result: Dict) -> TextGenerationOutput:
+    choices = result.get("choices")
+    if not choices:
+        raise OpenGradientError(f"Invalid response: 'choices' missing or empty in {result}")
+
+    message = choices[0].get("message", {})
+    content = message.get("content")
+    if isinstance(content, list):
+        message["content"] = " ".join(
+            block.get("text", "") for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+        ).strip()
+
+    return TextGenerationOutput(
+        transaction_hash="external",
+        finish_reason=choices[0].get("finish_reason"),
+        chat_output=message,
+        tee_signature=result.get("tee_signature"),
+        tee_timestamp=result.get("tee_timestamp"),
     )
-    cert_file.write(pem_cert)
-    cert_file.flush()
-    cert_file.close()
 
-    # Build an SSLContext that trusts ONLY this cert, with hostname check disabled
-    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-    ctx.load_verify_locations(cert_file.name)
-    ctx.check_hostname = False  # Cert is for a hostname, but we connect via IP
-    ctx.verify_mode = ssl.CERT_REQUIRED  # Still verify the cert itself
-    return ctx
+
+class _Flight:
+    """An in-flight single-flight request and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[TextGenerationOutput]"):
+        self.task = task
+        self.waiters = 0
+
+
+def _request_headers(x402_settlement_mode: x402SettlementMode) -> Dict[str, str]:
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {X402_PLACEHOLDER_API_KEY}",
+        "X-SETTLEMENT-TYPE": x402_settlement_mode.value,
+    }
+
+
+def _request_extensions(payload: Dict) -> Dict[str, Any]:
+    # Lets the prepaid x402 transport key payment requirements without parsing the body again
+    return {PaymentRequirementsCache.EXTENSION: PaymentRequirementsCache.request_shape(payload)}
+
+
+class AsyncLLM:
+    """
+    Asyncio-native LLM inference namespace.
+
+    Same surface as `LLM`, but every method is a coroutine that runs directly
+    on the caller's event loop. No background thread is involved, so a single
+    ``AsyncLLM`` can multiplex thousands of concurrent requests over one
+    shared connection pool.
+
+    HTTP clients are created lazily on first use and bound to the running
+    event loop. Call ``aclose()`` (or use ``async with``) when done.
+
+    Usage:
+        client = og.Client(...)
+
+        result = await client.llm_async.chat(model=TEE_LLM.CLAUDE_HAIKU_4_5, messages=[...])
+        result = await client.llm_async.completion(model=TEE_LLM.CLAUDE_HAIKU_4_5, prompt="Hello")
+
+        stream = await client.llm_async.chat(model=TEE_LLM.CLAUDE_HAIKU_4_5, messages=[...], stream=True)
+        async for chunk in stream:
+            print(chunk.choices[0].delta.content or "", end="")
+    """
+
+    def __init__(
+        self,
+        wallet_account: LocalAccount,
+        og_llm_server_url: str,
+        og_llm_streaming_server_url: str,
+        limits: httpx.Limits = LIMITS,
+        http2: bool = False,
+        cache: Optional[LLMResponseCache] = None,
+        tls_pin_store: Optional[TLSPinStore] = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        hedge_policy: Optional[HedgePolicy] = None,
+        single_flight: bool = False,
+        metrics_callback: Optional[Callable[[RequestTiming], None]] = None,
+        prepay: bool = True,
+        presign_buffer_size: int = 0,
+        presign_workers: int = 2,
+        server_urls: Optional[List[str]] = None,
+        balancing_policy: BalancingPolicy = DEFAULT_BALANCING_POLICY,
+    ):
+        if presign_buffer_size and not prepay:
+            raise ValueError("Pre-signing payments requires prepay=True.")
+        if http2 and importlib.util.find_spec("h2") is None:
+            raise ImportError("HTTP/2 support requires the 'h2' package. Install it with: pip install 'opengradient[http2]'")
+
+        # With several endpoints, requests are built against the first and routed by the balancer
+        self._balancer: Optional[EndpointBalancer] = None
+        if server_urls:
+            balancer = EndpointBalancer(server_urls, balancing_policy)
+            og_llm_server_url = og_llm_streaming_server_url = balancer.urls[0]
+            if len(balancer.urls) > 1:
+                self._balancer = balancer
+
+        self._wallet_account = wallet_account
+        self._og_llm_server_url = og_llm_server_url
+        self._og_llm_streaming_server_url = og_llm_streaming_server_url
+        self._limits = limits
+        self._http2 = http2
+        self._cache = cache
+        self._retry_policy = retry_policy
+        self._hedge_policy = hedge_policy
+        self._single_flight = single_flight
+        self._metrics_callback = metrics_callback
+        # In-flight requests are awaited on their own loop, so each fork has its own map; stats are shared
+        self._flights: Dict[str, _Flight] = {}
+        self._single_flight_stats = SingleFlightStats()
+        self._stream_multiplexer = StreamMultiplexer(stats=self._single_flight_stats)
+        # Recent latencies per (endpoint, model), shared with forks
+        self._latencies: Dict[Tuple[str, str], LatencyTracker] = {}
+
+        # TLS pins are resolved on first use, see _resolve_tls_pins
+        self._pin_store = tls_pin_store or default_pin_store
+        self._tls_verify: Optional[Union[ssl.SSLContext, bool]] = None
+        self._streaming_tls_verify: Optional[Union[ssl.SSLContext, bool]] = None
+        self._endpoint_tls_verify: Dict[str, Union[ssl.SSLContext, bool]] = {}
+
+        signer = EthAccountSignerv2(self._wallet_account)
+        self._x402_client = x402Clientv2()
+        # Payment requirements learned from 402 challenges, shared by both pools and all forks
+        self._payment_requirements = PaymentRequirementsCache() if prepay else None
+        # Signing threads are shared with forks and stopped when the original instance is closed
+        self._presigner = PresigningPool(self._x402_client, presign_buffer_size, presign_workers) if presign_buffer_size else None
+        self._owns_presigner = True
+        register_exact_evm_clientv2(self._x402_client, signer, networks=[BASE_TESTNET_NETWORK])
+        register_upto_evm_clientv2(self._x402_client, signer, networks=[BASE_TESTNET_NETWORK])
+
+        self._request_client: Optional[httpx.AsyncClient] = None
+        self._stream_client: Optional[httpx.AsyncClient] = None
+        self._request_transport: Optional[_PoolTransport] = None
+        self._stream_transport: Optional[_PoolTransport] = None
+        self._clients_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Serializes certificate re-pinning; created on the loop that owns the clients
+        self._repin_lock: Optional[asyncio.Lock] = None
+        # Bumped each time the clients are rebuilt with fresh pins
+        self._pin_generation = 0
+        # Clients replaced by a re-pin, closed once their in-flight requests are done
+        self._retired_clients: List[Tuple[httpx.AsyncClient, Optional[httpx.AsyncBaseTransport]]] = []
+        self._closed = False
+
+    def _fork(self) -> "AsyncLLM":
+        """Return a new instance sharing this one's TLS pins and x402 signer, but with its own HTTP clients.
+
+        HTTP clients are bound to the event loop they were first used on, so
+        each loop that issues requests needs its own ``AsyncLLM``.
+        """
+        fork = copy.copy(self)
+        fork._request_client = None
+        fork._stream_client = None
+        fork._request_transport = None
+        fork._stream_transport = None
+        fork._clients_loop = None
+        fork._repin_lock = None
+        fork._retired_clients = []
+        fork._flights = {}
+        fork._stream_multiplexer = StreamMultiplexer(stats=self._single_flight_stats)
+        fork._closed = False
+        fork._owns_presigner = False
+        return fork
+
+    async def __aenter__(self) -> "AsyncLLM":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def _initialize_http_clients(self) -> None:
+        if self._closed:
+            raise OpenGradientError("LLM client is closed.")
+
+        loop = asyncio.get_running_loop()
+        if self._clients_loop is not loop:
+            # Clients from a previous (likely finished) loop cannot be reused or closed here
+            self._request_client = None
+            self._stream_client = None
+            self._retired_clients = []
+            self._repin_lock = asyncio.Lock()
+            self._clients_loop = loop
+
+        if self._retired_clients:
+            await self._close_idle_retired_clients()
+
+        if self._tls_verify is None or self._streaming_tls_verify is None:
+            await self._resolve_tls_pins()
+
+        if self._request_client is None:
+            if self._balancer is not None:
+                # Only one of the balanced clients needs to run the health checks
+                self._request_transport = self._build_balancing_transport(health_checks=True)
+                self._request_client = httpx.AsyncClient(transport=self._request_transport, timeout=TIMEOUT)
+            else:
+                self._request_transport = _PoolTransport(verify=self._tls_verify, limits=self._limits, http2=self._http2)
+                self._request_client = self._build_http_client(self._request_transport)
+            await self._request_client.__aenter__()
+        if self._stream_client is None:
+            if self._balancer is not None:
+                self._stream_transport = self._build_balancing_transport(health_checks=False)
+                self._stream_client = httpx.AsyncClient(transport=self._stream_transport, timeout=TIMEOUT)
+            else:
+                self._stream_transport = _PoolTransport(verify=self._streaming_tls_verify, limits=self._limits, http2=self._http2)
+                self._stream_client = self._build_http_client(self._stream_transport)
+            await self._stream_client.__aenter__()
+
+    async def _resolve_tls_pins(self, refresh: bool = False) -> None:
+        """Look up (or with ``refresh``, re-fetch) the pinned certificates of all servers concurrently."""
+        lookup = self._pin_store.refresh if refresh else self._pin_store.ssl_context
+        urls = [self._og_llm_server_url, self._og_llm_streaming_server_url]
+        if self._balancer is not None:
+            urls += self._balancer.urls
+        urls = list(dict.fromkeys(urls))
+        # The pin store blocks on a network probe for servers it has not seen yet
+        contexts = dict(zip(urls, await asyncio.gather(*(asyncio.to_thread(lookup, url) for url in urls))))
+        self._tls_verify = contexts[self._og_llm_server_url]
+        self._streaming_tls_verify = contexts[self._og_llm_streaming_server_url]
+        self._endpoint_tls_verify = contexts
+
+    async def _send_pinned(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Run ``send``, re-pinning and retrying once if the server no longer
+        presents the pinned certificate (e.g. the enclave restarted with a new
+        key). No request bytes reach the server when the handshake fails, so
+        the retry cannot double-charge.
+        """
+        generation = self._pin_generation
+        try:
+            return await send()
+        except httpx.ConnectError as e:
+            if not is_certificate_error(e):
+                raise
+        async with self._repin_lock:
+            # Requests failing together re-pin once; the others retry on the clients it built
+            if self._pin_generation == generation:
+                await self._resolve_tls_pins(refresh=True)
+                self._retire_http_clients()
+                await self._initialize_http_clients()
+                self._pin_generation += 1
+        return await send()
+
+    def _retire_http_clients(self) -> None:
+        """Replace the HTTP clients without closing the old ones, which other requests and streams may still be using."""
+        for client, transport in ((self._request_client, self._request_transport), (self._stream_client, self._stream_transport)):
+            if client is not None:
+                self._retired_clients.append((client, transport))
+        self._request_client = None
+        self._stream_client = None
+
+    async def _close_idle_retired_clients(self) -> None:
+        busy = []
+        for client, transport in self._retired_clients:
+            if _transport_busy(transport):
+                busy.append((client, transport))
+            else:
+                await client.__aexit__(None, None, None)
+        self._retired_clients = busy
+
+    def _build_http_client(self, transport: _PoolTransport) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self._payment_transport(transport), timeout=TIMEOUT)
+
+    def _payment_transport(self, transport: _PoolTransport) -> httpx.AsyncBaseTransport:
+        # The x402 transport handles the 402 challenge and re-sends through the same pooled transport
+        if self._payment_requirements is not None:
+            return PrepaidX402Transport(self._x402_client, self._payment_requirements, transport=transport, presigner=self._presigner)
+        return x402AsyncTransportv2(self._x402_client, transport=transport)
+
+    def _build_balancing_transport(self, health_checks: bool) -> BalancingTransport:
+        """Build a transport routing over every endpoint, each with its own pinned connection pool and x402 handling."""
+        pools = {
+            url: _PoolTransport(verify=self._endpoint_tls_verify.get(url, True), limits=self._limits, http2=self._http2)
+            for url in self._balancer.urls
+        }
+        return BalancingTransport(
+            self._balancer,
+            self._og_llm_server_url,
+            transports={url: self._payment_transport(pool) for url, pool in pools.items()},
+            pools=pools,
+            health_checks=health_checks,
+        )
+
+    async def _close_http_clients(self) -> None:
+        for client, _ in self._retired_clients:
+            await client.__aexit__(None, None, None)
+        self._retired_clients = []
+        if self._request_client is not None:
+            await self._request_client.__aexit__(None, None, None)
+            self._request_client = None
+        if self._stream_client is not None:
+            await self._stream_client.__aexit__(None, None, None)
+            self._stream_client = None
+        self._request_transport = None
+        self._stream_transport = None
+        self._clients_loop = None
+
+    def pool_stats(self) -> Dict[str, ConnectionPoolStats]:
+        """
+        Return connection pool statistics for the ``"request"`` and ``"stream"``
+        HTTP clients. Pools that have not been created yet are omitted.
+        """
+        stats = {}
+        if self._request_transport is not None:
+            stats["request"] = self._request_transport.stats()
+        if self._stream_transport is not None:
+            stats["stream"] = self._stream_transport.stats()
+        return stats
+
+    def single_flight_stats(self) -> SingleFlightStats:
+        """Return a snapshot of the single-flight coalescing counters."""
+        return dataclasses.replace(self._single_flight_stats)
+
+    def endpoint_stats(self) -> Dict[str, EndpointStats]:
+        """Return the health and load of each balanced endpoint, keyed by URL. Empty with a single endpoint."""
+        if self._balancer is None:
+            return {}
+        return self._balancer.stats()
+
+    def payment_stats(self) -> PaymentStats:
+        """Return a snapshot of the x402 challenge counters. All zero when ``prepay`` is disabled."""
+        if self._payment_requirements is None:
+            return PaymentStats()
+        return self._payment_requirements.stats_snapshot()
+
+    def presign_stats(self) -> PresignStats:
+        """Return a snapshot of the pre-signing pool counters. All zero when pre-signing is disabled."""
+        if self._presigner is None:
+            return PresignStats()
+        return dataclasses.replace(self._presigner.stats)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP clients. Further requests raise ``OpenGradientError``."""
+        if self._closed:
+            return
+        await self._close_http_clients()
+        if self._presigner is not None and self._owns_presigner:
+            self._presigner.close()
+        self._closed = True
+
+    async def ensure_opg_approval(self, opg_amount: float) -> Permit2ApprovalResult:
+        """Async version of `LLM.ensure_opg_approval`. The blocking RPC calls run in a worker thread."""
+        if opg_amount < 0.05:
+            raise ValueError("OPG amount must be at least 0.05.")
+        return await asyncio.to_thread(ensure_opg_approval, self._wallet_account, opg_amount)
+
+    async def completion(
+        self,
+        model: TEE_LLM,
+        prompt: str,
+        max_tokens: int = 100,
+        stop_sequence: Optional[List[str]] = None,
+        temperature: float = 0.0,
+        x402_settlement_mode: Optional[x402SettlementMode] = x402SettlementMode.SETTLE_BATCH,
+        stream: bool = False,
+        stop_when: Optional[StopCondition] = None,
+    ) -> Union[TextGenerationOutput, AsyncIterator[StreamChunk]]:
+        """
+        Perform inference on an LLM model using completions via TEE.
+
+        See `LLM.completion` for a description of the arguments.
+
+        Returns:
+            Union[TextGenerationOutput, AsyncIterator[StreamChunk]]:
+                - If stream=False: TextGenerationOutput with completion_output
+                - If stream=True: async iterator yielding StreamChunk objects as they arrive
+
+        Raises:
+            OpenGradientError: If the inference fails.
+            ValueError: If ``stop_when`` is given without ``stream=True``.
+        """
+        if stop_when is not None and not stream:
+            raise ValueError("stop_when requires stream=True.")
+        if stream:
+            return self._tee_llm_completion_stream(
+                model=model.split("/")[1],
+                prompt=prompt,
+                max_tokens=max_tokens,
+                stop_sequence=stop_sequence,
+                temperature=temperature,
+                x402_settlement_mode=x402_settlement_mode,
+                stop_when=stop_when,
+            )
+        return await self._tee_llm_completion(
+            model=model.split("/")[1],
+            prompt=prompt,
+            max_tokens=max_tokens,
+            stop_sequence=stop_sequence,
+            temperature=temperature,
+            x402_settlement_mode=x402_settlement_mode,
+        )
+
+    async def _tee_llm_completion(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int = 100,
+        stop_sequence: Optional[List[str]] = None,
+        temperature: float = 0.0,
+        x402_settlement_mode: Optional[x402SettlementMode] = x402SettlementMode.SETTLE_BATCH,
+    ) -> TextGenerationOutput:
+        """
+        Route completion request to OpenGradient TEE LLM server with x402 payments.
+        """
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+        if stop_sequence:
+            payload["stop"] = stop_sequence
+
+        return await self._post("/v1/completions", payload, x402_settlement_mode, _parse_completion_result, "completion")
+
+    def _tee_llm_completion_stream(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int = 100,
+        stop_sequence: Optional[List[str]] = None,
+        temperature: float = 0.0,
+        x402_settlement_mode: x402SettlementMode = x402SettlementMode.SETTLE_BATCH,
+        stop_when: Optional[StopCondition] = None,
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Streaming completion request. Each chunk carries the next piece of
+        generated text in ``choices[0].delta.content``, as with chat streams.
+        """
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+        }
+
+        if stop_sequence:
+            payload["stop"] = stop_sequence
+
+        return self._open_stream("/v1/completions", payload, x402_settlement_mode, stop_when)
+
+    async def chat(
+        self,
+        model: TEE_LLM,
+        messages: List[Dict],
+        max_tokens: int = 100,
+        stop_sequence: Optional[List[str]] = None,
+        temperature: float = 0.0,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[str] = None,
+        x402_settlement_mode: Optional[x402SettlementMode] = x402SettlementMode.SETTLE_BATCH,
+        stream: bool = False,
+        stop_when: Optional[StopCondition] = None,
+    ) -> Union[TextGenerationOutput, AsyncIterator[StreamChunk]]:
+        """
+        Perform inference on an LLM model using chat via TEE.
+
+        See `LLM.chat` for a description of the arguments.
+
+        Returns:
+            Union[TextGenerationOutput, AsyncIterator[StreamChunk]]:
+                - If stream=False: TextGenerationOutput with chat_output, transaction_hash, finish_reason, and payment_hash
+                - If stream=True: async iterator yielding StreamChunk objects as they arrive
+
+        Raises:
+            OpenGradientError: If the inference fails.
+            ValueError: If ``stop_when`` is given without ``stream=True``.
+        """
+        if stop_when is not None and not stream:
+            raise ValueError("stop_when requires stream=True.")
+        if stream:
+            return self._tee_llm_chat_stream(
+                model=model.split("/")[1],
+                messages=messages,
+                max_tokens=max_tokens,
+                stop_sequence=stop_sequence,
+                temperature=temperature,
+                tools=tools,
+                tool_choice=tool_choice,
+                x402_settlement_mode=x402_settlement_mode,
+                stop_when=stop_when,
+            )
+        return await self._tee_llm_chat(
+            model=model.split("/")[1],
+            messages=messages,
+            max_tokens=max_tokens,
+            stop_sequence=stop_sequence,
+            temperature=temperature,
+            tools=tools,
+            tool_choice=tool_choice,
+            x402_settlement_mode=x402_settlement_mode,
+        )
+
+    async def _tee_llm_chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_tokens: int = 100,
+        stop_sequence: Optional[List[str]] = None,
+        temperature: float = 0.0,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[str] = None,
+        x402_settlement_mode: x402SettlementMode = x402SettlementMode.SETTLE_BATCH,
+    ) -> TextGenerationOutput:
+        """
+        Route chat request to OpenGradient TEE LLM server with x402 payments.
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+        if stop_sequence:
+            payload["stop"] = stop_sequence
+
+        if tools:
+            payload["tools"] = tools
+            payload["tool_choice"] = tool_choice or "auto"
+
+        return await self._post("/v1/chat/completions", payload, x402_settlement_mode, _parse_chat_result, "chat")
+
+    async def _post(
+        self,
+        endpoint: str,
+        payload: Dict,
+        x402_settlement_mode: x402SettlementMode,
+        parse: Callable[[Dict], TextGenerationOutput],
+        kind: str,
+    ) -> TextGenerationOutput:
+        """Send a non-streaming request, serving deterministic requests from the response cache when enabled."""
+        cache_key = None
+        if self._cache is not None and payload["temperature"] == 0:
+            cache_key = request_key(endpoint, payload, x402_settlement_mode)
+            cached = await self._cache.aget(cache_key)
+            if cached is not None:
+                return cached
+
+        url = self._og_llm_server_url + endpoint
+        headers = _request_headers(x402_settlement_mode)
+        extensions = _request_extensions(payload)
+
+        async def attempt_once(attempt: Attempt) -> TextGenerationOutput:
+            # One timer per attempt, so failed retries and a losing hedge do not mix into the reported timing
+            timer = RequestTimer(payload["model"], streaming=False)
+            await self._initialize_http_clients()
+            response = await self._send_pinned(
+                lambda: self._request_client.post(
+                    url, content=_codec.dumps(payload), headers=headers, timeout=60, extensions={**extensions, Attempt.EXTENSION: attempt, "trace": timer.trace}
+                )
+            )
+            response.raise_for_status()
+            content = await response.aread()
+            result = _codec.loads(content)
+            output = parse(result)
+            output.timing = timer.finish((result.get("usage") or {}).get("completion_tokens"))
+            return output
+
+        async def send() -> TextGenerationOutput:
+            output = await self._hedged((endpoint, payload["model"]), lambda: self._with_retries(attempt_once))
+            self._report_timing(output.timing)
+            if cache_key is not None:
+                await self._cache.aput(cache_key, output)
+            return output
+
+        try:
+            if self._single_flight:
+                return await self._join_flight(cache_key or request_key(endpoint, payload, x402_settlement_mode), send)
+            return await send()
+        except Exception as e:
+            raise OpenGradientError(f"TEE LLM {kind} request failed: {str(e)}")
+
+    def _report_timing(self, timing: RequestTiming) -> None:
+        if self._metrics_callback is None:
+            return
+        try:
+            self._metrics_callback(timing)
+        except Exception:
+            logging.exception("LLM metrics callback failed")
+
+    async def _join_flight(self, key: str, send: Callable[[], Awaitable[TextGenerationOutput]]) -> TextGenerationOutput:
+        """
+        Await the in-flight request for ``key``, starting it via ``send`` if
+        there is none. The request runs as its own task so that one caller
+        being cancelled does not fail the others; it is cancelled only when
+        every caller waiting on it has gone away.
+        """
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight(asyncio.ensure_future(send()))
+            self._flights[key] = flight
+
+            def forget(_):
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+            flight.task.add_done_callback(forget)
+            self._single_flight_stats.leaders += 1
+        else:
+            self._single_flight_stats.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            output = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+        # Followers get their own copy so callers can't mutate each other's results
+        return output if leader else copy.deepcopy(output)
+
+    async def _with_retries(self, attempt_once: Callable[[Attempt], Awaitable[T]]) -> T:
+        """Run ``attempt_once`` until it succeeds or the retry policy gives up."""
+        policy = self._retry_policy
+        for retry in range(1, policy.max_attempts):
+            attempt = Attempt()
+            try:
+                return await attempt_once(attempt)
+            except Exception as e:
+                if not policy.is_retryable(e, attempt.paid):
+                    raise
+                delay = policy.backoff(retry, e)
+            await asyncio.sleep(delay)
+        return await attempt_once(Attempt())
+
+    async def _hedged(self, key: Tuple[str, str], call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``call``; with a hedge policy, start a second copy if the first has
+        not finished after the hedge delay and return whichever succeeds first.
+        """
+        policy = self._hedge_policy
+        if policy is None:
+            return await call()
+
+        tracker = self._latencies.get(key)
+        if tracker is None:
+            tracker = self._latencies.setdefault(key, LatencyTracker(policy.window))
+        delay = policy.initial_delay
+        if len(tracker) >= policy.min_samples:
+            delay = max(policy.min_delay, tracker.percentile(policy.percentile))
+
+        async def timed() -> T:
+            start = time.monotonic()
+            result = await call()
+            tracker.record(time.monotonic() - start)
+            return result
+
+        primary = asyncio.ensure_future(timed())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                pending.add(asyncio.ensure_future(timed()))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            cancel_losers(pending)
+
+    def _tee_llm_chat_stream(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_tokens: int = 100,
+        stop_sequence: Optional[List[str]] = None,
+        temperature: float = 0.0,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[str] = None,
+        x402_settlement_mode: x402SettlementMode = x402SettlementMode.SETTLE_BATCH,
+        stop_when: Optional[StopCondition] = None,
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Async streaming implementation for TEE LLM with x402 payments.
+
+        Yields StreamChunk objects as they arrive from the server.
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+        }
+
+        if stop_sequence:
+            payload["stop"] = stop_sequence
+        if tools:
+            payload["tools"] = tools
+            payload["tool_choice"] = tool_choice or "auto"
+
+        return self._open_stream("/v1/chat/completions", payload, x402_settlement_mode, stop_when)
+
+    def _open_stream(
+        self, endpoint: str, payload: Dict, x402_settlement_mode: x402SettlementMode, stop_when: Optional[StopCondition] = None
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream ``endpoint``; with single-flight, identical concurrent streams share one upstream request.
+        A stream with ``stop_when`` only stops this caller's copy of a shared stream.
+        """
+        if not self._single_flight:
+            chunks = self._stream(endpoint, payload, x402_settlement_mode)
+        else:
+            chunks = self._shared_stream(endpoint, payload, x402_settlement_mode)
+        return chunks if stop_when is None else stop_stream(chunks, stop_when)
+
+    async def _shared_stream(self, endpoint: str, payload: Dict, x402_settlement_mode: x402SettlementMode) -> AsyncGenerator[StreamChunk, None]:
+        # Joins on first read, so a stream that is never iterated does not hold the upstream request open
+        key = request_key(endpoint, payload, x402_settlement_mode)
+        chunks = self._stream_multiplexer.subscribe(key, lambda: self._stream(endpoint, payload, x402_settlement_mode))
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    async def _stream(self, endpoint: str, payload: Dict, x402_settlement_mode: x402SettlementMode) -> AsyncGenerator[StreamChunk, None]:
+        """Send a streaming request to ``endpoint`` and yield the decoded SSE chunks."""
+        headers = _request_headers(x402_settlement_mode)
+        extensions = _request_extensions(payload)
+        model = payload["model"]
+
+        async def _parse_sse_response(response) -> AsyncGenerator[StreamChunk, None]:
+            async for event in aiter_sse_events(response.aiter_raw()):
+                if event.data.strip() == "[DONE]":
+                    return
+                parsed = _parse_sse_event(event)
+                if parsed is not None:
+                    yield parsed
+
+        async def open_stream(attempt: Attempt) -> Tuple[httpx.Response, RequestTimer]:
+            timer = RequestTimer(model, streaming=True)
+            await self._initialize_http_clients()
+            request = self._stream_client.build_request(
+                "POST",
+                self._og_llm_streaming_server_url + endpoint,
+                content=_codec.dumps(payload),
+                headers=headers,
+                timeout=60,
+                extensions={**extensions, Attempt.EXTENSION: attempt, "trace": timer.trace},
+            )
+            response = await self._send_pinned(lambda: self._stream_client.send(request, stream=True))
+            if response.status_code >= 400:
+                body = await response.aread()
+                await response.aclose()
+                body_text = body.decode("utf-8", errors="replace")
+                raise httpx.HTTPStatusError(
+                    f"TEE LLM streaming request failed with status {response.status_code}: {body_text}",
+                    request=request,
+                    response=response,
+                )
+            return response, timer
+
+        # Only opening the stream is retried; once chunks flow, failures surface to the caller
+        try:
+            response, timer = await self._with_retries(open_stream)
+        except httpx.HTTPStatusError as e:
+            raise OpenGradientError(str(e))
+        try:
+            async for parsed_chunk in _parse_sse_response(response):
+                timer.chunk(parsed_chunk)
+                if parsed_chunk.is_final:
+                    parsed_chunk.timing = timer.finish(parsed_chunk.usage.completion_tokens if parsed_chunk.usage else None)
+                yield parsed_chunk
+        finally:
+            await response.aclose()
+            # Streams closed early, e.g. by stop_when, are reported too
+            if not timer.finished:
+                timer.timing.complete = False
+                timer.finish()
+            self._report_timing(timer.timing)
+
+    async def chat_many(
+        self,
+        requests: List[Dict],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Union[List[BatchResult], AsyncIterator[BatchResult]]:
+        """
+        Run many non-streaming chat requests concurrently.
+
+        Args:
+            requests (List[Dict]): Keyword arguments for each `chat` call
+                (``model``, ``messages``, ``max_tokens``, ...). ``stream`` is not allowed.
+            max_concurrency (int): Maximum number of requests in flight at once. Default is 16.
+            ordered (bool): If True, wait for the whole batch and return results in
+                input order. If False, return an async iterator yielding results as
+                they complete. Default is True.
+
+        Returns:
+            Union[List[BatchResult], AsyncIterator[BatchResult]]: One ``BatchResult`` per
+                request. Failed requests carry their exception in ``error`` instead of
+                aborting the batch.
+
+        Raises:
+            ValueError: If ``max_concurrency`` is less than 1 or a request sets ``stream``.
+        """
+        return await self._run_many(self.chat, requests, max_concurrency, ordered)
+
+    async def completion_many(
+        self,
+        requests: List[Dict],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Union[List[BatchResult], AsyncIterator[BatchResult]]:
+        """
+        Run many completion requests concurrently.
+
+        Same as `chat_many`, with each entry in ``requests`` holding keyword
+        arguments for `completion`.
+        """
+        return await self._run_many(self.completion, requests, max_concurrency, ordered)
+
+    async def _run_many(
+        self,
+        fn: Callable[..., Awaitable[TextGenerationOutput]],
+        requests: List[Dict],
+        max_concurrency: int,
+        ordered: bool,
+    ) -> Union[List[BatchResult], AsyncIterator[BatchResult]]:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if any(request.get("stream") for request in requests):
+            raise ValueError("Streaming requests are not supported in batch calls.")
+
+        if ordered:
+            results = [result async for result in self._iter_many(fn, requests, max_concurrency)]
+            results.sort(key=lambda result: result.index)
+            return results
+        return self._iter_many(fn, requests, max_concurrency)
+
+    async def _iter_many(
+        self,
+        fn: Callable[..., Awaitable[TextGenerationOutput]],
+        requests: List[Dict],
+        max_concurrency: int,
+    ) -> AsyncGenerator[BatchResult, None]:
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(index: int, kwargs: Dict) -> BatchResult:
+            async with semaphore:
+                try:
+                    return BatchResult(index=index, output=await fn(**kwargs))
+                except Exception as e:
+                    return BatchResult(index=index, error=e)
+
+        tasks = [asyncio.ensure_future(run_one(index, kwargs)) for index, kwargs in enumerate(requests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early or was cancelled: don't leave requests running
+            for task in tasks:
+                task.cancel()
 
 
 class LLM:
@@ -95,6 +1014,10 @@ class LLM:
     (Trusted Execution Environment) with x402 payment protocol support.
     Supports both streaming and non-streaming responses.
 
+    ``LLM`` is a blocking facade over `AsyncLLM`: requests run on a private
+    event loop in a background thread. Asyncio applications should use
+    ``client.llm_async`` instead to avoid the thread hop.
+
     Before making LLM requests, ensure your wallet has approved sufficient
     OPG tokens for Permit2 spending by calling ``ensure_opg_approval``.
     This only sends an on-chain transaction when the current allowance is
@@ -110,33 +1033,56 @@ class LLM:
         result = client.llm.completion(model=TEE_LLM.CLAUDE_HAIKU_4_5, prompt="Hello")
     """
 
-    def __init__(self, wallet_account: LocalAccount, og_llm_server_url: str, og_llm_streaming_server_url: str):
+    def __init__(
+        self,
+        wallet_account: LocalAccount,
+        og_llm_server_url: str,
+        og_llm_streaming_server_url: str,
+        limits: httpx.Limits = LIMITS,
+        http2: bool = False,
+        cache: Optional[LLMResponseCache] = None,
+        tls_pin_store: Optional[TLSPinStore] = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        hedge_policy: Optional[HedgePolicy] = None,
+        single_flight: bool = False,
+        stream_buffer_size: int = DEFAULT_STREAM_BUFFER_SIZE,
+        metrics_callback: Optional[Callable[[RequestTiming], None]] = None,
+        prepay: bool = True,
+        presign_buffer_size: int = 0,
+        presign_workers: int = 2,
+        server_urls: Optional[List[str]] = None,
+        balancing_policy: BalancingPolicy = DEFAULT_BALANCING_POLICY,
+    ):
+        if stream_buffer_size < 1:
+            raise ValueError("stream_buffer_size must be at least 1.")
+
         self._wallet_account = wallet_account
         self._og_llm_server_url = og_llm_server_url
         self._og_llm_streaming_server_url = og_llm_streaming_server_url
-
-        self._tls_verify: Union[ssl.SSLContext, bool] = (
-            _fetch_tls_cert_as_ssl_context(self._og_llm_server_url) or True
-        )
-        self._streaming_tls_verify: Union[ssl.SSLContext, bool] = (
-            _fetch_tls_cert_as_ssl_context(self._og_llm_streaming_server_url) or True
+        self._async_llm = AsyncLLM(
+            wallet_account=wallet_account,
+            og_llm_server_url=og_llm_server_url,
+            og_llm_streaming_server_url=og_llm_streaming_server_url,
+            limits=limits,
+            http2=http2,
+            cache=cache,
+            tls_pin_store=tls_pin_store,
+            retry_policy=retry_policy,
+            hedge_policy=hedge_policy,
+            single_flight=single_flight,
+            metrics_callback=metrics_callback,
+            prepay=prepay,
+            presign_buffer_size=presign_buffer_size,
+            presign_workers=presign_workers,
+            server_urls=server_urls,
+            balancing_policy=balancing_policy,
         )
-
-        signer = EthAccountSignerv2(self._wallet_account)
-        self._x402_client = x402Clientv2()
-        register_exact_evm_clientv2(self._x402_client, signer, networks=[BASE_TESTNET_NETWORK])
-        register_upto_evm_clientv2(self._x402_client, signer, networks=[BASE_TESTNET_NETWORK])
-
-        self._request_client_ctx = None
-        self._request_client = None
-        self._stream_client_ctx = None
-        self._stream_client = None
+        self._stream_buffer_size = stream_buffer_size
         self._closed = False
 
         self._loop = asyncio.new_event_loop()
         self._loop_thread = threading.Thread(target=self._run_event_loop, daemon=True)
         self._loop_thread.start()
-        self._run_coroutine(self._initialize_http_clients())
 
     def _run_event_loop(self):
         asyncio.set_event_loop(self._loop)
@@ -144,36 +1090,74 @@ class LLM:
 
     def _run_coroutine(self, coroutine):
         if self._closed:
+            coroutine.close()
             raise OpenGradientError("LLM client is closed.")
         future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
         return future.result()
 
-    async def _initialize_http_clients(self) -> None:
-        if self._request_client is None:
-            self._request_client_ctx = x402HttpxClientv2(self._x402_client, verify=self._tls_verify)
-            self._request_client = await self._request_client_ctx.__aenter__()
-        if self._stream_client is None:
-            self._stream_client_ctx = x402HttpxClientv2(self._x402_client, verify=self._streaming_tls_verify)
-            self._stream_client = await self._stream_client_ctx.__aenter__()
-
-    async def _close_http_clients(self) -> None:
-        if self._request_client_ctx is not None:
-            await self._request_client_ctx.__aexit__(None, None, None)
-            self._request_client_ctx = None
-            self._request_client = None
-        if self._stream_client_ctx is not None:
-            await self._stream_client_ctx.__aexit__(None, None, None)
-            self._stream_client_ctx = None
-            self._stream_client = None
-
     def close(self) -> None:
         if self._closed:
             return
-        self._run_coroutine(self._close_http_clients())
+        self._run_coroutine(self._async_llm.aclose())
         self._closed = True
         self._loop.call_soon_threadsafe(self._loop.stop)
         self._loop_thread.join(timeout=5)
 
+    def pool_stats(self) -> Dict[str, ConnectionPoolStats]:
+        """
+        Return connection pool statistics for the ``"request"`` and ``"stream"`` HTTP clients.
+
+        Usage:
+            for name, stats in client.llm.pool_stats().items():
+                print(name, stats.active_connections, stats.idle_connections, stats.pool_waits)
+        """
+        return self._async_llm.pool_stats()
+
+    def single_flight_stats(self) -> SingleFlightStats:
+        """
+        Return how many requests were sent and how many were coalesced into an
+        identical in-flight request. Counts ``client.llm`` and ``client.llm_async`` together.
+
+        Usage:
+            stats = client.llm.single_flight_stats()
+            print(stats.leaders, stats.coalesced, stats.coalesce_rate)
+        """
+        return self._async_llm.single_flight_stats()
+
+    def endpoint_stats(self) -> Dict[str, EndpointStats]:
+        """
+        Return the health and load of each endpoint when the client balances
+        over several servers (``server_urls``), keyed by URL. Empty otherwise.
+
+        Usage:
+            for url, stats in client.llm.endpoint_stats().items():
+                print(url, stats.healthy, stats.outstanding, stats.ewma_latency)
+        """
+        return self._async_llm.endpoint_stats()
+
+    def payment_stats(self) -> PaymentStats:
+        """
+        Return how many requests needed the x402 402 challenge round trip and
+        how many were paid pre-emptively from cached payment requirements.
+        Counts ``client.llm`` and ``client.llm_async`` together.
+
+        Usage:
+            stats = client.llm.payment_stats()
+            print(stats.challenges, stats.avoided_challenges, stats.stale_requirements)
+        """
+        return self._async_llm.payment_stats()
+
+    def presign_stats(self) -> PresignStats:
+        """
+        Return how often payments were served from the pre-signing pool and
+        how long signing takes. Counts ``client.llm`` and ``client.llm_async`` together.
+
+        Usage:
+            stats = client.llm.presign_stats()
+            print(f"{stats.hit_rate:.0%} pre-signed, {stats.mean_signing_time * 1000:.1f} ms per signature")
+        """
+        return self._async_llm.presign_stats()
+
     def ensure_opg_approval(self, opg_amount: float) -> Permit2ApprovalResult:
         """Ensure the Permit2 allowance for OPG is at least ``opg_amount``.
 
@@ -206,7 +1190,9 @@ class LLM:
         stop_sequence: Optional[List[str]] = None,
         temperature: float = 0.0,
         x402_settlement_mode: Optional[x402SettlementMode] = x402SettlementMode.SETTLE_BATCH,
-    ) -> TextGenerationOutput:
+        stream: bool = False,
+        stop_when: Optional[StopCondition] = None,
+    ) -> Union[TextGenerationOutput, TextGenerationStream]:
         """
         Perform inference on an LLM model using completions via TEE.
 
@@ -221,16 +1207,35 @@ class LLM:
                 - SETTLE_BATCH: Aggregates multiple inferences into batch hashes (most cost-efficient).
                 - SETTLE_METADATA: Records full model info, complete input/output data, and all metadata.
                 Defaults to SETTLE_BATCH.
+            stream (bool, optional): Whether to stream the response. Default is False.
+            stop_when (Callable[[StreamChunk], bool], optional): Called with every chunk of
+                a stream; see ``chat``.
 
         Returns:
-            TextGenerationOutput: Generated text results including:
-                - Transaction hash ("external" for TEE providers)
-                - String of completion output
-                - Payment hash for x402 transactions
+            Union[TextGenerationOutput, TextGenerationStream]:
+                - If stream=False: TextGenerationOutput including:
+                    - Transaction hash ("external" for TEE providers)
+                    - String of completion output
+                    - Payment hash for x402 transactions
+                - If stream=True: TextGenerationStream yielding StreamChunk objects whose
+                  ``choices[0].delta.content`` holds the next piece of generated text
 
         Raises:
             OpenGradientError: If the inference fails.
+            ValueError: If ``stop_when`` is given without ``stream=True``.
         """
+        if stop_when is not None and not stream:
+            raise ValueError("stop_when requires stream=True.")
+        if stream:
+            return self._tee_llm_completion_stream_sync(
+                model=model.split("/")[1],
+                prompt=prompt,
+                max_tokens=max_tokens,
+                stop_sequence=stop_sequence,
+                temperature=temperature,
+                x402_settlement_mode=x402_settlement_mode,
+                stop_when=stop_when,
+            )
         return self._tee_llm_completion(
             model=model.split("/")[1],
             prompt=prompt,
@@ -252,49 +1257,47 @@ class LLM:
         """
         Route completion request to OpenGradient TEE LLM server with x402 payments.
         """
-
-        async def make_request_v2():
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {X402_PLACEHOLDER_API_KEY}",
-                "X-SETTLEMENT-TYPE": x402_settlement_mode.value,
-            }
-
-            payload = {
-                "model": model,
-                "prompt": prompt,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-            }
-
-            if stop_sequence:
-                payload["stop"] = stop_sequence
-
-            try:
-                response = await self._request_client.post(
-                    self._og_llm_server_url + "/v1/completions", json=payload, headers=headers, timeout=60
-                )
-
-                content = await response.aread()
-                result = json.loads(content.decode())
-
-                return TextGenerationOutput(
-                    transaction_hash="external",
-                    completion_output=result.get("completion"),
-                    tee_signature=result.get("tee_signature"),
-                    tee_timestamp=result.get("tee_timestamp"),
-                )
-
-            except Exception as e:
-                raise OpenGradientError(f"TEE LLM completion request failed: {str(e)}")
-
         try:
-            return self._run_coroutine(make_request_v2())
+            return self._run_coroutine(
+                self._async_llm._tee_llm_completion(
+                    model=model,
+                    prompt=prompt,
+                    max_tokens=max_tokens,
+                    stop_sequence=stop_sequence,
+                    temperature=temperature,
+                    x402_settlement_mode=x402_settlement_mode,
+                )
+            )
         except OpenGradientError:
             raise
         except Exception as e:
             raise OpenGradientError(f"TEE LLM completion failed: {str(e)}")
 
+    def _tee_llm_completion_stream_sync(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int = 100,
+        stop_sequence: Optional[List[str]] = None,
+        temperature: float = 0.0,
+        x402_settlement_mode: x402SettlementMode = x402SettlementMode.SETTLE_BATCH,
+        stop_when: Optional[StopCondition] = None,
+    ):
+        """
+        Sync streaming completion using the same threading bridge as chat streams.
+        """
+        return self._iterate_async(
+            self._async_llm._tee_llm_completion_stream(
+                model=model,
+                prompt=prompt,
+                max_tokens=max_tokens,
+                stop_sequence=stop_sequence,
+                temperature=temperature,
+                x402_settlement_mode=x402_settlement_mode,
+                stop_when=stop_when,
+            )
+        )
+
     def chat(
         self,
         model: TEE_LLM,
@@ -306,6 +1309,7 @@ class LLM:
         tool_choice: Optional[str] = None,
         x402_settlement_mode: Optional[x402SettlementMode] = x402SettlementMode.SETTLE_BATCH,
         stream: bool = False,
+        stop_when: Optional[StopCondition] = None,
     ) -> Union[TextGenerationOutput, TextGenerationStream]:
         """
         Perform inference on an LLM model using chat via TEE.
@@ -324,6 +1328,12 @@ class LLM:
                 - SETTLE_METADATA: Records full model info, complete input/output data, and all metadata.
                 Defaults to SETTLE_BATCH.
             stream (bool, optional): Whether to stream the response. Default is False.
+            stop_when (Callable[[StreamChunk], bool], optional): Called with every chunk of
+                a stream. Once it returns True, the HTTP stream is closed (no more
+                tokens are read) and the stream ends with that chunk followed by a
+                final chunk whose ``finish_reason`` is ``"client_stop"``. Ready-made
+                conditions are in `opengradient.client.llm_stop`. With ``client.llm``
+                it runs on the client's background thread.
 
         Returns:
             Union[TextGenerationOutput, TextGenerationStream]:
@@ -332,7 +1342,10 @@ class LLM:
 
         Raises:
             OpenGradientError: If the inference fails.
+            ValueError: If ``stop_when`` is given without ``stream=True``.
         """
+        if stop_when is not None and not stream:
+            raise ValueError("stop_when requires stream=True.")
         if stream:
             # Use threading bridge for true sync streaming
             return self._tee_llm_chat_stream_sync(
@@ -344,6 +1357,7 @@ class LLM:
                 tools=tools,
                 tool_choice=tool_choice,
                 x402_settlement_mode=x402_settlement_mode,
+                stop_when=stop_when,
             )
         else:
             # Non-streaming
@@ -372,63 +1386,19 @@ class LLM:
         """
         Route chat request to OpenGradient TEE LLM server with x402 payments.
         """
-
-        async def make_request_v2():
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {X402_PLACEHOLDER_API_KEY}",
-                "X-SETTLEMENT-TYPE": x402_settlement_mode.value,
-            }
-
-            payload = {
-                "model": model,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-            }
-
-            if stop_sequence:
-                payload["stop"] = stop_sequence
-
-            if tools:
-                payload["tools"] = tools
-                payload["tool_choice"] = tool_choice or "auto"
-
-            try:
-                endpoint = "/v1/chat/completions"
-                response = await self._request_client.post(
-                    self._og_llm_server_url + endpoint, json=payload, headers=headers, timeout=60
-                )
-
-                response.raise_for_status()
-                content = await response.aread()
-                result = json.loads(content.decode())
-
-                choices = result.get("choices")
-                if not choices:
-                    raise OpenGradientError(f"Invalid response: 'choices' missing or empty in {result}")
-
-                message = choices[0].get("message", {})
-                content = message.get("content")
-                if isinstance(content, list):
-                    message["content"] = " ".join(
-                        block.get("text", "") for block in content
-                        if isinstance(block, dict) and block.get("type") == "text"
-                    ).strip()
-
-                return TextGenerationOutput(
-                    transaction_hash="external",
-                    finish_reason=choices[0].get("finish_reason"),
-                    chat_output=message,
-                    tee_signature=result.get("tee_signature"),
-                    tee_timestamp=result.get("tee_timestamp"),
-                )
-
-            except Exception as e:
-                raise OpenGradientError(f"TEE LLM chat request failed: {str(e)}")
-
         try:
-            return self._run_coroutine(make_request_v2())
+            return self._run_coroutine(
+                self._async_llm._tee_llm_chat(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    stop_sequence=stop_sequence,
+                    temperature=temperature,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    x402_settlement_mode=x402_settlement_mode,
+                )
+            )
         except OpenGradientError:
             raise
         except Exception as e:
@@ -444,133 +1414,141 @@ class LLM:
         tools: Optional[List[Dict]] = None,
         tool_choice: Optional[str] = None,
         x402_settlement_mode: x402SettlementMode = x402SettlementMode.SETTLE_BATCH,
+        stop_when: Optional[StopCondition] = None,
     ):
         """
         Sync streaming using threading bridge - TRUE real-time streaming.
 
         Yields StreamChunk objects as they arrive from the background thread.
-        NO buffering, NO conversion, just direct pass-through.
+        At most ``stream_buffer_size`` chunks are buffered for a slow consumer.
+        """
+        return self._iterate_async(
+            self._async_llm._tee_llm_chat_stream(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                stop_sequence=stop_sequence,
+                temperature=temperature,
+                tools=tools,
+                tool_choice=tool_choice,
+                x402_settlement_mode=x402_settlement_mode,
+                stop_when=stop_when,
+            )
+        )
+
+    def chat_many(
+        self,
+        requests: List[Dict],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """
+        Run many non-streaming chat requests concurrently.
+
+        Requests share the client's connection pool on the background event
+        loop, with at most ``max_concurrency`` in flight at once.
+
+        Args:
+            requests (List[Dict]): Keyword arguments for each `chat` call
+                (``model``, ``messages``, ``max_tokens``, ...). ``stream`` is not allowed.
+            max_concurrency (int): Maximum number of requests in flight at once. Default is 16.
+            ordered (bool): If True, block until the whole batch is done and return
+                results in input order. If False, return an iterator yielding results
+                as they complete. Default is True.
+
+        Returns:
+            Union[List[BatchResult], Iterator[BatchResult]]: One ``BatchResult`` per
+                request. Failed requests carry their exception in ``error`` instead of
+                aborting the batch.
+
+        Raises:
+            ValueError: If ``max_concurrency`` is less than 1 or a request sets ``stream``.
+
+        Usage:
+            results = client.llm.chat_many(
+                [{"model": TEE_LLM.CLAUDE_HAIKU_4_5, "messages": [...]} for ... in ...],
+                max_concurrency=32,
+            )
+            for result in results:
+                print(result.output.chat_output if result.ok else result.error)
+        """
+        return self._run_many(self._async_llm.chat, requests, max_concurrency, ordered)
+
+    def completion_many(
+        self,
+        requests: List[Dict],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """
+        Run many completion requests concurrently.
+
+        Same as `chat_many`, with each entry in ``requests`` holding keyword
+        arguments for `completion`.
+        """
+        return self._run_many(self._async_llm.completion, requests, max_concurrency, ordered)
+
+    def _run_many(
+        self,
+        fn: Callable[..., Awaitable[TextGenerationOutput]],
+        requests: List[Dict],
+        max_concurrency: int,
+        ordered: bool,
+    ) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        if ordered:
+            return self._run_coroutine(self._async_llm._run_many(fn, requests, max_concurrency, ordered=True))
+        results = self._run_coroutine(self._async_llm._run_many(fn, requests, max_concurrency, ordered=False))
+        return self._iterate_async(results)
+
+    def _iterate_async(self, async_iterator: AsyncIterator) -> Iterator:
         """
+        Drive an async iterator on the background loop and yield its items in the calling thread.
+
+        At most ``stream_buffer_size`` items are buffered. When the consumer falls
+        behind, the producer stops pulling from ``async_iterator``, which for an
+        HTTP stream stops reading from the socket. When the consumer stops early
+        (``break``, an exception, or the generator being garbage-collected),
+        ``async_iterator`` is closed on the loop before this generator returns,
+        so its connection goes back to the pool right away.
+        """
+        if self._closed:
+            raise OpenGradientError("LLM client is closed.")
+
         queue = Queue()
         sentinel = object()
+        credits = asyncio.Semaphore(self._stream_buffer_size)
+        drained = threading.Event()
 
-        async def _stream():
+        async def _drain():
             try:
-                async for chunk in self._tee_llm_chat_stream_async(
-                    model=model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    stop_sequence=stop_sequence,
-                    temperature=temperature,
-                    tools=tools,
-                    tool_choice=tool_choice,
-                    x402_settlement_mode=x402_settlement_mode,
-                ):
-                    queue.put(chunk)
+                async for item in async_iterator:
+                    await credits.acquire()
+                    queue.put(item)
             except Exception as e:
                 queue.put(e)
             finally:
-                queue.put(sentinel)
+                try:
+                    aclose = getattr(async_iterator, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
+                finally:
+                    queue.put(sentinel)
+                    drained.set()
 
-        future = asyncio.run_coroutine_threadsafe(_stream(), self._loop)
+        future = asyncio.run_coroutine_threadsafe(_drain(), self._loop)
 
         try:
             while True:
-                chunk = queue.get()
-                if chunk is sentinel:
+                item = queue.get()
+                if item is sentinel:
                     break
-                if isinstance(chunk, Exception):
-                    raise chunk
-                yield chunk
-        except Exception:
-            if not future.done():
-                future.cancel()
-            raise
+                if isinstance(item, Exception):
+                    raise item
+                self._loop.call_soon_threadsafe(credits.release)
+                yield item
         finally:
             if not future.done():
                 future.cancel()
-
-    async def _tee_llm_chat_stream_async(
-        self,
-        model: str,
-        messages: List[Dict],
-        max_tokens: int = 100,
-        stop_sequence: Optional[List[str]] = None,
-        temperature: float = 0.0,
-        tools: Optional[List[Dict]] = None,
-        tool_choice: Optional[str] = None,
-        x402_settlement_mode: x402SettlementMode = x402SettlementMode.SETTLE_BATCH,
-    ):
-        """
-        Internal async streaming implementation for TEE LLM with x402 payments.
-
-        Yields StreamChunk objects as they arrive from the server.
-        """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {X402_PLACEHOLDER_API_KEY}",
-            "X-SETTLEMENT-TYPE": x402_settlement_mode.value,
-        }
-
-        payload = {
-            "model": model,
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "stream": True,
-        }
-
-        if stop_sequence:
-            payload["stop"] = stop_sequence
-        if tools:
-            payload["tools"] = tools
-            payload["tool_choice"] = tool_choice or "auto"
-
-        async def _parse_sse_response(response) -> AsyncGenerator[StreamChunk, None]:
-            status_code = getattr(response, "status_code", None)
-            if status_code is not None and status_code >= 400:
-                body = await response.aread()
-                body_text = body.decode("utf-8", errors="replace")
-                raise OpenGradientError(f"TEE LLM streaming request failed with status {status_code}: {body_text}")
-
-            buffer = b""
-            async for chunk in response.aiter_raw():
-                if not chunk:
-                    continue
-
-                buffer += chunk
-
-                while b"\n" in buffer:
-                    line_bytes, buffer = buffer.split(b"\n", 1)
-
-                    if not line_bytes.strip():
-                        continue
-
-                    try:
-                        line = line_bytes.decode("utf-8").strip()
-                    except UnicodeDecodeError:
-                        continue
-
-                    if not line.startswith("data: "):
-                        continue
-
-                    data_str = line[6:]
-                    if data_str.strip() == "[DONE]":
-                        return
-
-                    try:
-                        data = json.loads(data_str)
-                        yield StreamChunk.from_sse_data(data)
-                    except json.JSONDecodeError:
-                        continue
-
-        endpoint = "/v1/chat/completions"
-        async with self._stream_client.stream(
-            "POST",
-            self._og_llm_streaming_server_url + endpoint,
-            json=payload,
-            headers=headers,
-            timeout=60,
-        ) as response:
-            async for parsed_chunk in _parse_sse_response(response):
-                yield parsed_chunk
+                # Don't block the loop thread if the generator is finalized there
+                if threading.current_thread() is not self._loop_thread:
+                    drained.wait(STREAM_CLOSE_TIMEOUT)
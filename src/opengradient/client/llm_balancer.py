@@ -0,0 +1,330 @@
+"""Load balancing of TEE LLM requests across several server endpoints."""
+
+import asyncio
+import dataclasses
+import random
+import threading
+import time
+from enum import Enum
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from ..types import ConnectionPoolStats, EndpointStats
+
+
+class RoutingStrategy(str, Enum):
+    """
+    How `EndpointBalancer` picks an endpoint for the next request.
+
+    Attributes:
+        LEAST_OUTSTANDING: The healthy endpoint with the fewest requests in flight.
+        EWMA_LATENCY: The healthy endpoint with the lowest moving-average time
+            to response headers, weighted by its requests in flight.
+    """
+
+    LEAST_OUTSTANDING = "least_outstanding"
+    EWMA_LATENCY = "ewma_latency"
+
+
+@dataclasses.dataclass(frozen=True)
+class BalancingPolicy:
+    """
+    Routing, ejection and health-check settings for multi-endpoint LLM clients.
+
+    An endpoint is ejected (receives no traffic) after ``eject_after``
+    consecutive failures, where a failure is a transport error, a 5xx
+    response or a failed health check. It stays ejected for
+    ``ejection_time`` seconds or until a health check succeeds. When every
+    endpoint is ejected, requests go to the one whose ejection ends first
+    rather than failing outright.
+
+    Attributes:
+        strategy: How the next endpoint is picked.
+        ewma_alpha: Weight of the newest sample in the latency moving average.
+        failure_penalty: Latency in seconds recorded into the moving average for a failed request.
+        eject_after: Consecutive failures that eject an endpoint.
+        ejection_time: Seconds an endpoint stays ejected without a successful health check.
+        health_check_interval: Seconds between background health checks of every
+            endpoint, or None to rely on request outcomes only.
+        health_check_path: Path probed with a GET; any response below 500 counts as healthy.
+        health_check_timeout: Timeout in seconds of one health check.
+    """
+
+    strategy: RoutingStrategy = RoutingStrategy.LEAST_OUTSTANDING
+    ewma_alpha: float = 0.3
+    failure_penalty: float = 10.0
+    eject_after: int = 3
+    ejection_time: float = 30.0
+    health_check_interval: Optional[float] = 10.0
+    health_check_path: str = "/health"
+    health_check_timeout: float = 2.0
+
+    def __post_init__(self):
+        if not 0 < self.ewma_alpha <= 1:
+            raise ValueError("ewma_alpha must be in (0, 1].")
+        if self.eject_after < 1:
+            raise ValueError("eject_after must be at least 1.")
+
+
+DEFAULT_BALANCING_POLICY = BalancingPolicy()
+
+
+class _EndpointState:
+    __slots__ = ("url", "outstanding", "ewma", "consecutive_failures", "ejected_until", "requests", "failures", "ejections")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.ewma: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+
+
+class EndpointBalancer:
+    """
+    Health and load bookkeeping for a set of equivalent TEE LLM endpoints.
+
+    The balancer only decides where requests go; `BalancingTransport` sends
+    them. It is thread-safe so that ``client.llm`` and ``client.llm_async``,
+    which run on different event loops, share one view of the endpoints.
+    """
+
+    def __init__(self, urls: List[str], policy: BalancingPolicy = DEFAULT_BALANCING_POLICY):
+        if not urls:
+            raise ValueError("At least one endpoint URL is required.")
+        self.policy = policy
+        self._endpoints = {url: _EndpointState(url) for url in dict.fromkeys(url.rstrip("/") for url in urls)}
+        self._lock = threading.Lock()
+        self._prober: Optional["asyncio.Future[None]"] = None
+
+    @property
+    def urls(self) -> List[str]:
+        return list(self._endpoints)
+
+    def choose(self) -> str:
+        """Return the URL of the endpoint the next request should go to."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self._endpoints.values() if e.ejected_until <= now]
+            if not candidates:
+                # Fail open: an endpoint that may have recovered beats no endpoint at all
+                return min(self._endpoints.values(), key=lambda e: e.ejected_until).url
+            return min(candidates, key=self._score).url
+
+    def _score(self, endpoint: _EndpointState) -> Tuple[float, int, float]:
+        if self.policy.strategy == RoutingStrategy.EWMA_LATENCY:
+            # Unmeasured endpoints score 0 so they are tried early
+            load = (endpoint.ewma or 0.0) * (endpoint.outstanding + 1)
+        else:
+            load = endpoint.outstanding
+        # Random tie-break spreads requests over equally loaded endpoints
+        return load, endpoint.consecutive_failures, random.random()
+
+    def started(self, url: str) -> None:
+        """Record that a request to ``url`` was sent."""
+        with self._lock:
+            endpoint = self._endpoints[url]
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+
+    def responded(self, url: str, latency: float, ok: bool) -> None:
+        """Record the outcome of a request to ``url`` once its response headers arrived (or it failed)."""
+        with self._lock:
+            endpoint = self._endpoints[url]
+            self._record_latency(endpoint, latency if ok else max(latency, self.policy.failure_penalty))
+            if ok:
+                endpoint.consecutive_failures = 0
+            else:
+                self._record_failure(endpoint)
+
+    def finished(self, url: str) -> None:
+        """Record that a request to ``url`` is no longer in flight (its response was closed)."""
+        with self._lock:
+            self._endpoints[url].outstanding -= 1
+
+    def health_checked(self, url: str, ok: bool) -> None:
+        """Record a health check result; a passing check reinstates an ejected endpoint."""
+        with self._lock:
+            endpoint = self._endpoints[url]
+            if ok:
+                endpoint.consecutive_failures = 0
+                endpoint.ejected_until = 0.0
+            else:
+                self._record_failure(endpoint)
+
+    def _record_latency(self, endpoint: _EndpointState, latency: float) -> None:
+        alpha = self.policy.ewma_alpha
+        endpoint.ewma = latency if endpoint.ewma is None else alpha * latency + (1 - alpha) * endpoint.ewma
+
+    def _record_failure(self, endpoint: _EndpointState) -> None:
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        now = time.monotonic()
+        if endpoint.consecutive_failures >= self.policy.eject_after and endpoint.ejected_until <= now:
+            endpoint.ejected_until = now + self.policy.ejection_time
+            endpoint.ejections += 1
+
+    def start_health_checks(self, start: Callable[[], "asyncio.Future[None]"]) -> Optional["asyncio.Future[None]"]:
+        """
+        Call ``start`` to launch the health check task unless one is already
+        running (e.g. on another fork's event loop), and return the new task.
+        """
+        with self._lock:
+            if self._prober is not None and not self._prober.done():
+                return None
+            self._prober = start()
+            return self._prober
+
+    def stats(self) -> Dict[str, EndpointStats]:
+        """Return a snapshot of every endpoint's health and load, keyed by URL."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                endpoint.url: EndpointStats(
+                    url=endpoint.url,
+                    healthy=endpoint.ejected_until <= now,
+                    outstanding=endpoint.outstanding,
+                    ewma_latency=endpoint.ewma,
+                    requests=endpoint.requests,
+                    failures=endpoint.failures,
+                    ejections=endpoint.ejections,
+                )
+                for endpoint in self._endpoints.values()
+            }
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that calls ``on_close`` exactly once when closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close: Optional[Callable[[], None]] = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                on_close, self._on_close = self._on_close, None
+                on_close()
+
+
+class BalancingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport that sends each request to the endpoint chosen by an `EndpointBalancer`.
+
+    Requests are built against ``base_url`` (any one of the endpoints); the
+    transport swaps that prefix for the chosen endpoint's URL. Every endpoint
+    has its own transport stack (x402 payment handling over a connection pool
+    with that server's pinned certificate), so the paid retry of a 402
+    challenge and ``upto`` sessions stay on the server that issued them.
+
+    Args:
+        balancer: Shared endpoint bookkeeping.
+        base_url: URL prefix the requests are built against.
+        transports: Transport to send through for each endpoint URL.
+        pools: Connection pool of each endpoint, used for health checks and `stats`.
+        health_checks: Whether this transport runs the background health checks.
+    """
+
+    def __init__(
+        self,
+        balancer: EndpointBalancer,
+        base_url: str,
+        transports: Dict[str, httpx.AsyncBaseTransport],
+        pools: Dict[str, httpx.AsyncBaseTransport],
+        health_checks: bool = False,
+    ):
+        self._balancer = balancer
+        self._base_url = base_url.rstrip("/")
+        self._transports = transports
+        self._pools = pools
+        self._health_checks = health_checks and balancer.policy.health_check_interval is not None
+        self._probe_task: Optional["asyncio.Future[None]"] = None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._health_checks and self._probe_task is None:
+            # Takes over when the transport that was probing has been closed
+            self._probe_task = self._balancer.start_health_checks(lambda: asyncio.ensure_future(self._probe_loop()))
+
+        url = self._balancer.choose()
+        routed = self._route(request, url)
+
+        self._balancer.started(url)
+        start = time.monotonic()
+        try:
+            response = await self._transports[url].handle_async_request(routed)
+        except BaseException:
+            self._balancer.responded(url, time.monotonic() - start, ok=False)
+            self._balancer.finished(url)
+            raise
+        self._balancer.responded(url, time.monotonic() - start, ok=response.status_code < 500)
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, lambda: self._balancer.finished(url)),
+            extensions=response.extensions,
+        )
+
+    def _route(self, request: httpx.Request, url: str) -> httpx.Request:
+        target = str(request.url)
+        if target.startswith(self._base_url):
+            target = url + target[len(self._base_url):]
+        headers = [(name, value) for name, value in request.headers.raw if name.lower() != b"host"]
+        return httpx.Request(request.method, target, headers=headers, content=request.content, extensions=request.extensions)
+
+    async def _probe_loop(self) -> None:
+        policy = self._balancer.policy
+        while True:
+            await asyncio.sleep(policy.health_check_interval)
+            await asyncio.gather(*(self._probe(url) for url in self._pools))
+
+    async def _probe(self, url: str) -> None:
+        policy = self._balancer.policy
+        timeout = policy.health_check_timeout
+        request = httpx.Request(
+            "GET",
+            url + policy.health_check_path,
+            extensions={"timeout": {"connect": timeout, "read": timeout, "write": timeout, "pool": timeout}},
+        )
+        try:
+            response = await self._pools[url].handle_async_request(request)
+            try:
+                # Read the body so the connection can go back to the pool
+                await response.aread()
+                ok = response.status_code < 500
+            finally:
+                await response.aclose()
+        except Exception:
+            ok = False
+        self._balancer.health_checked(url, ok)
+
+    def stats(self) -> ConnectionPoolStats:
+        """Connection pool statistics summed over all endpoints."""
+        per_endpoint = [pool.stats() for pool in self._pools.values()]
+        limits = [stats.max_connections for stats in per_endpoint]
+        return ConnectionPoolStats(
+            active_connections=sum(stats.active_connections for stats in per_endpoint),
+            idle_connections=sum(stats.idle_connections for stats in per_endpoint),
+            queued_requests=sum(stats.queued_requests for stats in per_endpoint),
+            pool_waits=sum(stats.pool_waits for stats in per_endpoint),
+            requests=sum(stats.requests for stats in per_endpoint),
+            max_connections=None if None in limits else sum(limits),
+            http2=all(stats.http2 for stats in per_endpoint),
+        )
+
+    async def aclose(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        for transport in self._transports.values():
+            await transport.aclose()
@@ -0,0 +1,289 @@
+"""Opt-in response cache for deterministic (``temperature=0``) LLM requests."""
+
+import asyncio
+import copy
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from ..types import TextGenerationOutput, x402SettlementMode
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024  # 256 MiB
+
+# Stored with every disk entry; entries written for a different set of TextGenerationOutput fields are misses
+_ENTRY_FORMAT = ",".join(field.name for field in dataclasses.fields(TextGenerationOutput))
+
+# The running size total is kept by triggers so that every process sharing the file sees the same value
+_SCHEMA = """
+BEGIN;
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_responses_accessed ON llm_responses (accessed);
+CREATE INDEX IF NOT EXISTS llm_responses_created ON llm_responses (created);
+CREATE TABLE IF NOT EXISTS llm_responses_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL);
+INSERT OR IGNORE INTO llm_responses_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM llm_responses;
+CREATE TRIGGER IF NOT EXISTS llm_responses_insert AFTER INSERT ON llm_responses
+BEGIN UPDATE llm_responses_size SET total = total + NEW.size WHERE id = 0; END;
+CREATE TRIGGER IF NOT EXISTS llm_responses_update AFTER UPDATE OF size ON llm_responses
+BEGIN UPDATE llm_responses_size SET total = total - OLD.size + NEW.size WHERE id = 0; END;
+CREATE TRIGGER IF NOT EXISTS llm_responses_delete AFTER DELETE ON llm_responses
+BEGIN UPDATE llm_responses_size SET total = total - OLD.size WHERE id = 0; END;
+COMMIT;
+"""
+
+
+def request_key(endpoint: str, payload: Dict, x402_settlement_mode: x402SettlementMode) -> str:
+    """
+    Return a canonical hash identifying an LLM request.
+
+    Two requests get the same key exactly when they hit the same endpoint with
+    the same JSON payload (model, messages/prompt, tools, tool_choice,
+    max_tokens, stop, temperature, ...) and settlement mode, regardless of
+    dict key order.
+    """
+    canonical = json.dumps(
+        {"endpoint": endpoint, "payload": payload, "settlement": x402_settlement_mode.value},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """Hit/miss counters for an `LLMResponseCache`."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of ``TextGenerationOutput`` objects for deterministic LLM calls.
+
+    Only non-streaming requests with ``temperature=0`` are cached. Entries are
+    keyed by `request_key`, so any change to the model, messages, tools,
+    tool_choice, max_tokens, stop sequences or settlement mode is a miss.
+    Cached outputs keep their original ``tee_signature`` and ``tee_timestamp``,
+    so provenance of a cache hit is the provenance of the original response.
+
+    The first tier is an in-memory LRU. The optional second tier is a SQLite
+    file that survives restarts and can be shared between processes; it is
+    trimmed to ``max_disk_bytes`` by evicting the least recently used entries.
+
+    The cache is thread-safe and may be shared between ``client.llm`` and
+    ``client.llm_async``. The LLM clients use ``aget``/``aput``, which serve
+    the memory tier inline and run disk I/O in a worker thread so the event
+    loop never waits on SQLite.
+
+    Usage:
+        from opengradient.client.llm_cache import LLMResponseCache
+
+        cache = LLMResponseCache(max_entries=4096, disk_path="~/.cache/opengradient/llm.sqlite", ttl=24 * 3600)
+        client = og.Client(private_key="0x...", llm_cache=cache)
+        client.llm.chat(model=og.TEE_LLM.GPT_5, messages=[...], temperature=0.0)  # paid
+        client.llm.chat(model=og.TEE_LLM.GPT_5, messages=[...], temperature=0.0)  # served from cache
+        print(cache.stats.hit_rate)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_path: Optional[Union[str, Path]] = None,
+        ttl: Optional[float] = None,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of outputs kept in memory. ``0`` disables the memory tier.
+            disk_path: Path of a SQLite file for the persistent tier. Disabled when None.
+            ttl: Seconds after which an entry expires in both tiers. Never expires when None.
+            max_disk_bytes: Approximate size limit of the stored payloads in the disk tier.
+        """
+        if max_entries < 0:
+            raise ValueError("max_entries must be non-negative.")
+
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, TextGenerationOutput]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+        # Separate from _lock so memory lookups never wait on disk I/O
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path is not None:
+            path = Path(disk_path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[TextGenerationOutput]:
+        """Return a copy of the cached output for ``key``, or None on a miss."""
+        now = time.time()
+        output = self._memory_get(key, now)
+        if output is not None:
+            return output
+        return self._load(key, now)
+
+    async def aget(self, key: str) -> Optional[TextGenerationOutput]:
+        """Async version of `get`; a disk lookup runs in a worker thread."""
+        now = time.time()
+        output = self._memory_get(key, now)
+        if output is not None:
+            return output
+        if self._db is None:
+            return self._load(key, now)
+        return await asyncio.to_thread(self._load, key, now)
+
+    def put(self, key: str, output: TextGenerationOutput) -> None:
+        """Store ``output`` under ``key`` in all enabled tiers."""
+        now = time.time()
+        output = self._store(key, output, now)
+        self._disk_put(key, output, now)
+
+    async def aput(self, key: str, output: TextGenerationOutput) -> None:
+        """Async version of `put`; the disk write runs in a worker thread."""
+        now = time.time()
+        output = self._store(key, output, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_put, key, output, now)
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_responses")
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _memory_get(self, key: str, now: float) -> Optional[TextGenerationOutput]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created, output = entry
+            if self._expired(created, now):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return copy.deepcopy(output)
+
+    def _load(self, key: str, now: float) -> Optional[TextGenerationOutput]:
+        """Look ``key`` up in the disk tier and promote a hit into memory."""
+        disk_entry = self._disk_get(key, now)
+        with self._lock:
+            if disk_entry is None:
+                self.stats.misses += 1
+                return None
+            created, output = disk_entry
+            self.stats.disk_hits += 1
+            self._memory_put(key, output, created)
+            return copy.deepcopy(output)
+
+    def _store(self, key: str, output: TextGenerationOutput, now: float) -> TextGenerationOutput:
+        # Timing describes the original request, not a later cache hit
+        output = copy.deepcopy(dataclasses.replace(output, timing=None))
+        with self._lock:
+            self._memory_put(key, output, now)
+        return output
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self._ttl is not None and now - created > self._ttl
+
+    def _memory_put(self, key: str, output: TextGenerationOutput, created: float) -> None:
+        if self._max_entries == 0:
+            return
+        self._memory[key] = (created, output)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, TextGenerationOutput]]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+
+            row = self._db.execute("SELECT value, created FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            value, created = row
+            output = None if self._expired(created, now) else _decode_entry(value)
+            if output is None:
+                # Expired, or written by a version of the SDK whose outputs had other fields
+                self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+
+            self._db.execute("UPDATE llm_responses SET accessed = ? WHERE key = ?", (now, key))
+        return created, output
+
+    def _disk_put(self, key: str, output: TextGenerationOutput, now: float) -> None:
+        if self._db is None:
+            return
+
+        value = json.dumps({"format": _ENTRY_FORMAT, "output": dataclasses.asdict(output)})
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT INTO llm_responses (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, created = excluded.created, "
+                "accessed = excluded.accessed, size = excluded.size",
+                (key, value, now, now, len(value)),
+            )
+            self._evict_disk(now)
+
+    def _evict_disk(self, now: float) -> None:
+        if self._ttl is not None:
+            self._db.execute("DELETE FROM llm_responses WHERE created < ?", (now - self._ttl,))
+
+        # Maintained by triggers, so this stays a single-row read however large the table grows
+        (total,) = self._db.execute("SELECT total FROM llm_responses_size WHERE id = 0").fetchone()
+        if total <= self._max_disk_bytes:
+            return
+
+        excess = total - self._max_disk_bytes
+        freed = 0
+        stale = []
+        for key, size in self._db.execute("SELECT key, size FROM llm_responses ORDER BY accessed"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany("DELETE FROM llm_responses WHERE key = ?", stale)
+
+
+def _decode_entry(value: str) -> Optional[TextGenerationOutput]:
+    try:
+        entry = json.loads(value)
+        if not isinstance(entry, dict) or entry.get("format") != _ENTRY_FORMAT:
+            return None
+        return TextGenerationOutput(**entry["output"])
+    except (ValueError, TypeError, KeyError):
+        return None
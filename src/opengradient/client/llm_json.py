@@ -0,0 +1,402 @@
+"""Incremental parsing of JSON structured outputs from streamed LLM deltas."""
+
+import re
+from json import JSONDecodeError
+from json.decoder import scanstring
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..types import JSONEvent, StreamChunk
+from ._utils import aclose_stream, close_stream
+
+_WHITESPACE = " \t\r\n"
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+_NUMBER_CONTINUATION = re.compile(r"[-+.eE0-9]*")
+_LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+# A trailing backslash, unfinished \uXXXX escape or unpaired high surrogate of a string that is still being streamed
+_INCOMPLETE_ESCAPE = re.compile(r"(?<!\\)(?:\\\\)*(\\|\\u[0-9a-fA-F]{0,3}|\\u[dD][89abAB][0-9a-fA-F]{2}(\\u?[0-9a-fA-F]{0,3})?)$")
+
+# What the parser expects next inside an object or array
+_KEY_OR_END, _KEY, _COLON, _VALUE, _VALUE_OR_END, _COMMA_OR_END = range(6)
+
+
+class _Frame:
+    __slots__ = ("container", "is_object", "key", "expect")
+
+    def __init__(self, container: Union[Dict, List]):
+        self.container = container
+        self.is_object = isinstance(container, dict)
+        self.key: Optional[str] = None
+        self.expect = _KEY_OR_END if self.is_object else _VALUE_OR_END
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document fed in arbitrary pieces, such as the text deltas
+    of a streamed chat response, without re-parsing what was already seen.
+    A string or number split over many deltas is only scanned for its end as
+    each delta arrives, and joined and decoded once it is complete, so the
+    total work is linear in the length of the text.
+
+    ``feed`` returns a `JSONEvent` for every value that was completed by the
+    new text, down to ``max_depth`` levels below the root: with the default
+    of 1, each top-level object member or array element is reported as soon
+    as it is closed. Completing the whole document yields a final event with
+    the empty path. ``partial()`` returns the document as parsed so far.
+
+    Models often wrap JSON in prose or Markdown fences, so by default any
+    text before the first ``{`` or ``[`` and after the end of the document
+    is ignored.
+
+    Args:
+        max_depth: Deepest level whose completed values are reported.
+        skip_prefix: Ignore text before the first ``{`` or ``[``. Disable to
+            accept a scalar at the root.
+
+    Usage:
+        parser = IncrementalJSONParser()
+        for chunk in stream:
+            for event in parser.feed(chunk.choices[0].delta.content or ""):
+                print(event.path, event.value)
+        parser.close()
+    """
+
+    def __init__(self, max_depth: int = 1, skip_prefix: bool = True):
+        self.max_depth = max_depth
+        self.skip_prefix = skip_prefix
+        self.done = False
+        self.value: Any = None
+        self._root: Any = None
+        self._stack: List[_Frame] = []
+        # Unconsumed text; everything before it has been parsed into _root
+        self._buffer = ""
+        # Deltas received while the token at the start of _buffer cannot have ended yet
+        self._pending: List[str] = []
+        # "string" or "number" while the buffer ends inside such a token, else None
+        self._open_token: Optional[str] = None
+        # Whether the next character of an unterminated string is escaped
+        self._escaped = False
+        # Decoded prefix of an unterminated string for partial(), the raw text after it,
+        # and how many pending deltas it covers; reset whenever the buffer is parsed
+        self._decoded: Optional[str] = None
+        self._undecoded = ""
+        self._decoded_deltas = 0
+        self._events: List[JSONEvent] = []
+
+    def feed(self, text: str) -> List[JSONEvent]:
+        """
+        Parse the next piece of the document.
+
+        Returns:
+            The values completed by ``text``, innermost first.
+
+        Raises:
+            json.JSONDecodeError: If the text cannot be part of a valid JSON document.
+        """
+        if self.done or not text:
+            return []
+        if self._open_token is not None and not self._ends_token(text):
+            self._pending.append(text)
+            return []
+        self._pending.append(text)
+        self._parse(final=False)
+        events, self._events = self._events, []
+        return events
+
+    def _ends_token(self, text: str) -> bool:
+        """Return whether ``text`` may end the token open at the end of the buffer, scanning only ``text``."""
+        if self._open_token == "number":
+            return _NUMBER_CONTINUATION.fullmatch(text) is None
+        search = 0
+        while True:
+            quote = text.find('"', search)
+            if quote == -1:
+                break
+            backslashes = _backslashes_before(text, quote)
+            escaped = backslashes % 2 == 1 if backslashes < quote else (backslashes + self._escaped) % 2 == 1
+            if not escaped:
+                return True
+            search = quote + 1
+        trailing = _backslashes_before(text, len(text))
+        self._escaped = (trailing + self._escaped) % 2 == 1 if trailing == len(text) else trailing % 2 == 1
+        return False
+
+    def close(self) -> List[JSONEvent]:
+        """
+        Signal the end of the text and return the last completed values.
+
+        Raises:
+            json.JSONDecodeError: If the document is incomplete.
+        """
+        if not self.done:
+            self._parse(final=True)
+            if not self.done:
+                raise JSONDecodeError("Unterminated JSON document", self._buffer, len(self._buffer))
+        events, self._events = self._events, []
+        return events
+
+    def partial(self) -> Any:
+        """
+        Return the document parsed so far. Open objects and arrays contain
+        their completed members, and a string value still being streamed is
+        included as far as it has arrived. Returns None before the document
+        has started.
+
+        The open objects and arrays are copies, but completed values (and the
+        whole document once it is done) are shared with the parser, so they
+        are not walked again on every call and must be treated as read-only.
+        """
+        if self.done:
+            return self.value
+        if not self._stack:
+            return None
+        copies = [dict(frame.container) if frame.is_object else list(frame.container) for frame in self._stack]
+        for frame, copy, child in zip(self._stack, copies, copies[1:]):
+            # Each open container is the last value attached to its parent
+            if frame.is_object:
+                copy[frame.key] = child
+            else:
+                copy[-1] = child
+        frame = self._stack[-1]
+        if frame.expect in (_VALUE, _VALUE_OR_END) and self._buffer.startswith('"'):
+            text = self._partial_string()
+            if text is not None:
+                if frame.is_object:
+                    copies[-1][frame.key] = text
+                else:
+                    copies[-1].append(text)
+        return copies[0]
+
+    def _partial_string(self) -> Optional[str]:
+        """Decode the string being streamed, continuing from where the previous call stopped."""
+        if self._decoded is None:
+            self._decoded, self._undecoded, self._decoded_deltas = "", self._buffer[1:], 0
+        raw = self._undecoded + "".join(self._pending[self._decoded_deltas :])
+        incomplete = _INCOMPLETE_ESCAPE.search(raw)
+        split = incomplete.start(1) if incomplete is not None else len(raw)
+        try:
+            decoded = scanstring(f'"{raw[:split]}"', 1, False)[0]
+        except (JSONDecodeError, ValueError):
+            return None
+        self._decoded += decoded
+        self._undecoded = raw[split:]
+        self._decoded_deltas = len(self._pending)
+        return self._decoded
+
+    def _parse(self, final: bool) -> None:
+        buffer = "".join([self._buffer, *self._pending])
+        self._pending = []
+        self._open_token = None
+        self._decoded = None
+        pos, end = 0, len(buffer)
+        try:
+            while pos < end:
+                char = buffer[pos]
+                if char in _WHITESPACE:
+                    pos += 1
+                    continue
+                if self.done:
+                    # Trailing text, e.g. a closing Markdown fence
+                    pos = end
+                    break
+
+                frame = self._stack[-1] if self._stack else None
+                expect = frame.expect if frame is not None else _VALUE
+
+                if frame is None and self.skip_prefix and char not in "{[":
+                    pos += 1
+                elif expect in (_KEY_OR_END, _KEY):
+                    if char == "}" and expect == _KEY_OR_END:
+                        pos += 1
+                        self._close_container()
+                    elif char == '"':
+                        if self._string_end(buffer, pos) is None:
+                            self._open_string(buffer, pos)
+                            break
+                        frame.key, pos = scanstring(buffer, pos + 1, False)
+                        frame.expect = _COLON
+                    else:
+                        raise JSONDecodeError("Expecting property name enclosed in double quotes", buffer, pos)
+                elif expect == _COLON:
+                    if char != ":":
+                        raise JSONDecodeError("Expecting ':' delimiter", buffer, pos)
+                    pos += 1
+                    frame.expect = _VALUE
+                elif expect == _COMMA_OR_END:
+                    if char == ",":
+                        frame.expect = _KEY if frame.is_object else _VALUE
+                    elif char == ("}" if frame.is_object else "]"):
+                        self._close_container()
+                    else:
+                        raise JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                    pos += 1
+                elif char == "]" and expect == _VALUE_OR_END:
+                    pos += 1
+                    self._close_container()
+                elif char in "{[":
+                    pos += 1
+                    self._open_container({} if char == "{" else [])
+                elif char == '"':
+                    if self._string_end(buffer, pos) is None:
+                        self._open_string(buffer, pos)
+                        break
+                    value, pos = scanstring(buffer, pos + 1, False)
+                    self._complete(value)
+                else:
+                    scalar = self._scalar(buffer, pos, final)
+                    if scalar is None:
+                        # Literals are at most five characters, so only numbers are worth waiting on
+                        self._open_token = None if char in _LITERALS else "number"
+                        break
+                    value, pos = scalar
+                    self._complete(value)
+        finally:
+            self._buffer = buffer[pos:]
+
+    def _string_end(self, buffer: str, start: int) -> Optional[int]:
+        """Return the index of the quote closing the string opening at ``start``, or None if it has not arrived."""
+        search = start + 1
+        while True:
+            quote = buffer.find('"', search)
+            if quote == -1:
+                return None
+            if _backslashes_before(buffer, quote) % 2 == 0:
+                return quote
+            search = quote + 1
+
+    def _open_string(self, buffer: str, start: int) -> None:
+        # Later deltas are only searched for the closing quote until it arrives
+        self._open_token = "string"
+        self._escaped = _backslashes_before(buffer, len(buffer)) % 2 == 1
+
+    def _scalar(self, buffer: str, pos: int, final: bool) -> Optional[Tuple[Any, int]]:
+        char = buffer[pos]
+        literal = _LITERALS.get(char)
+        if literal is not None:
+            word, value = literal
+            if buffer.startswith(word, pos):
+                return value, pos + len(word)
+            if not final and word.startswith(buffer[pos:]):
+                return None
+            raise JSONDecodeError("Expecting value", buffer, pos)
+
+        if not final and _NUMBER_CONTINUATION.fullmatch(buffer, pos):
+            # The number may continue in the next delta
+            return None
+        match = _NUMBER.match(buffer, pos)
+        if match is None:
+            raise JSONDecodeError("Expecting value", buffer, pos)
+        token = match.group()
+        return (float(token) if any(c in token for c in ".eE") else int(token)), match.end()
+
+    def _attach(self, value: Any) -> Tuple[Union[str, int], ...]:
+        """Store ``value`` in the enclosing container and return its path."""
+        frame = self._stack[-1]
+        if frame.is_object:
+            frame.container[frame.key] = value
+            index: Union[str, int] = frame.key
+        else:
+            index = len(frame.container)
+            frame.container.append(value)
+        frame.expect = _COMMA_OR_END
+        return self._path() + (index,)
+
+    def _path(self) -> Tuple[Union[str, int], ...]:
+        # Each enclosing container's position in its parent, i.e. the key or index it was attached under
+        path = []
+        for parent in self._stack[:-1]:
+            path.append(parent.key if parent.is_object else len(parent.container) - 1)
+        return tuple(path)
+
+    def _open_container(self, container: Union[Dict, List]) -> None:
+        # Attached right away so partial() shows it while its members are streamed
+        if self._stack:
+            self._attach(container)
+        else:
+            self._root = container
+        self._stack.append(_Frame(container))
+
+    def _close_container(self) -> None:
+        frame = self._stack.pop()
+        if not self._stack:
+            self._finish(frame.container)
+            return
+        parent = self._stack[-1]
+        parent.expect = _COMMA_OR_END
+        path = self._path() + ((parent.key if parent.is_object else len(parent.container) - 1),)
+        if len(path) <= self.max_depth:
+            self._events.append(JSONEvent(path=path, value=frame.container))
+
+    def _complete(self, value: Any) -> None:
+        if not self._stack:
+            self._finish(value)
+            return
+        path = self._attach(value)
+        if len(path) <= self.max_depth:
+            self._events.append(JSONEvent(path=path, value=value))
+
+    def _finish(self, value: Any) -> None:
+        self.done = True
+        self.value = value
+        self._events.append(JSONEvent(path=(), value=value))
+
+
+def _backslashes_before(text: str, index: int) -> int:
+    count = 0
+    while count < index and text[index - 1 - count] == "\\":
+        count += 1
+    return count
+
+
+def _delta_text(chunk: StreamChunk) -> str:
+    return chunk.choices[0].delta.content or "" if chunk.choices else ""
+
+
+def json_events(stream: Iterable[StreamChunk], max_depth: int = 1, partial: bool = False) -> Iterator[JSONEvent]:
+    """
+    Parse the JSON document streamed as text deltas by ``stream`` and yield a
+    `JSONEvent` for each completed value (see `IncrementalJSONParser`). The
+    last event has the empty path and holds the whole document.
+
+    Stopping the iteration early (e.g. once the needed fields have arrived)
+    closes ``stream``, which cancels the request.
+
+    Args:
+        stream: Chunks of a streamed chat or completion response.
+        max_depth: Deepest level whose completed values are reported.
+        partial: Also yield a snapshot of the document after every delta that
+            changed it, as an event with ``complete=False`` and the empty path
+            (see `IncrementalJSONParser.partial`).
+
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON or the stream ends before the document does.
+    """
+    parser = IncrementalJSONParser(max_depth=max_depth)
+    try:
+        for chunk in stream:
+            text = _delta_text(chunk)
+            yield from parser.feed(text)
+            if partial and text and not parser.done:
+                yield JSONEvent(path=(), value=parser.partial(), complete=False)
+            if parser.done:
+                return
+        yield from parser.close()
+    finally:
+        close_stream(stream)
+
+
+async def ajson_events(stream: AsyncIterable[StreamChunk], max_depth: int = 1, partial: bool = False) -> AsyncIterator[JSONEvent]:
+    """Async version of `json_events`."""
+    parser = IncrementalJSONParser(max_depth=max_depth)
+    try:
+        async for chunk in stream:
+            text = _delta_text(chunk)
+            for event in parser.feed(text):
+                yield event
+            if partial and text and not parser.done:
+                yield JSONEvent(path=(), value=parser.partial(), complete=False)
+            if parser.done:
+                return
+        for event in parser.close():
+            yield event
+    finally:
+        await aclose_stream(stream)
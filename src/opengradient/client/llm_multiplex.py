@@ -0,0 +1,183 @@
+"""Fan-out of one upstream LLM stream to several identical subscribers."""
+
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Generic, List, Optional, Set, TypeVar
+
+from ..types import SingleFlightStats
+from .exceptions import OpenGradientError
+
+T = TypeVar("T")
+
+DEFAULT_REPLAY_SIZE = 4096
+DEFAULT_SUBSCRIBER_BUFFER_SIZE = 1024
+
+
+class _Subscriber(Generic[T]):
+    __slots__ = ("queue", "wakeup", "dropped")
+
+    def __init__(self):
+        self.queue: Deque[T] = deque()
+        self.wakeup = asyncio.Event()
+        self.dropped = False
+
+
+class _SharedStream(Generic[T]):
+    """One upstream stream, read by a pump task into each subscriber's buffer at the pace of the fastest subscriber."""
+
+    def __init__(self, multiplexer: "StreamMultiplexer", key: str, source: AsyncIterator[T]):
+        self._multiplexer = multiplexer
+        self._key = key
+        self._source = source
+        # Every chunk so far, replayed to late joiners; dropped once it outgrows the replay size
+        self.history: List[T] = []
+        self.joinable = True
+        self.subscribers: Set[_Subscriber[T]] = set()
+        self.done = False
+        self.error: Optional[BaseException] = None
+        # Set whenever a subscriber takes a chunk or leaves, waking a pump waiting for a reader
+        self.progress = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump())
+
+    async def _pump(self) -> None:
+        multiplexer = self._multiplexer
+        try:
+            async for item in self._source:
+                if self.joinable:
+                    if len(self.history) < multiplexer.replay_size:
+                        self.history.append(item)
+                    else:
+                        # A late joiner could no longer see the whole stream
+                        self.joinable = False
+                        self.history = []
+                        multiplexer._forget(self._key, self)
+                for subscriber in list(self.subscribers):
+                    if len(subscriber.queue) >= multiplexer.subscriber_buffer_size:
+                        # Drop the slow subscriber rather than stall everyone else
+                        subscriber.dropped = True
+                        self.subscribers.discard(subscriber)
+                        multiplexer.stats.dropped_subscribers += 1
+                    else:
+                        subscriber.queue.append(item)
+                    subscriber.wakeup.set()
+                await self._wait_for_reader()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self.joinable = False
+            multiplexer._forget(self._key, self)
+            for subscriber in self.subscribers:
+                subscriber.wakeup.set()
+            aclose = getattr(self._source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _wait_for_reader(self) -> None:
+        """Wait while every subscriber's buffer is full, so the upstream stream is not read faster than anyone consumes it."""
+        size = self._multiplexer.subscriber_buffer_size
+        while self.subscribers and all(len(subscriber.queue) >= size for subscriber in self.subscribers):
+            self.progress.clear()
+            await self.progress.wait()
+
+    def subscribe(self) -> AsyncIterator[T]:
+        # Registered before the first read, so no chunk falls between the replay and the live buffer
+        subscriber: _Subscriber[T] = _Subscriber()
+        replay = list(self.history)
+        self.subscribers.add(subscriber)
+        return self._read(subscriber, replay)
+
+    async def _read(self, subscriber: _Subscriber[T], replay: List[T]) -> AsyncIterator[T]:
+        try:
+            for item in replay:
+                yield item
+            while True:
+                if subscriber.queue:
+                    item = subscriber.queue.popleft()
+                    self.progress.set()
+                    yield item
+                elif subscriber.dropped:
+                    raise OpenGradientError(
+                        f"Stream subscriber fell more than {self._multiplexer.subscriber_buffer_size} chunks behind and was dropped"
+                    )
+                elif self.done:
+                    if self.error is not None:
+                        # A fresh exception per subscriber, so tracebacks are not chained across tasks
+                        raise OpenGradientError(f"Shared upstream stream failed: {self.error}") from self.error
+                    return
+                else:
+                    subscriber.wakeup.clear()
+                    await subscriber.wakeup.wait()
+        finally:
+            self.subscribers.discard(subscriber)
+            self.progress.set()
+            if not self.subscribers and not self.done:
+                # Nobody is left to read the upstream stream; a cancelled stream must not be joined
+                self.joinable = False
+                self._multiplexer._forget(self._key, self)
+                self.task.cancel()
+
+
+class StreamMultiplexer:
+    """
+    Shares one upstream stream between identical concurrent streaming requests.
+
+    The first subscriber for a key opens the upstream stream, which a
+    background task reads into a replay buffer and into a bounded buffer per
+    subscriber. Later subscribers with the same key first replay the chunks
+    they missed, then follow live. The upstream stream is closed once every
+    subscriber has gone away.
+
+    The upstream stream is read at the pace of the fastest subscriber: it is
+    only paused while every subscriber has ``subscriber_buffer_size`` chunks
+    unread. A subscriber whose buffer is full when the next chunk arrives is
+    dropped right away (its iteration raises `OpenGradientError`), so that a
+    slow subscriber never stalls the others and no buffer grows past
+    ``subscriber_buffer_size``. Once a stream has produced more than
+    ``replay_size`` chunks it no longer accepts joiners, and the next
+    identical request opens a new upstream stream.
+
+    An upstream failure is raised in every subscriber as its own
+    `OpenGradientError`, chained to the original exception.
+
+    Chunks are shared between subscribers and must be treated as read-only.
+    Bound to the event loop it is first used on, like the HTTP clients of `AsyncLLM`.
+
+    Args:
+        replay_size: Maximum number of chunks kept for late joiners.
+        subscriber_buffer_size: Maximum number of chunks buffered for one subscriber.
+        stats: Counters to update; ``leaders`` counts upstream streams opened and
+            ``coalesced`` counts subscribers that joined an existing one.
+    """
+
+    def __init__(
+        self,
+        replay_size: int = DEFAULT_REPLAY_SIZE,
+        subscriber_buffer_size: int = DEFAULT_SUBSCRIBER_BUFFER_SIZE,
+        stats: Optional[SingleFlightStats] = None,
+    ):
+        if subscriber_buffer_size < 1:
+            raise ValueError("subscriber_buffer_size must be at least 1.")
+        self.replay_size = replay_size
+        self.subscriber_buffer_size = subscriber_buffer_size
+        self.stats = stats if stats is not None else SingleFlightStats()
+        self._streams: Dict[str, _SharedStream] = {}
+
+    def subscribe(self, key: str, open_stream: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Return an iterator over the stream for ``key``, joining the one in
+        flight or opening a new one with ``open_stream``. Must be called from
+        a running event loop.
+        """
+        shared = self._streams.get(key)
+        if shared is None or not shared.joinable:
+            shared = _SharedStream(self, key, open_stream())
+            self._streams[key] = shared
+            self.stats.leaders += 1
+        else:
+            self.stats.coalesced += 1
+        return shared.subscribe()
+
+    def _forget(self, key: str, shared: _SharedStream) -> None:
+        if self._streams.get(key) is shared:
+            del self._streams[key]
@@ -0,0 +1,180 @@
+"""Retry and request-hedging policies for TEE LLM calls."""
+
+import dataclasses
+import math
+import random
+import threading
+from collections import deque
+from typing import FrozenSet, Optional
+
+import httpx
+from x402v2.http import PAYMENT_RESPONSE_HEADER, PAYMENT_SIGNATURE_HEADER, X_PAYMENT_HEADER, X_PAYMENT_RESPONSE_HEADER
+
+from ._tls import is_certificate_error
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Failures that happen before any request bytes reach the server
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how often a failed LLM request is retried.
+
+    Retries are idempotency-aware with respect to x402 payments. An attempt
+    becomes *paid* once a request carrying a signed payment header
+    (``PAYMENT-SIGNATURE`` / ``X-PAYMENT``) has been handed to the connection
+    pool. With ``prepay`` (the default) this is every request after the
+    first one to an endpoint.
+
+    - Unpaid attempts are retried on connection errors, timeouts and the
+      ``retry_status_codes``.
+    - Paid attempts are retried on connection errors and pool timeouts,
+      which prove the request never reached the server.
+    - Paid attempts answered with one of the ``retry_status_codes`` are
+      retried only when the response has no settlement header
+      (``PAYMENT-RESPONSE`` / ``X-PAYMENT-RESPONSE``). x402 servers settle a
+      payment after serving the request and report it in that header, so a
+      rejection without one was not charged.
+    - Paid attempts that fail while the response is being read are not
+      retried, since the server may already have settled the payment.
+
+    Every retry negotiates a fresh payment.
+
+    Delays use exponential backoff with full jitter, and honour a numeric
+    ``Retry-After`` header up to ``max_backoff``.
+
+    Attributes:
+        max_attempts: Total attempts including the first one. ``1`` disables retries.
+        initial_backoff: Upper bound in seconds of the delay before the first retry.
+        max_backoff: Upper bound in seconds of any single delay.
+        multiplier: Growth factor of the backoff bound per retry.
+        retry_status_codes: HTTP status codes that are retried on unpaid attempts.
+    """
+
+    max_attempts: int = 3
+    initial_backoff: float = 0.25
+    max_backoff: float = 8.0
+    multiplier: float = 2.0
+    retry_status_codes: FrozenSet[int] = RETRYABLE_STATUS_CODES
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+
+    def is_retryable(self, error: BaseException, paid: bool) -> bool:
+        """Return True if an attempt that failed with ``error`` may be sent again."""
+        if is_certificate_error(error):
+            # Already handled by re-pinning; retrying with the same pin cannot succeed
+            return False
+        if _in_cause_chain(error, _CONNECT_ERRORS):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            if error.response.status_code not in self.retry_status_codes:
+                return False
+            return not paid or not _settled(error.response)
+        if paid:
+            return False
+        return _in_cause_chain(error, (httpx.TransportError,))
+
+    def backoff(self, retry: int, error: Optional[BaseException] = None) -> float:
+        """Return the delay in seconds before retry number ``retry`` (starting at 1)."""
+        bound = min(self.max_backoff, self.initial_backoff * self.multiplier ** (retry - 1))
+        delay = random.uniform(0, bound)
+
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = error.response.headers.get("Retry-After", "")
+            try:
+                delay = max(delay, min(float(retry_after), self.max_backoff))
+            except ValueError:
+                pass
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+@dataclasses.dataclass(frozen=True)
+class HedgePolicy:
+    """
+    Hedged requests: if a request has not answered after a delay derived from
+    recent latencies, send a second copy and use whichever answers first.
+
+    The hedge delay is the ``percentile`` of the last ``window`` successful
+    latencies for the same endpoint and model, so only the slowest
+    ``1 - percentile`` of requests are duplicated. The losing request is
+    cancelled; if it had already been paid for, its charge is not refunded.
+
+    Attributes:
+        percentile: Latency percentile after which the hedge is sent.
+        min_samples: Latencies needed before the percentile is trusted.
+        initial_delay: Hedge delay in seconds used until ``min_samples`` are collected.
+        min_delay: Lower bound in seconds of the hedge delay.
+        window: Number of recent latencies kept per endpoint and model.
+    """
+
+    percentile: float = 0.95
+    min_samples: int = 20
+    initial_delay: float = 5.0
+    min_delay: float = 0.05
+    window: int = 256
+
+    def __post_init__(self):
+        if not 0 < self.percentile < 1:
+            raise ValueError("percentile must be between 0 and 1.")
+
+
+class LatencyTracker:
+    """Sliding window of request latencies used to derive hedge delays."""
+
+    def __init__(self, window: int):
+        self._samples: "deque[float]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the nearest-rank ``q`` percentile, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+
+class Attempt:
+    """Per-attempt state shared with the transport through request extensions."""
+
+    EXTENSION = "opengradient.attempt"
+
+    __slots__ = ("paid",)
+
+    def __init__(self):
+        self.paid = False
+
+    def observe(self, request: httpx.Request) -> None:
+        """Mark the attempt as paid if ``request`` carries a payment signature."""
+        if PAYMENT_SIGNATURE_HEADER in request.headers or X_PAYMENT_HEADER in request.headers:
+            self.paid = True
+
+
+def _settled(response: httpx.Response) -> bool:
+    """Whether the server reported settling the payment of ``response``."""
+    return PAYMENT_RESPONSE_HEADER in response.headers or X_PAYMENT_RESPONSE_HEADER in response.headers
+
+
+def _in_cause_chain(error: Optional[BaseException], types) -> bool:
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, types):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
@@ -0,0 +1,450 @@
+"""Latency-adaptive routing of LLM requests over a set of interchangeable TEE models."""
+
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..types import TEE_LLM, ModelRouteStats, StreamChunk, TextGenerationOutput
+from ._utils import aclose_stream, cancel_losers
+from .exceptions import OpenGradientError
+
+if TYPE_CHECKING:
+    from .llm import LLM, AsyncLLM
+
+DEFAULT_ROUTER_STATE_PATH = Path.home() / ".cache" / "opengradient" / "model_router.json"
+
+_STATE_VERSION = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class RouterPolicy:
+    """
+    How `ModelRouter` scores and picks models.
+
+    Each model keeps exponentially weighted moving averages (EWMA) of its
+    time to first chunk (streaming requests), its total latency and its
+    error rate. A request goes to the model with the lowest expected
+    latency: the time to first chunk for streams and the total latency
+    otherwise, plus ``error_rate * failure_penalty``. Models without
+    samples score 0 so that each one is tried early.
+
+    Attributes:
+        ewma_alpha: Weight of the newest sample in the moving averages.
+        failure_penalty: Seconds added to a model's score per unit of error rate.
+        exploration: Probability of sending a request to a random other
+            candidate, so that the averages of models not currently chosen keep up.
+        max_age: Seconds after which persisted statistics are ignored on load.
+        save_interval: Minimum seconds between writes of the state file.
+    """
+
+    ewma_alpha: float = 0.2
+    failure_penalty: float = 10.0
+    exploration: float = 0.05
+    max_age: float = 3600.0
+    save_interval: float = 10.0
+
+    def __post_init__(self):
+        if not 0 < self.ewma_alpha <= 1:
+            raise ValueError("ewma_alpha must be in (0, 1].")
+        if not 0 <= self.exploration <= 1:
+            raise ValueError("exploration must be between 0 and 1.")
+
+
+DEFAULT_ROUTER_POLICY = RouterPolicy()
+
+
+class _ModelState:
+    __slots__ = ("ewma_ttft", "ewma_latency", "error_rate", "requests", "failures", "updated_at")
+
+    def __init__(self):
+        self.ewma_ttft: Optional[float] = None
+        self.ewma_latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.updated_at = 0.0
+
+
+class _ModelScores:
+    """Thread-safe per-model statistics, persisted to a JSON file shared by all routers."""
+
+    def __init__(self, models: Sequence[TEE_LLM], policy: RouterPolicy, state_path: Optional[Path]):
+        self.policy = policy
+        self.state_path = state_path
+        self._models = {model: _ModelState() for model in models}
+        self._lock = threading.Lock()
+        self._last_save = float("-inf")
+        self._dirty = False
+        self._saving = False
+        # Strong reference to the background save, which the event loop only holds weakly
+        self._save_task: Optional["asyncio.Future"] = None
+        self._load()
+
+    def ranking(self, streaming: bool) -> List[TEE_LLM]:
+        with self._lock:
+            # Random tie-break spreads requests over unmeasured or equally fast models
+            return sorted(self._models, key=lambda model: (self._score(self._models[model], streaming), random.random()))
+
+    def _score(self, state: _ModelState, streaming: bool) -> float:
+        latency = state.ewma_ttft if streaming and state.ewma_ttft is not None else state.ewma_latency
+        return (latency or 0.0) + state.error_rate * self.policy.failure_penalty
+
+    def record(self, model: TEE_LLM, ok: bool, ttft: Optional[float] = None, latency: Optional[float] = None) -> None:
+        alpha = self.policy.ewma_alpha
+
+        def ewma(previous: Optional[float], sample: float) -> float:
+            return sample if previous is None else alpha * sample + (1 - alpha) * previous
+
+        with self._lock:
+            state = self._models[model]
+            state.requests += 1
+            state.failures += 0 if ok else 1
+            state.error_rate = ewma(state.error_rate, 0.0 if ok else 1.0)
+            if ttft is not None:
+                state.ewma_ttft = ewma(state.ewma_ttft, ttft)
+            if latency is not None:
+                state.ewma_latency = ewma(state.ewma_latency, latency)
+            state.updated_at = time.time()
+            self._dirty = True
+            due = self.state_path is not None and not self._saving and time.monotonic() - self._last_save >= self.policy.save_interval
+            if due:
+                self._saving = True
+        if due:
+            self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        """Save in a worker thread when called from an event loop, so requests are not blocked on the file write."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._run_autosave()
+            return
+        self._save_task = loop.create_task(asyncio.to_thread(self._run_autosave))
+
+    def _run_autosave(self) -> None:
+        try:
+            self.autosave()
+        finally:
+            with self._lock:
+                self._saving = False
+
+    def stats(self) -> Dict[str, ModelRouteStats]:
+        with self._lock:
+            return {
+                model.value: ModelRouteStats(
+                    model=model.value,
+                    ewma_ttft=state.ewma_ttft,
+                    ewma_latency=state.ewma_latency,
+                    error_rate=state.error_rate,
+                    requests=state.requests,
+                    failures=state.failures,
+                )
+                for model, state in self._models.items()
+            }
+
+    def _read_file(self) -> Dict[str, Dict]:
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get("version") != _STATE_VERSION:
+            return {}
+        return state.get("models") or {}
+
+    def _load(self) -> None:
+        if self.state_path is None:
+            return
+        cutoff = time.time() - self.policy.max_age
+        records = self._read_file()
+        for model, state in self._models.items():
+            record = records.get(model.value)
+            if not record or record.get("updated_at", 0) < cutoff:
+                continue
+            state.ewma_ttft = record.get("ewma_ttft")
+            state.ewma_latency = record.get("ewma_latency")
+            state.error_rate = record.get("error_rate", 0.0)
+            state.requests = record.get("requests", 0)
+            state.failures = record.get("failures", 0)
+            state.updated_at = record["updated_at"]
+
+    def autosave(self) -> None:
+        """Save unsaved changes; a failed write is logged rather than failing the request that triggered it."""
+        try:
+            self.save(only_if_changed=True)
+        except OSError as e:
+            logging.warning("Could not save model router statistics to %s: %s", self.state_path, e)
+
+    def save(self, only_if_changed: bool = False) -> None:
+        if self.state_path is None:
+            return
+        with self._lock:
+            if only_if_changed and not self._dirty:
+                return
+            self._last_save = time.monotonic()
+            self._dirty = False
+            ours = {
+                model.value: {name: getattr(state, name) for name in _ModelState.__slots__}
+                for model, state in self._models.items()
+                if state.updated_at
+            }
+        # Keep the statistics of models routed by other routers; the last writer wins for shared models
+        records = {**self._read_file(), **ours}
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({"version": _STATE_VERSION, "models": records}))
+        os.replace(tmp_path, self.state_path)
+
+
+class AsyncModelRouter:
+    """
+    Sends each request to whichever of several interchangeable models is
+    currently fastest, learning from live time-to-first-chunk, latency and
+    error rates.
+
+    Statistics are saved to ``state_path`` after the first request, then at
+    most every ``policy.save_interval`` seconds, on ``save()`` and when the
+    interpreter exits. Saves triggered by requests run in a worker thread,
+    off the event loop. The next router using the same file loads them, so a
+    restarted process starts from what the previous one learned. Pass
+    ``state_path=None`` to keep them in memory.
+
+    With ``race=True`` a request is sent to the two best-ranked models at
+    once; the first to answer (for streams: the first to produce a chunk)
+    wins and the other request is cancelled. The cancelled request may
+    already have been paid for, so racing roughly doubles the cost of a call
+    in exchange for the lower latency of the two.
+
+    The model that served a request is in ``output.timing.model`` or
+    ``chunk.model``.
+
+    Args:
+        llm: Client that sends the requests, e.g. ``client.llm_async``.
+        models: Candidate models; any of them must be acceptable for every request.
+        state_path: JSON file the statistics are persisted to, or None.
+        policy: Scoring and persistence settings.
+
+    Usage:
+        router = AsyncModelRouter(
+            client.llm_async,
+            [TEE_LLM.GEMINI_2_5_FLASH, TEE_LLM.CLAUDE_HAIKU_4_5, TEE_LLM.GPT_5_MINI],
+        )
+        result = await router.chat(messages=[...], max_tokens=200)
+        stream = await router.chat(messages=[...], stream=True, race=True)
+    """
+
+    def __init__(
+        self,
+        llm: "AsyncLLM",
+        models: Sequence[TEE_LLM],
+        state_path: Optional[Union[str, Path]] = DEFAULT_ROUTER_STATE_PATH,
+        policy: RouterPolicy = DEFAULT_ROUTER_POLICY,
+    ):
+        models = list(dict.fromkeys(models))
+        if not models:
+            raise ValueError("At least one candidate model is required.")
+        self._llm = llm
+        self._scores = _ModelScores(models, policy, Path(state_path).expanduser() if state_path is not None else None)
+        # Unsaved statistics are written when the router is garbage-collected or the interpreter exits
+        weakref.finalize(self, self._scores.autosave)
+
+    def ranking(self, streaming: bool = False) -> List[TEE_LLM]:
+        """Return the candidate models from best to worst score for a streaming or non-streaming request."""
+        return self._scores.ranking(streaming)
+
+    def choose(self, streaming: bool = False) -> TEE_LLM:
+        """Return the model the next request should go to, occasionally exploring another candidate."""
+        ranking = self.ranking(streaming)
+        if len(ranking) > 1 and random.random() < self._scores.policy.exploration:
+            return random.choice(ranking[1:])
+        return ranking[0]
+
+    def stats(self) -> Dict[str, ModelRouteStats]:
+        """Return the current statistics of every candidate model, keyed by model name."""
+        return self._scores.stats()
+
+    def save(self) -> None:
+        """Write the statistics to the state file now."""
+        self._scores.save()
+
+    async def chat(
+        self, messages: List[Dict], stream: bool = False, race: bool = False, **kwargs
+    ) -> Union[TextGenerationOutput, AsyncIterator[StreamChunk]]:
+        """
+        Chat with the best-ranked model. Accepts the arguments of `AsyncLLM.chat` except ``model``.
+
+        Args:
+            messages: The messages that will be passed into the chat.
+            stream: Whether to stream the response.
+            race: Send the request to the two best-ranked models and keep the first to answer.
+
+        Raises:
+            OpenGradientError: If the inference fails (on both models when racing).
+        """
+        return await self._route(lambda model: self._llm.chat(model=model, messages=messages, stream=stream, **kwargs), stream, race)
+
+    async def completion(
+        self, prompt: str, stream: bool = False, race: bool = False, **kwargs
+    ) -> Union[TextGenerationOutput, AsyncIterator[StreamChunk]]:
+        """
+        Complete ``prompt`` with the best-ranked model. Accepts the arguments of `AsyncLLM.completion` except ``model``.
+
+        See `chat` for the routing arguments.
+        """
+        return await self._route(lambda model: self._llm.completion(model=model, prompt=prompt, stream=stream, **kwargs), stream, race)
+
+    async def _route(self, call: Callable[[TEE_LLM], Awaitable], stream: bool, race: bool):
+        models = self.ranking(stream)[:2] if race else [self.choose(stream)]
+        if stream:
+            return self._race_streams(call, models)
+        if len(models) == 1:
+            return await self._timed_call(call, models[0])
+
+        tasks = [asyncio.ensure_future(self._timed_call(call, model)) for model in models]
+        try:
+            error = None
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception as e:
+                    error = e
+            raise error
+        finally:
+            cancel_losers(tasks)
+
+    async def _timed_call(self, call: Callable[[TEE_LLM], Awaitable[TextGenerationOutput]], model: TEE_LLM) -> TextGenerationOutput:
+        start = time.monotonic()
+        try:
+            output = await call(model)
+        except Exception:
+            self._scores.record(model, ok=False)
+            raise
+        self._scores.record(model, ok=True, latency=time.monotonic() - start)
+        return output
+
+    async def _race_streams(self, call: Callable[[TEE_LLM], Awaitable[AsyncIterator[StreamChunk]]], models: List[TEE_LLM]) -> AsyncGenerator[StreamChunk, None]:
+        start = time.monotonic()
+        # Task reading the first chunk -> model and its stream
+        contenders: Dict["asyncio.Future", Tuple[TEE_LLM, AsyncIterator[StreamChunk]]] = {}
+        winner: Optional[Tuple[TEE_LLM, AsyncIterator[StreamChunk]]] = None
+        first_chunk: Optional[StreamChunk] = None
+        ttft = 0.0
+        try:
+            for model in models:
+                try:
+                    chunks = await call(model)
+                except Exception:
+                    self._scores.record(model, ok=False)
+                    continue
+                contenders[asyncio.ensure_future(_first(chunks))] = (model, chunks)
+            if not contenders:
+                raise OpenGradientError(f"Every routed model failed: {', '.join(model.value for model in models)}")
+
+            error: Optional[BaseException] = None
+            pending = set(contenders)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    model, chunks = contenders[task]
+                    if task.exception() is not None:
+                        error = task.exception()
+                        self._scores.record(model, ok=False)
+                    elif winner is None:
+                        # Taken before the losers are torn down, which is not part of the winner's latency
+                        ttft = time.monotonic() - start
+                        winner, first_chunk = (model, chunks), task.result()
+            if winner is None:
+                raise error
+        finally:
+            # Close every stream but the winner's, including when the caller gave up while waiting
+            losers = [(task, chunks) for task, (_, chunks) in contenders.items() if winner is None or chunks is not winner[1]]
+            for task, _ in losers:
+                task.cancel()
+            # A generator can only be closed once the task reading from it has stopped
+            await asyncio.gather(*(task for task, _ in losers), return_exceptions=True)
+            for _, chunks in losers:
+                await aclose_stream(chunks, ignore_errors=True)
+
+        model, chunks = winner
+        completed = failed = False
+        try:
+            if first_chunk is not None:
+                yield first_chunk
+                async for chunk in chunks:
+                    yield chunk
+            completed = True
+        except Exception:
+            failed = True
+            raise
+        finally:
+            await aclose_stream(chunks, ignore_errors=True)
+            # A consumer that stops early still leaves a time-to-first-chunk sample
+            latency = time.monotonic() - start if completed else None
+            self._scores.record(model, ok=not failed, ttft=ttft, latency=latency)
+
+
+async def _first(chunks: AsyncIterator[StreamChunk]) -> Optional[StreamChunk]:
+    """Return the first chunk of ``chunks``, or None if the stream is empty."""
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class ModelRouter:
+    """
+    Blocking counterpart of `AsyncModelRouter` for ``client.llm``.
+
+    See `AsyncModelRouter` for how models are scored, persisted and raced.
+
+    Usage:
+        router = ModelRouter(client.llm, [TEE_LLM.GEMINI_2_5_FLASH, TEE_LLM.CLAUDE_HAIKU_4_5, TEE_LLM.GPT_5_MINI])
+        result = router.chat(messages=[...], race=True)
+        for chunk in router.chat(messages=[...], stream=True):
+            print(chunk.choices[0].delta.content or "", end="")
+    """
+
+    def __init__(
+        self,
+        llm: "LLM",
+        models: Sequence[TEE_LLM],
+        state_path: Optional[Union[str, Path]] = DEFAULT_ROUTER_STATE_PATH,
+        policy: RouterPolicy = DEFAULT_ROUTER_POLICY,
+    ):
+        self._llm = llm
+        self._async_router = AsyncModelRouter(llm._async_llm, models, state_path, policy)
+
+    def ranking(self, streaming: bool = False) -> List[TEE_LLM]:
+        """Return the candidate models from best to worst score for a streaming or non-streaming request."""
+        return self._async_router.ranking(streaming)
+
+    def choose(self, streaming: bool = False) -> TEE_LLM:
+        """Return the model the next request should go to, occasionally exploring another candidate."""
+        return self._async_router.choose(streaming)
+
+    def stats(self) -> Dict[str, ModelRouteStats]:
+        """Return the current statistics of every candidate model, keyed by model name."""
+        return self._async_router.stats()
+
+    def save(self) -> None:
+        """Write the statistics to the state file now."""
+        self._async_router.save()
+
+    def chat(self, messages: List[Dict], stream: bool = False, race: bool = False, **kwargs) -> Union[TextGenerationOutput, Iterator[StreamChunk]]:
+        """Chat with the best-ranked model. See `AsyncModelRouter.chat`."""
+        return self._run(self._async_router.chat(messages, stream=stream, race=race, **kwargs), stream)
+
+    def completion(self, prompt: str, stream: bool = False, race: bool = False, **kwargs) -> Union[TextGenerationOutput, Iterator[StreamChunk]]:
+        """Complete ``prompt`` with the best-ranked model. See `AsyncModelRouter.completion`."""
+        return self._run(self._async_router.completion(prompt, stream=stream, race=race, **kwargs), stream)
+
+    def _run(self, coroutine, stream: bool):
+        result = self._llm._run_coroutine(coroutine)
+        return self._llm._iterate_async(result) if stream else result
@@ -0,0 +1,109 @@
+"""Client-side conditions for ending LLM streams early."""
+
+import re
+from json import JSONDecodeError
+from typing import AsyncGenerator, Callable, Optional, Pattern, Union
+
+from ..types import StreamChoice, StreamChunk, StreamDelta
+from .llm_json import IncrementalJSONParser
+
+CLIENT_STOP_FINISH_REASON = "client_stop"
+"""``finish_reason`` of the chunk that ends a stream stopped by ``stop_when``."""
+
+StopCondition = Callable[[StreamChunk], bool]
+"""Called with every chunk of a stream; returning True ends the stream after that chunk."""
+
+
+def _content(chunk: StreamChunk) -> str:
+    return chunk.choices[0].delta.content or "" if chunk.choices else ""
+
+
+def stop_on_match(pattern: Union[str, Pattern[str]], max_match_length: int = 256) -> StopCondition:
+    """
+    Stop once the streamed text contains a match of ``pattern``.
+
+    Only the last ``max_match_length`` characters before each new delta are
+    searched again, so matches longer than that may be missed. Create one
+    condition per stream.
+    """
+    regex = re.compile(pattern)
+    tail = ""
+
+    def condition(chunk: StreamChunk) -> bool:
+        nonlocal tail
+        text = _content(chunk)
+        if not text:
+            return False
+        # A match ending in the new text starts at most max_match_length characters before it
+        tail = tail[max(0, len(tail) - max_match_length) :] + text
+        return regex.search(tail) is not None
+
+    return condition
+
+
+def stop_after_tokens(max_tokens: int, chars_per_token: float = 4.0) -> StopCondition:
+    """
+    Stop once about ``max_tokens`` tokens have been streamed. Token usage is
+    only reported on the last chunk, so tokens are estimated from the
+    length of the streamed text. Create one condition per stream.
+    """
+    budget = max_tokens * chars_per_token
+    received = 0
+
+    def condition(chunk: StreamChunk) -> bool:
+        nonlocal received
+        received += len(_content(chunk))
+        return received >= budget
+
+    return condition
+
+
+def stop_on_json_complete() -> StopCondition:
+    """
+    Stop as soon as the first JSON object or array in the streamed text is
+    closed, ignoring text before it. If the text turns out not to be valid
+    JSON the stream is left to run to its end. Create one condition per stream.
+    """
+    parser: Optional[IncrementalJSONParser] = IncrementalJSONParser(max_depth=0)
+
+    def condition(chunk: StreamChunk) -> bool:
+        nonlocal parser
+        if parser is None:
+            return False
+        try:
+            parser.feed(_content(chunk))
+        except JSONDecodeError:
+            parser = None
+            return False
+        return parser.done
+
+    return condition
+
+
+async def stop_stream(chunks: AsyncGenerator[StreamChunk, None], stop_when: StopCondition) -> AsyncGenerator[StreamChunk, None]:
+    """
+    Pass ``chunks`` through until ``stop_when`` returns True, then close
+    ``chunks`` right away and end with a chunk whose ``finish_reason`` is
+    `CLIENT_STOP_FINISH_REASON`. The chunk that triggered the condition is
+    yielded before it.
+    """
+    model = "unknown"
+    try:
+        async for chunk in chunks:
+            model = chunk.model or model
+            if chunk.is_final or not stop_when(chunk):
+                yield chunk
+                continue
+            # Closed before handing out the chunk, so no more tokens are read while the caller handles it
+            await chunks.aclose()
+            yield chunk
+            break
+        else:
+            return
+    finally:
+        await chunks.aclose()
+    yield StreamChunk(
+        choices=[StreamChoice(delta=StreamDelta(), finish_reason=CLIENT_STOP_FINISH_REASON)],
+        model=model,
+        is_final=True,
+    )
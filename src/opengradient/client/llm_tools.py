@@ -0,0 +1,240 @@
+"""Assembly and early dispatch of tool calls from streamed chat deltas."""
+
+import asyncio
+import inspect
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..types import CompletedToolCall, StreamAccumulator, StreamChunk, TextGenerationOutput, ToolCallResult
+from ._utils import aclose_stream, close_stream
+from .exceptions import OpenGradientError
+from .llm_json import IncrementalJSONParser
+
+
+class _PendingCall:
+    __slots__ = ("index", "id", "names", "arguments", "parser", "done")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.id: Optional[str] = None
+        self.names: List[str] = []
+        self.arguments: List[str] = []
+        self.parser = IncrementalJSONParser(max_depth=0)
+        self.done = False
+
+    def complete(self, arguments: Dict) -> CompletedToolCall:
+        self.done = True
+        return CompletedToolCall(index=self.index, id=self.id, name="".join(self.names), arguments=arguments, raw_arguments="".join(self.arguments))
+
+
+class ToolCallAssembler:
+    """
+    Merges the ``tool_calls`` fragments of a chat stream and reports each
+    tool call the moment its ``arguments`` JSON object is closed, typically
+    well before the stream ends.
+
+    Fragments are merged by their ``index`` like `StreamAccumulator` does,
+    and each call's arguments are parsed incrementally as they arrive. The
+    chunks are also accumulated, so ``result()`` returns the same output as
+    ``StreamAccumulator.result()``.
+
+    Args:
+        on_call: Called with every completed tool call, in addition to it being returned by ``add``.
+
+    Usage:
+        assembler = ToolCallAssembler()
+        for chunk in client.llm.chat(model=..., messages=[...], tools=tools, stream=True):
+            for call in assembler.add(chunk):
+                futures.append(pool.submit(run_tool, call.name, call.arguments))
+        calls = assembler.close()  # calls whose arguments only ended with the stream
+    """
+
+    def __init__(self, on_call: Optional[Callable[[CompletedToolCall], None]] = None):
+        self.on_call = on_call
+        self.accumulator = StreamAccumulator()
+        self._calls: Dict[int, _PendingCall] = {}
+
+    def add(self, chunk: StreamChunk) -> List[CompletedToolCall]:
+        """
+        Fold ``chunk`` into the stream and return the tool calls it completed.
+
+        Raises:
+            json.JSONDecodeError: If the arguments of a tool call are not valid JSON.
+        """
+        self.accumulator.add(chunk)
+        completed = []
+        for choice in chunk.choices:
+            if choice.index != 0 or not choice.delta.tool_calls:
+                continue
+            for fragment in choice.delta.tool_calls:
+                call = self._add_fragment(fragment)
+                if call is not None:
+                    completed.append(call)
+        return self._report(completed)
+
+    def _add_fragment(self, fragment: Dict) -> Optional[CompletedToolCall]:
+        index = fragment.get("index")
+        if index is None:
+            # Providers that send whole tool calls may omit the index; match by id instead
+            index = next(
+                (i for i, pending in self._calls.items() if fragment.get("id") and pending.id == fragment["id"]),
+                len(self._calls),
+            )
+        pending = self._calls.get(index)
+        if pending is None:
+            pending = self._calls[index] = _PendingCall(index)
+
+        if fragment.get("id"):
+            pending.id = fragment["id"]
+        function = fragment.get("function") or {}
+        if function.get("name"):
+            pending.names.append(function["name"])
+        text = function.get("arguments")
+        if not text or pending.done:
+            return None
+        pending.arguments.append(text)
+        events = pending.parser.feed(text)
+        if not pending.parser.done:
+            return None
+        return pending.complete(events[-1].value)
+
+    def close(self) -> List[CompletedToolCall]:
+        """
+        Signal the end of the stream and return the tool calls not reported
+        yet. A call streamed without arguments gets ``{}``.
+
+        Raises:
+            json.JSONDecodeError: If the arguments of a tool call were cut off.
+        """
+        completed = []
+        for pending in self._calls.values():
+            if pending.done:
+                continue
+            if not "".join(pending.arguments).strip():
+                completed.append(pending.complete({}))
+                continue
+            pending.parser.close()
+            completed.append(pending.complete(pending.parser.value))
+        return self._report(completed)
+
+    def _report(self, completed: List[CompletedToolCall]) -> List[CompletedToolCall]:
+        if self.on_call is not None:
+            for call in completed:
+                self.on_call(call)
+        return completed
+
+    def result(self) -> TextGenerationOutput:
+        """Return the output assembled from every chunk added so far."""
+        return self.accumulator.result()
+
+
+def _call_error(call: CompletedToolCall, tools: Mapping[str, Callable[..., Any]]) -> Optional[OpenGradientError]:
+    """Return why ``call`` cannot be run, or None if it can."""
+    if call.name not in tools:
+        return OpenGradientError(f"Model called unknown tool '{call.name}'")
+    if not isinstance(call.arguments, dict):
+        return OpenGradientError(f"Model called tool '{call.name}' with arguments that are not a JSON object: {call.raw_arguments}")
+    return None
+
+
+def dispatch_tool_calls(
+    stream: Iterable[StreamChunk],
+    tools: Mapping[str, Callable[..., Any]],
+    max_workers: int = 4,
+) -> Tuple[TextGenerationOutput, List[ToolCallResult]]:
+    """
+    Consume a chat stream and run each tool call in a thread pool as soon as
+    its arguments are complete, so tools run while the model is still
+    generating.
+
+    Tools are called with the parsed arguments as keyword arguments. A tool
+    that raises, a call to a tool missing from ``tools`` or a call whose
+    arguments are not a JSON object produces a `ToolCallResult` with
+    ``error`` set rather than failing the other calls.
+
+    Args:
+        stream: Chunks of a streamed ``chat`` call made with ``tools``.
+        tools: Functions to run, keyed by tool name.
+        max_workers: Maximum number of tools running at once.
+
+    Returns:
+        The assembled output and one result per tool call, in call order.
+
+    Raises:
+        json.JSONDecodeError: If the arguments of a tool call are not valid JSON.
+    """
+    assembler = ToolCallAssembler()
+    futures: List[Tuple[CompletedToolCall, Future]] = []
+
+    def submit(executor: ThreadPoolExecutor, calls: List[CompletedToolCall]) -> None:
+        for call in calls:
+            error = _call_error(call, tools)
+            if error is not None:
+                future: Future = Future()
+                future.set_exception(error)
+            else:
+                future = executor.submit(tools[call.name], **call.arguments)
+            futures.append((call, future))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for chunk in stream:
+                submit(executor, assembler.add(chunk))
+            submit(executor, assembler.close())
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            close_stream(stream)
+        results = []
+        for call, future in futures:
+            error = future.exception()
+            results.append(ToolCallResult(call=call, error=error) if error is not None else ToolCallResult(call=call, output=future.result()))
+    return assembler.result(), sorted(results, key=lambda result: result.call.index)
+
+
+async def adispatch_tool_calls(
+    stream: AsyncIterable[StreamChunk],
+    tools: Mapping[str, Callable[..., Any]],
+) -> Tuple[TextGenerationOutput, List[ToolCallResult]]:
+    """
+    Async version of `dispatch_tool_calls`. Coroutine functions are scheduled
+    as tasks on the running loop the moment their call is complete; plain
+    functions run in a worker thread.
+
+    If consuming the stream fails, tools that are still running are cancelled.
+    """
+    assembler = ToolCallAssembler()
+    tasks: List[Tuple[CompletedToolCall, "asyncio.Future[Any]"]] = []
+
+    async def run(call: CompletedToolCall) -> Any:
+        error = _call_error(call, tools)
+        if error is not None:
+            raise error
+        tool = tools[call.name]
+        if inspect.iscoroutinefunction(tool):
+            return await tool(**call.arguments)
+        return await asyncio.to_thread(tool, **call.arguments)
+
+    def schedule(calls: List[CompletedToolCall]) -> None:
+        for call in calls:
+            tasks.append((call, asyncio.ensure_future(run(call))))
+
+    try:
+        async for chunk in stream:
+            schedule(assembler.add(chunk))
+        schedule(assembler.close())
+    except BaseException:
+        for _, task in tasks:
+            task.cancel()
+        raise
+    finally:
+        await aclose_stream(stream)
+
+    outcomes = await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+    results = [
+        ToolCallResult(call=call, error=outcome) if isinstance(outcome, BaseException) else ToolCallResult(call=call, output=outcome)
+        for (call, _), outcome in zip(tasks, outcomes)
+    ]
+    return assembler.result(), sorted(results, key=lambda result: result.call.index)
+
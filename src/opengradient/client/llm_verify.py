@@ -0,0 +1,478 @@
+"""
+Verification of TEE signatures on LLM outputs. Experimental and opt-in.
+
+The TEE nodes document their signatures only as RSA-PSS over the response;
+the exact signed payload is not specified. This module *assumes* the enclave
+signs the SHA-256 digest of the generated text (UTF-8) followed by its
+``tee_timestamp``, with MGF1 over SHA-256. For chat outputs the generated
+text is assumed to be the assistant message ``content``, for completions
+``completion_output``, and for streams the concatenation of the content
+deltas, so `StreamVerifier` can hash each chunk as it arrives.
+
+This layout has not been confirmed against production enclaves; only
+`opengradient.mock_server` is known to sign this way. If the assumption is
+wrong, genuine signatures fail to verify. Every entry point therefore
+requires ``assume_payload_format=True`` to acknowledge this, and raises
+``OpenGradientError`` without it.
+
+For audits of stored outputs, `EnclaveKeyCache` keeps enclave public keys on
+disk so they are fetched once, and `verify_outputs` spreads the RSA checks of
+a batch over worker processes.
+
+Requires the optional ``cryptography`` package (``pip install 'opengradient[verify]'``).
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..types import StreamChunk, TextGenerationOutput, VerificationReport
+from ._utils import aclose_stream, close_stream
+from .exceptions import OpenGradientError, SignatureVerificationError
+
+PublicKey = Union[str, bytes, Any]
+"""A PEM-encoded RSA public key, or a loaded ``cryptography`` RSA public key."""
+
+DEFAULT_KEY_CACHE_DIR = Path.home() / ".cache" / "opengradient" / "enclave_keys"
+
+
+def _require_opt_in(assume_payload_format: bool) -> None:
+    if not assume_payload_format:
+        raise OpenGradientError(
+            "The signed payload of TEE outputs is not documented; verification assumes SHA-256(text || tee_timestamp) "
+            "and may reject genuine signatures. Pass assume_payload_format=True to verify under that assumption."
+        )
+
+
+def _require_cryptography() -> None:
+    if importlib.util.find_spec("cryptography") is None:
+        raise ImportError(
+            "TEE signature verification requires the 'cryptography' package. Install it with: pip install 'opengradient[verify]'"
+        )
+
+
+def load_public_key(public_key: PublicKey) -> Any:
+    """
+    Return ``public_key`` as a ``cryptography`` RSA public key.
+
+    Args:
+        public_key: PEM text or bytes, or an already loaded RSA public key.
+
+    Raises:
+        ImportError: If ``cryptography`` is not installed.
+        ValueError: If the PEM data is not an RSA public key.
+    """
+    _require_cryptography()
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+    if isinstance(public_key, str):
+        public_key = public_key.encode()
+    if isinstance(public_key, bytes):
+        public_key = load_pem_public_key(public_key)
+    if not isinstance(public_key, rsa.RSAPublicKey):
+        raise ValueError("TEE public key must be an RSA public key.")
+    return public_key
+
+
+def _public_key_pem(public_key: Any) -> bytes:
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+    return public_key.public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+
+
+def _decode_signature(signature: str) -> bytes:
+    """Signatures are sent hex- or base64-encoded."""
+    text = signature[2:] if signature.startswith("0x") else signature
+    try:
+        return bytes.fromhex(text)
+    except ValueError:
+        pass
+    try:
+        return base64.b64decode(signature, validate=True)
+    except binascii.Error:
+        return base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4))
+
+
+def _verify_digest(public_key: Any, signature: str, digest: bytes) -> bool:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding, utils
+
+    try:
+        signature_bytes = _decode_signature(signature)
+    except ValueError:
+        return False
+    try:
+        public_key.verify(
+            signature_bytes,
+            digest,
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.AUTO),
+            utils.Prehashed(hashes.SHA256()),
+        )
+        return True
+    except InvalidSignature:
+        return False
+
+
+def _output_text(output: TextGenerationOutput) -> str:
+    if output.completion_output is not None:
+        return output.completion_output
+    content = (output.chat_output or {}).get("content")
+    return content if isinstance(content, str) else ""
+
+
+def _output_digest(output: TextGenerationOutput) -> bytes:
+    # Assumed payload layout, see the module docstring
+    return hashlib.sha256(_output_text(output).encode() + (output.tee_timestamp or "").encode()).digest()
+
+
+class StreamVerifier:
+    """
+    Verifies the TEE signature of a stream while it is being consumed,
+    assuming the unconfirmed payload layout described in the module docstring.
+
+    Content deltas are fed into a running SHA-256 as chunks are added, so
+    nothing is buffered and the final `verify` only performs the RSA-PSS
+    check. `averify` runs that check in a worker thread so it does not stall
+    the event loop. A verifier can also check a complete `TextGenerationOutput`
+    via `verify_output`.
+
+    Only the first choice (``index`` 0) is hashed.
+
+    Usage:
+        verifier = StreamVerifier(tee_public_key_pem, assume_payload_format=True)
+        for chunk in client.llm.chat(model=TEE_LLM.GPT_5, messages=[...], stream=True):
+            verifier.add(chunk)
+            print(chunk.choices[0].delta.content or "", end="")
+        assert verifier.verify()
+
+    Args:
+        public_key: The enclave's RSA public key (PEM or loaded key).
+        assume_payload_format: Must be True, acknowledging that the signed payload layout is assumed.
+
+    Raises:
+        ImportError: If ``cryptography`` is not installed.
+        OpenGradientError: If ``assume_payload_format`` is not True.
+    """
+
+    def __init__(self, public_key: PublicKey, *, assume_payload_format: bool = False):
+        _require_opt_in(assume_payload_format)
+        self._public_key = load_public_key(public_key)
+        self._hash = hashlib.sha256()
+        self.tee_signature: Optional[str] = None
+        self.tee_timestamp: Optional[str] = None
+
+    def add(self, chunk: StreamChunk) -> StreamChunk:
+        """Hash the content of ``chunk``, remember its signature if it has one, and return it unchanged."""
+        for choice in chunk.choices:
+            if choice.index == 0 and choice.delta.content:
+                self._hash.update(choice.delta.content.encode())
+        if chunk.tee_signature is not None:
+            self.tee_signature = chunk.tee_signature
+        if chunk.tee_timestamp is not None:
+            self.tee_timestamp = chunk.tee_timestamp
+        return chunk
+
+    def _digest(self) -> bytes:
+        final = self._hash.copy()
+        final.update((self.tee_timestamp or "").encode())
+        return final.digest()
+
+    def verify(self) -> bool:
+        """Return True if the signature seen in the stream matches the content hashed so far."""
+        if self.tee_signature is None:
+            return False
+        return _verify_digest(self._public_key, self.tee_signature, self._digest())
+
+    async def averify(self) -> bool:
+        """Like `verify`, but performs the RSA check in a worker thread."""
+        if self.tee_signature is None:
+            return False
+        return await asyncio.to_thread(_verify_digest, self._public_key, self.tee_signature, self._digest())
+
+    def verify_output(self, output: TextGenerationOutput) -> bool:
+        """Return True if the signature of a non-streaming ``output`` is valid for this verifier's key."""
+        if output.tee_signature is None:
+            return False
+        return _verify_digest(self._public_key, output.tee_signature, _output_digest(output))
+
+
+def verify_output(output: TextGenerationOutput, public_key: PublicKey, *, assume_payload_format: bool = False) -> bool:
+    """
+    Verify the TEE signature of a non-streaming LLM output, assuming the
+    unconfirmed payload layout described in the module docstring.
+
+    Returns:
+        bool: True if ``output.tee_signature`` is a valid signature by ``public_key``
+            over the output text and ``tee_timestamp``; False otherwise, including
+            when the output carries no signature.
+
+    Raises:
+        ImportError: If ``cryptography`` is not installed.
+        OpenGradientError: If ``assume_payload_format`` is not True.
+    """
+    return StreamVerifier(public_key, assume_payload_format=assume_payload_format).verify_output(output)
+
+
+def verified_stream(stream: Iterable[StreamChunk], public_key: PublicKey, *, assume_payload_format: bool = False) -> Iterator[StreamChunk]:
+    """
+    Pass the chunks of ``stream`` through, verifying its TEE signature on the
+    way under the unconfirmed payload layout described in the module
+    docstring. If that layout is wrong, genuine streams raise.
+
+    The final chunk is only yielded once the signature has been checked.
+
+    Raises:
+        OpenGradientError: If ``assume_payload_format`` is not True.
+        SignatureVerificationError: If the stream ends without a valid signature.
+    """
+    verifier = StreamVerifier(public_key, assume_payload_format=assume_payload_format)
+    try:
+        for chunk in stream:
+            verifier.add(chunk)
+            if chunk.tee_signature is not None and not verifier.verify():
+                raise SignatureVerificationError("TEE signature does not match the streamed output")
+            yield chunk
+    finally:
+        close_stream(stream)
+    if verifier.tee_signature is None:
+        raise SignatureVerificationError("Stream ended without a TEE signature")
+
+
+async def averified_stream(
+    stream: AsyncIterable[StreamChunk], public_key: PublicKey, *, assume_payload_format: bool = False
+) -> AsyncIterator[StreamChunk]:
+    """
+    Async version of `verified_stream`. The RSA check runs in a worker thread,
+    so other tasks on the event loop keep running while it completes.
+    """
+    verifier = StreamVerifier(public_key, assume_payload_format=assume_payload_format)
+    try:
+        async for chunk in stream:
+            verifier.add(chunk)
+            if chunk.tee_signature is not None and not await verifier.averify():
+                raise SignatureVerificationError("TEE signature does not match the streamed output")
+            yield chunk
+    finally:
+        await aclose_stream(stream)
+    if verifier.tee_signature is None:
+        raise SignatureVerificationError("Stream ended without a TEE signature")
+
+
+class EnclaveKeyCache:
+    """
+    On-disk cache of TEE enclave public keys, keyed by enclave identity.
+
+    Each enclave's PEM public key, and its attestation document when one is
+    given, is stored as a small JSON file under ``directory`` and kept parsed
+    in memory, so auditing many outputs from the same enclave fetches and
+    parses its key once. Files are written atomically, so several audit jobs
+    can share a directory.
+
+    Usage:
+        keys = EnclaveKeyCache(fetch=lambda enclave_id: registry.public_key_pem(enclave_id))
+        report = verify_outputs(outputs, [keys.get(enclave_id) for enclave_id in enclave_ids])
+
+    Args:
+        directory: Where key files are kept. Defaults to ``~/.cache/opengradient/enclave_keys``.
+        fetch: Called with an enclave identity on a cache miss. Returns the PEM
+            public key, or a ``(pem, attestation)`` tuple. Without it, keys
+            must be added with `put`.
+        max_age: Seconds after which a stored key is fetched again, or None to
+            keep keys until they are removed. Only applies when ``fetch`` is set.
+
+    Raises:
+        ImportError: If ``cryptography`` is not installed.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        fetch: Optional[Callable[[str], Union[str, bytes, Tuple[Union[str, bytes], Optional[str]]]]] = None,
+        max_age: Optional[float] = None,
+    ):
+        _require_cryptography()
+        self.directory = Path(directory) if directory is not None else DEFAULT_KEY_CACHE_DIR
+        self._fetch = fetch
+        self._max_age = max_age
+        self._entries: Dict[str, Tuple[Any, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, identity: str) -> Path:
+        return self.directory / f"{hashlib.sha256(identity.encode()).hexdigest()}.json"
+
+    def _is_fresh(self, record: Dict) -> bool:
+        if self._fetch is None or self._max_age is None:
+            return True
+        return time.time() - record.get("fetched_at", 0) < self._max_age
+
+    def put(self, identity: str, public_key: PublicKey, attestation: Optional[str] = None) -> Any:
+        """
+        Store the public key (and attestation) of enclave ``identity`` and return the loaded key.
+
+        Raises:
+            ValueError: If ``public_key`` is not an RSA public key.
+        """
+        key = load_public_key(public_key)
+        record = {"identity": identity, "public_key": _public_key_pem(key).decode(), "attestation": attestation, "fetched_at": time.time()}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(identity)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(record))
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._entries[identity] = (key, record)
+        return key
+
+    def _entry(self, identity: str) -> Tuple[Any, Dict]:
+        with self._lock:
+            entry = self._entries.get(identity)
+        if entry is not None and self._is_fresh(entry[1]):
+            return entry
+
+        try:
+            record = json.loads(self._path(identity).read_text())
+            if record.get("identity") != identity:
+                record = None
+        except (OSError, ValueError):
+            record = None
+
+        if record is not None and self._is_fresh(record):
+            entry = (load_public_key(record["public_key"]), record)
+            with self._lock:
+                self._entries[identity] = entry
+            return entry
+
+        if self._fetch is None:
+            raise OpenGradientError(f"No public key cached for TEE enclave {identity!r}")
+        fetched = self._fetch(identity)
+        public_key, attestation = fetched if isinstance(fetched, tuple) else (fetched, None)
+        self.put(identity, public_key, attestation)
+        with self._lock:
+            return self._entries[identity]
+
+    def get(self, identity: str) -> Any:
+        """
+        Return the loaded public key of enclave ``identity``, fetching it on a miss.
+
+        Raises:
+            OpenGradientError: If the key is not cached and no ``fetch`` function was given.
+        """
+        return self._entry(identity)[0]
+
+    def attestation(self, identity: str) -> Optional[str]:
+        """Return the attestation document stored with enclave ``identity``'s key, if any."""
+        return self._entry(identity)[1].get("attestation")
+
+    def remove(self, identity: str) -> None:
+        """Forget enclave ``identity``, e.g. after its key was found to be revoked."""
+        with self._lock:
+            self._entries.pop(identity, None)
+        try:
+            self._path(identity).unlink()
+        except FileNotFoundError:
+            pass
+
+
+# Keys of the current worker process, loaded once by `_init_worker`
+_worker_keys: List[Any] = []
+
+
+def _init_worker(pems: List[bytes]) -> None:
+    global _worker_keys
+    _worker_keys = [load_public_key(pem) for pem in pems]
+
+
+def _verify_tasks(keys: List[Any], tasks: List[Tuple[int, str, bytes]]) -> List[bool]:
+    return [_verify_digest(keys[key_index], signature, digest) for key_index, signature, digest in tasks]
+
+
+def _verify_chunk(tasks: List[Tuple[int, str, bytes]]) -> List[bool]:
+    return _verify_tasks(_worker_keys, tasks)
+
+
+def verify_outputs(
+    outputs: Sequence[TextGenerationOutput],
+    public_key: Union[PublicKey, Sequence[PublicKey]],
+    processes: Optional[int] = None,
+    chunk_size: int = 256,
+    *,
+    assume_payload_format: bool = False,
+) -> VerificationReport:
+    """
+    Verify the TEE signatures of many outputs, spread over worker processes,
+    assuming the unconfirmed payload layout described in the module docstring.
+
+    Outputs are hashed in the calling process; only the signature, digest
+    and an index into the (de-duplicated) key list are sent to the workers,
+    which parse each key once. On platforms that spawn worker processes
+    (macOS, Windows) call this from under ``if __name__ == "__main__":``.
+
+    Args:
+        outputs: Outputs to verify, typically loaded from storage.
+        public_key: One key for every output, or a list with the key of each
+            output's enclave (e.g. from `EnclaveKeyCache.get`).
+        processes: Number of worker processes. Defaults to the CPU count;
+            1 verifies in the calling process, which is faster for small batches.
+        chunk_size: Outputs handed to a worker at a time.
+        assume_payload_format: Must be True, acknowledging that the signed payload layout is assumed.
+
+    Returns:
+        VerificationReport: Per-output results in input order, plus elapsed
+            time and throughput. Outputs without a signature count as invalid.
+
+    Raises:
+        ImportError: If ``cryptography`` is not installed.
+        ValueError: If a list of keys does not match the number of outputs.
+        OpenGradientError: If ``assume_payload_format`` is not True.
+    """
+    _require_opt_in(assume_payload_format)
+    start = time.perf_counter()
+    if isinstance(public_key, (list, tuple)):
+        if len(public_key) != len(outputs):
+            raise ValueError("Expected one public key per output.")
+        per_output = list(public_key)
+    else:
+        per_output = [public_key] * len(outputs)
+
+    pem_indices: Dict[bytes, int] = {}
+    loaded: Dict[int, bytes] = {}
+    tasks: List[Tuple[int, str, bytes]] = []
+    positions: List[int] = []
+    for position, (output, key) in enumerate(zip(outputs, per_output)):
+        if output.tee_signature is None:
+            continue
+        if id(key) not in loaded:
+            loaded[id(key)] = _public_key_pem(load_public_key(key))
+        key_index = pem_indices.setdefault(loaded[id(key)], len(pem_indices))
+        tasks.append((key_index, output.tee_signature, _output_digest(output)))
+        positions.append(position)
+
+    pems = list(pem_indices)
+    chunks = [tasks[i : i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    workers = min(processes or os.cpu_count() or 1, len(chunks))
+
+    if workers <= 1:
+        verified = _verify_tasks([load_public_key(pem) for pem in pems], tasks)
+    else:
+        verified = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pems,)) as executor:
+            for chunk_results in executor.map(_verify_chunk, chunks):
+                verified.extend(chunk_results)
+
+    results = [False] * len(outputs)
+    for position, ok in zip(positions, verified):
+        results[position] = ok
+    return VerificationReport(results=results, elapsed=time.perf_counter() - start, processes=max(workers, 1))
@@ -4,6 +4,7 @@ from typing import Dict, List, Optional
 
 import httpx
 
+from .. import _codec
 from ..types import TEE_LLM, TextGenerationOutput
 from .exceptions import OpenGradientError
 
@@ -71,9 +72,9 @@ class Twins:
             payload["max_tokens"] = max_tokens
 
         try:
-            response = httpx.post(url, json=payload, headers=headers, timeout=60)
+            response = httpx.post(url, content=_codec.dumps(payload), headers=headers, timeout=60)
             response.raise_for_status()
-            result = response.json()
+            result = _codec.loads(response.content)
 
             choices = result.get("choices")
             if not choices:
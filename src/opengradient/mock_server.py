@@ -0,0 +1,336 @@
+"""
+Local stand-in for a TEE LLM server, for offline tests and benchmarks.
+
+`MockTEEServer` speaks the ``/v1/chat/completions`` and ``/v1/completions``
+protocols, including SSE streaming, and the x402 payment flow: unpaid
+requests get a ``402`` challenge and paid retries are answered. Payments are
+decoded but never settled, so no OPG is spent. Latency, time to first token,
+token rate and injected errors are configurable, which makes the LLM client,
+the CLI and ``stresstest/llm.py`` measurable on a laptop.
+
+Usage:
+    with MockTEEServer(MockServerConfig(ttft=0.2, tokens_per_second=50)) as server:
+        client = og.Client(private_key=key, og_llm_server_url=server.url, og_llm_streaming_server_url=server.url)
+        client.llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}])
+
+From the command line: ``opengradient mock-server --port 8402 --ttft 0.2``.
+In pytest, load ``opengradient.pytest_plugin`` (``pytest_plugins = ["opengradient.pytest_plugin"]``)
+and use the ``mock_tee_server`` fixture.
+"""
+
+import base64
+import dataclasses
+import hashlib
+import importlib.util
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import _codec
+from .client.llm import BASE_TESTNET_NETWORK
+from .client.opg_token import BASE_OPG_ADDRESS
+
+MOCK_PAY_TO = "0x000000000000000000000000000000000000dEaD"
+
+_WORDS = ["the", "enclave", "verified", "this", "answer", "with", "a", "signed", "attestation", "and", "settled", "payment"]
+
+
+@dataclasses.dataclass
+class MockServerConfig:
+    """
+    Behaviour of a `MockTEEServer`. Fields can be changed while the server runs.
+
+    Attributes:
+        latency: Seconds before a response (or a stream's headers) is sent.
+        ttft: Additional seconds before the first token of a stream.
+        tokens_per_second: Rate at which stream tokens are sent, or None for no delay.
+        completion_tokens: Tokens generated per request, capped by the request's ``max_tokens``.
+        error_rate: Fraction of paid requests answered with ``error_status``
+            instead. Like a server failing before settlement, these answers
+            carry no x402 ``PAYMENT-RESPONSE`` header.
+        error_status: HTTP status of injected errors.
+        price: Amount per request in the token's smallest unit, or None to
+            serve requests without the x402 payment flow.
+        payment_scheme: x402 scheme advertised in the 402 challenge (``exact`` or ``upto``).
+        sign: Sign outputs with a TEE key generated at startup (requires
+            ``cryptography``); see `MockTEEServer.public_key_pem`.
+        seed: Seed for error injection, for reproducible runs.
+    """
+
+    latency: float = 0.0
+    ttft: float = 0.0
+    tokens_per_second: Optional[float] = None
+    completion_tokens: int = 16
+    error_rate: float = 0.0
+    error_status: int = 500
+    price: Optional[str] = "1000"
+    payment_scheme: str = "exact"
+    sign: bool = False
+    seed: Optional[int] = None
+
+
+@dataclasses.dataclass
+class MockServerStats:
+    """Counters of a `MockTEEServer`."""
+
+    requests: int = 0
+    """Inference requests received, including unpaid and failed ones."""
+
+    challenges: int = 0
+    """Requests answered with a 402 payment challenge."""
+
+    payments: int = 0
+    """Requests that carried a payment."""
+
+    streams: int = 0
+    """Streaming responses started."""
+
+    injected_errors: int = 0
+    """Requests failed on purpose because of ``error_rate``."""
+
+    abandoned_streams: int = 0
+    """Streams the client disconnected from before they ended."""
+
+
+class MockTEEServer:
+    """
+    Threaded HTTP server imitating a TEE LLM node.
+
+    Args:
+        config: Server behaviour; defaults to `MockServerConfig()`.
+        host: Interface to listen on.
+        port: Port to listen on; 0 picks a free port (see `url`).
+    """
+
+    def __init__(self, config: Optional[MockServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockServerConfig()
+        self.stats = MockServerStats()
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._private_key = _generate_signing_key() if self.config.sign else None
+        self._server = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def public_key_pem(self) -> Optional[str]:
+        """PEM public key that verifies this server's ``tee_signature``s, when ``sign`` is enabled."""
+        if self._private_key is None:
+            return None
+        from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+        return self._private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo).decode()
+
+    def start(self) -> "MockTEEServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="og-mock-tee-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve requests on the calling thread until interrupted."""
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "MockTEEServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _inject_error(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.config.error_rate
+
+    def payment_required(self, resource: str) -> Dict[str, Any]:
+        """The x402 ``PaymentRequired`` document sent with 402 challenges."""
+        return {
+            "x402Version": 2,
+            "error": "Payment required",
+            "resource": {"url": resource, "mimeType": "application/json"},
+            "accepts": [
+                {
+                    "scheme": self.config.payment_scheme,
+                    "network": BASE_TESTNET_NETWORK,
+                    "asset": BASE_OPG_ADDRESS,
+                    "amount": self.config.price,
+                    "payTo": MOCK_PAY_TO,
+                    "maxTimeoutSeconds": 300,
+                    "extra": {"name": "OPG", "version": "1"},
+                }
+            ],
+        }
+
+    def sign(self, text: str) -> Tuple[Optional[str], str]:
+        """
+        Return the ``(tee_signature, tee_timestamp)`` pair for an output ``text``.
+
+        Signs with the payload layout `opengradient.client.llm_verify` assumes,
+        which is not confirmed to match production enclaves.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat()
+        if self._private_key is None:
+            return None, timestamp
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding, utils
+
+        digest = hashlib.sha256(text.encode() + timestamp.encode()).digest()
+        signature = self._private_key.sign(
+            digest, padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH), utils.Prehashed(hashes.SHA256())
+        )
+        return signature.hex(), timestamp
+
+
+def _generate_signing_key() -> Any:
+    if importlib.util.find_spec("cryptography") is None:
+        raise ImportError("Signing mock outputs requires the 'cryptography' package. Install it with: pip install 'opengradient[verify]'")
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _tokens(count: int) -> List[str]:
+    return [_WORDS[i % len(_WORDS)] + " " for i in range(count)]
+
+
+def _handler_for(server: MockTEEServer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok"})
+            else:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path not in ("/v1/chat/completions", "/v1/completions"):
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+                return
+            server._count(requests=1)
+            config = server.config
+
+            if config.price is not None:
+                payment = self.headers.get("PAYMENT-SIGNATURE") or self.headers.get("X-PAYMENT")
+                if not payment or not _is_payment(payment):
+                    server._count(challenges=1)
+                    required = server.payment_required(self.path)
+                    encoded = base64.b64encode(_codec.dumps(required)).decode()
+                    self._reply(402, required, {"PAYMENT-REQUIRED": encoded})
+                    return
+                server._count(payments=1)
+
+            time.sleep(config.latency)
+            if server._inject_error():
+                server._count(injected_errors=1)
+                self._reply(config.error_status, {"error": "Injected error"})
+                return
+
+            try:
+                payload = _codec.loads(body)
+            except _codec.DecodeError:
+                self._reply(400, {"error": "Request body is not valid JSON"})
+                return
+            chat = self.path == "/v1/chat/completions"
+            count = min(config.completion_tokens, payload.get("max_tokens") or config.completion_tokens)
+            tokens = _tokens(count)
+            if payload.get("stream"):
+                server._count(streams=1)
+                self._stream(payload, tokens, chat)
+            else:
+                self._reply(200, self._result(payload, "".join(tokens), count, chat))
+
+        def _result(self, payload: Dict, text: str, count: int, chat: bool) -> Dict:
+            signature, timestamp = server.sign(text)
+            result: Dict[str, Any] = {"model": payload.get("model"), "usage": _usage(count), "tee_signature": signature, "tee_timestamp": timestamp}
+            if chat:
+                result["choices"] = [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]
+            else:
+                result["completion"] = text
+            return result
+
+        def _stream(self, payload: Dict, tokens: List[str], chat: bool) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            model = payload.get("model")
+            interval = 1 / server.config.tokens_per_second if server.config.tokens_per_second else 0.0
+            time.sleep(server.config.ttft)
+            try:
+                for index, token in enumerate(tokens):
+                    if index and interval:
+                        time.sleep(interval)
+                    choice = {"index": 0, "delta": {"content": token}} if chat else {"index": 0, "text": token}
+                    self._event({"model": model, "choices": [choice]})
+
+                signature, timestamp = server.sign("".join(tokens))
+                final = {"index": 0, "delta": {}, "finish_reason": "stop"} if chat else {"index": 0, "text": "", "finish_reason": "stop"}
+                self._event(
+                    {"model": model, "choices": [final], "usage": _usage(len(tokens)), "tee_signature": signature, "tee_timestamp": timestamp}
+                )
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client closed the stream early
+                server._count(abandoned_streams=1)
+                self.close_connection = True
+
+        def _event(self, data: Dict) -> None:
+            self._write_chunk(b"data: " + _codec.dumps(data) + b"\n\n")
+
+        def _write_chunk(self, data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def _reply(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+            data = _codec.dumps(body)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _is_payment(header: str) -> bool:
+    """Whether ``header`` decodes to an x402 payment payload (signatures are not checked)."""
+    try:
+        payload = _codec.loads(base64.b64decode(header))
+    except (ValueError, *_codec.DecodeError):
+        return False
+    return isinstance(payload, dict) and "payload" in payload
+
+
+def _usage(completion_tokens: int) -> Dict[str, int]:
+    return {"prompt_tokens": 8, "completion_tokens": completion_tokens, "total_tokens": 8 + completion_tokens}
+
@@ -0,0 +1,20 @@
+"""
+pytest fixtures for testing code that uses the OpenGradient SDK.
+
+Load this module as a plugin from a ``conftest.py``
+(``pytest_plugins = ["opengradient.pytest_plugin"]``) to get the
+``mock_tee_server`` fixture.
+"""
+
+from typing import Iterator
+
+import pytest
+
+from .mock_server import MockTEEServer
+
+
+@pytest.fixture
+def mock_tee_server() -> Iterator[MockTEEServer]:
+    """A running `MockTEEServer` with the default configuration; adjust ``server.config`` as needed."""
+    with MockTEEServer() as server:
+        yield server
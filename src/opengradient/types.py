@@ -3,12 +3,15 @@ OpenGradient Specific Types
 """
 
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, IntEnum
-from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 
+from . import _codec
+from ._sse import SSEDecoder, SSEEvent
+
 
 class x402SettlementMode(str, Enum):
     """
@@ -225,6 +228,59 @@ class StreamUsage:
     total_tokens: int
 
 
+INTER_CHUNK_GAP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf"))
+"""Upper bounds in seconds of the `RequestTiming.inter_chunk_gaps` histogram buckets."""
+
+
+@dataclass
+class RequestTiming:
+    """
+    Latency breakdown of one LLM request. All durations are in seconds,
+    measured from the moment the request was issued. When a request was
+    retried or hedged, only the attempt that produced the response is timed.
+
+    Attached to ``TextGenerationOutput.timing`` and to the final
+    ``StreamChunk.timing`` of a stream, and passed to the LLM client's
+    ``metrics_callback`` when the request completes or the stream is closed.
+    """
+
+    model: str
+    """Model the request was sent to."""
+
+    streaming: bool
+    """Whether the response was streamed."""
+
+    connect_time: float = 0.0
+    """Time spent opening new TCP and TLS connections; 0 when a pooled connection was reused."""
+
+    payment_time: float = 0.0
+    """Time added by the x402 payment challenge, from sending the unpaid request to sending the paid one; 0 without a challenge."""
+
+    time_to_first_token: Optional[float] = None
+    """Time to the first chunk carrying content or tool calls (streaming), or to the response headers (non-streaming)."""
+
+    total_duration: float = 0.0
+    """Time until the final chunk or the full response body was received."""
+
+    chunks: int = 0
+    """Number of chunks received (streaming only)."""
+
+    inter_chunk_gaps: List[int] = field(default_factory=lambda: [0] * len(INTER_CHUNK_GAP_BUCKETS))
+    """Histogram of gaps between consecutive chunks: ``inter_chunk_gaps[i]`` counts gaps of at most ``INTER_CHUNK_GAP_BUCKETS[i]`` (and above the previous bound)."""
+
+    max_inter_chunk_gap: float = 0.0
+    """Longest gap between consecutive chunks."""
+
+    completion_tokens: Optional[int] = None
+    """Completion tokens reported by the server's usage data, if any."""
+
+    tokens_per_second: Optional[float] = None
+    """Completion tokens per second of generation: after the first token for streams, over the whole request otherwise."""
+
+    complete: bool = True
+    """False for a stream closed before its final chunk arrived, e.g. by ``stop_when``, the caller or an error."""
+
+
 @dataclass
 class StreamChunk:
     """
@@ -241,6 +297,7 @@ class StreamChunk:
         is_final: Whether this is the final chunk (before [DONE])
         tee_signature: RSA-PSS signature over the response, present on the final chunk
         tee_timestamp: ISO timestamp from the TEE at signing time, present on the final chunk
+        timing: Latency breakdown of the request, present on the final chunk of streams from the LLM client
     """
 
     choices: List[StreamChoice]
@@ -249,6 +306,7 @@ class StreamChunk:
     is_final: bool = False
     tee_signature: Optional[str] = None
     tee_timestamp: Optional[str] = None
+    timing: Optional[RequestTiming] = None
 
     @classmethod
     def from_sse_data(cls, data: Dict) -> "StreamChunk":
@@ -263,7 +321,10 @@ class StreamChunk:
         """
         choices = []
         for choice_data in data.get("choices", []):
-            delta_data = choice_data.get("delta", {})
+            delta_data = choice_data.get("delta")
+            if delta_data is None:
+                # Completion streams carry the new text directly on the choice
+                delta_data = {"content": choice_data.get("text")}
             delta = StreamDelta(content=delta_data.get("content"), role=delta_data.get("role"), tool_calls=delta_data.get("tool_calls"))
             choice = StreamChoice(delta=delta, index=choice_data.get("index", 0), finish_reason=choice_data.get("finish_reason"))
             choices.append(choice)
@@ -294,7 +355,8 @@ class TextGenerationStream:
     Iterator wrapper for streaming text generation responses.
 
     Provides a clean interface for iterating over stream chunks with
-    automatic parsing of SSE format.
+    automatic parsing of SSE format. The wrapped iterator yields SSE lines
+    without their terminators (e.g. ``response.iter_lines()``).
 
     Usage:
         stream = client.llm_chat(..., stream=True)
@@ -306,67 +368,63 @@ class TextGenerationStream:
     _iterator: Union[Iterator[str], AsyncIterator[str]]
     _is_async: bool = False
 
+    def __post_init__(self):
+        self._decoder = SSEDecoder()
+        self._done = False
+
     def __iter__(self):
         """Iterate over stream chunks."""
         return self
 
     def __next__(self) -> StreamChunk:
         """Get next stream chunk."""
-        import json
-
-        while True:
+        while not self._done:
             try:
                 line = next(self._iterator)
             except StopIteration:
-                raise
-
-            if not line or not line.strip():
-                continue
-
-            if not line.startswith("data: "):
-                continue
-
-            data_str = line[6:]  # Remove "data: " prefix
-
-            if data_str.strip() == "[DONE]":
-                raise StopIteration
+                self._done = True
+                events = self._decoder.flush()
+            else:
+                event = self._decoder.decode_line(line)
+                events = [event] if event is not None else []
 
-            try:
-                data = json.loads(data_str)
-                return StreamChunk.from_sse_data(data)
-            except json.JSONDecodeError:
-                # Skip malformed chunks
-                continue
+            for event in events:
+                chunk = self._parse_event(event)
+                if chunk is not None:
+                    return chunk
+        raise StopIteration
 
     async def __anext__(self) -> StreamChunk:
         """Get next stream chunk (async version)."""
-        import json
-
         if not self._is_async:
             raise TypeError("Use __next__ for sync iterators")
 
-        while True:
+        while not self._done:
             try:
                 line = await self._iterator.__anext__()
             except StopAsyncIteration:
-                raise
-
-            if not line or not line.strip():
-                continue
-
-            if not line.startswith("data: "):
-                continue
-
-            data_str = line[6:]
-
-            if data_str.strip() == "[DONE]":
-                raise StopAsyncIteration
-
-            try:
-                data = json.loads(data_str)
-                return StreamChunk.from_sse_data(data)
-            except json.JSONDecodeError:
-                continue
+                self._done = True
+                events = self._decoder.flush()
+            else:
+                event = self._decoder.decode_line(line)
+                events = [event] if event is not None else []
+
+            for event in events:
+                chunk = self._parse_event(event)
+                if chunk is not None:
+                    return chunk
+        raise StopAsyncIteration
+
+    def _parse_event(self, event: SSEEvent) -> Optional[StreamChunk]:
+        """Return the chunk carried by ``event``, or None for malformed data. Marks the stream done on ``[DONE]``."""
+        if event.data.strip() == "[DONE]":
+            self._done = True
+            return None
+        try:
+            return StreamChunk.from_sse_data(_codec.loads(event.data))
+        except _codec.DecodeError:
+            # Skip malformed chunks
+            return None
 
 
 @dataclass
@@ -396,6 +454,404 @@ class TextGenerationOutput:
     tee_timestamp: Optional[str] = None
     """ISO timestamp from the TEE at signing time."""
 
+    timing: Optional[RequestTiming] = None
+    """Latency breakdown of the request. None for outputs served from the response cache."""
+
+
+class StreamAccumulator:
+    """
+    Incrementally assembles ``StreamChunk`` objects into the ``TextGenerationOutput``
+    a non-streaming ``chat`` call would have returned.
+
+    Content deltas are collected in a list and joined once, and tool-call
+    fragments are merged by their ``index`` (``id``/``type`` taken from the
+    fragment that carries them, ``function.name`` and ``function.arguments``
+    concatenated), so the total work is linear in the size of the stream.
+    Usage, ``finish_reason``, the TEE signature and timing are taken from the
+    chunks that carry them. Only the first choice (``index`` 0) is accumulated.
+
+    Usage:
+        accumulator = StreamAccumulator()
+        for chunk in client.llm.chat(model=TEE_LLM.GPT_5, messages=[...], stream=True):
+            print(chunk.choices[0].delta.content or "", end="")
+            accumulator.add(chunk)
+        result = accumulator.result()
+
+        # Or, when only the full result is needed
+        result = StreamAccumulator().consume(client.llm.chat(..., stream=True))
+    """
+
+    def __init__(self):
+        self.model: Optional[str] = None
+        self.chunks = 0
+        self.usage: Optional[StreamUsage] = None
+        self.finish_reason: Optional[str] = None
+        self.tee_signature: Optional[str] = None
+        self.tee_timestamp: Optional[str] = None
+        self.timing: Optional[RequestTiming] = None
+
+        self._role: Optional[str] = None
+        self._content: List[str] = []
+        # index -> (tool call without function, name fragments, argument fragments)
+        self._tool_calls: Dict[int, Tuple[Dict, List[str], List[str]]] = {}
+
+    def add(self, chunk: StreamChunk) -> StreamChunk:
+        """Fold ``chunk`` into the result and return it unchanged."""
+        self.chunks += 1
+        self.model = chunk.model or self.model
+        if chunk.usage is not None:
+            self.usage = chunk.usage
+        if chunk.tee_signature is not None:
+            self.tee_signature = chunk.tee_signature
+        if chunk.tee_timestamp is not None:
+            self.tee_timestamp = chunk.tee_timestamp
+        if chunk.timing is not None:
+            self.timing = chunk.timing
+
+        for choice in chunk.choices:
+            if choice.index != 0:
+                continue
+            delta = choice.delta
+            if delta.role:
+                self._role = delta.role
+            if delta.content:
+                self._content.append(delta.content)
+            if delta.tool_calls:
+                for fragment in delta.tool_calls:
+                    self._add_tool_call(fragment)
+            if choice.finish_reason is not None:
+                self.finish_reason = choice.finish_reason
+        return chunk
+
+    def _add_tool_call(self, fragment: Dict) -> None:
+        index = fragment.get("index")
+        if index is None:
+            # Providers that send whole tool calls may omit the index; match by id instead
+            index = next(
+                (i for i, (call, _, _) in self._tool_calls.items() if fragment.get("id") and call.get("id") == fragment["id"]),
+                len(self._tool_calls),
+            )
+
+        entry = self._tool_calls.get(index)
+        if entry is None:
+            entry = self._tool_calls[index] = ({"type": "function"}, [], [])
+        call, names, arguments = entry
+
+        for key in ("id", "type"):
+            if fragment.get(key):
+                call[key] = fragment[key]
+        function = fragment.get("function") or {}
+        if function.get("name"):
+            names.append(function["name"])
+        if function.get("arguments"):
+            arguments.append(function["arguments"])
+
+    @property
+    def content(self) -> str:
+        """Text content received so far."""
+        return "".join(self._content)
+
+    def result(self) -> TextGenerationOutput:
+        """Return the assembled output."""
+        message: Dict = {"role": self._role or "assistant", "content": self.content}
+        if self._tool_calls:
+            message["tool_calls"] = [
+                {**call, "function": {"name": "".join(names), "arguments": "".join(arguments)}}
+                for _, (call, names, arguments) in sorted(self._tool_calls.items())
+            ]
+
+        return TextGenerationOutput(
+            transaction_hash="external",
+            finish_reason=self.finish_reason,
+            chat_output=message,
+            tee_signature=self.tee_signature,
+            tee_timestamp=self.tee_timestamp,
+            timing=self.timing,
+        )
+
+    def consume(self, stream: Iterable[StreamChunk]) -> TextGenerationOutput:
+        """Add every chunk of ``stream`` and return the assembled output."""
+        for chunk in stream:
+            self.add(chunk)
+        return self.result()
+
+    async def aconsume(self, stream: AsyncIterable[StreamChunk]) -> TextGenerationOutput:
+        """Async version of `consume`."""
+        async for chunk in stream:
+            self.add(chunk)
+        return self.result()
+
+
+@dataclass
+class CompletedToolCall:
+    """
+    A tool call whose arguments were fully received, as reported by ``ToolCallAssembler``.
+    """
+
+    index: int
+    """Position of the call among the tool calls of the response."""
+
+    id: Optional[str]
+    """Tool call ID assigned by the model, used as ``tool_call_id`` of the tool message."""
+
+    name: str
+    """Name of the called function."""
+
+    arguments: Dict
+    """Parsed arguments. Normally an object, but any JSON value the model sent is passed through."""
+
+    raw_arguments: str
+    """Arguments as streamed by the model."""
+
+    def to_dict(self) -> Dict:
+        """Return the call in the OpenAI format used by ``chat_output["tool_calls"]``."""
+        return {"id": self.id, "type": "function", "function": {"name": self.name, "arguments": self.raw_arguments}}
+
+
+@dataclass
+class ToolCallResult:
+    """
+    Outcome of running one tool call with ``dispatch_tool_calls``.
+
+    Exactly one of ``output`` and ``error`` is meaningful, so a failing tool
+    does not abort the other calls.
+    """
+
+    call: CompletedToolCall
+    """The tool call that was run."""
+
+    output: Any = None
+    """Return value of the tool when it succeeded."""
+
+    error: Optional[BaseException] = None
+    """Exception raised by the tool when it failed."""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    """
+    Result of a single request within a ``chat_many`` / ``completion_many`` batch.
+
+    Exactly one of ``output`` and ``error`` is set, so a failing request does
+    not abort the rest of the batch.
+    """
+
+    index: int
+    """Position of the request in the input list."""
+
+    output: Optional[TextGenerationOutput] = None
+    """Generated output when the request succeeded."""
+
+    error: Optional[Exception] = None
+    """Exception raised by the request when it failed."""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class ConnectionPoolStats:
+    """
+    Snapshot of an LLM HTTP connection pool, as returned by ``client.llm.pool_stats()``.
+    """
+
+    active_connections: int
+    """Connections currently serving a request."""
+
+    idle_connections: int
+    """Open keep-alive connections available for reuse."""
+
+    queued_requests: int
+    """Requests currently waiting for a free connection."""
+
+    pool_waits: int
+    """Total requests so far that found the pool full and had to wait for a connection."""
+
+    requests: int
+    """Total requests sent through the pool, including x402 payment retries."""
+
+    max_connections: Optional[int]
+    """Configured connection limit, or None for unlimited."""
+
+    http2: bool
+    """Whether HTTP/2 is enabled for this pool."""
+
+
+@dataclass
+class EndpointStats:
+    """
+    Health and load of one TEE LLM endpoint, as returned by ``client.llm.endpoint_stats()``.
+    """
+
+    url: str
+    """Base URL of the endpoint."""
+
+    healthy: bool
+    """False while the endpoint is ejected after repeated failures."""
+
+    outstanding: int
+    """Requests currently in flight, including open streams."""
+
+    ewma_latency: Optional[float]
+    """Moving average of the time to response headers in seconds, or None before the first response."""
+
+    requests: int
+    """Total requests sent to the endpoint."""
+
+    failures: int
+    """Total failed requests and health checks."""
+
+    ejections: int
+    """Number of times the endpoint was ejected."""
+
+
+@dataclass
+class ModelRouteStats:
+    """
+    Live statistics of one candidate model of a model router, as returned by ``router.stats()``.
+    """
+
+    model: str
+    """Model name, e.g. ``"google/gemini-2.5-flash"``."""
+
+    ewma_ttft: Optional[float]
+    """Moving average of the time to the first streamed chunk in seconds, or None before the first stream."""
+
+    ewma_latency: Optional[float]
+    """Moving average of the time to the complete response in seconds, or None before the first response."""
+
+    error_rate: float
+    """Moving average of the fraction of failed requests."""
+
+    requests: int
+    """Total requests routed to the model, including ones restored from the state file."""
+
+    failures: int
+    """Total failed requests."""
+
+
+@dataclass
+class SingleFlightStats:
+    """
+    Counters for single-flight request coalescing, as returned by ``client.llm.single_flight_stats()``.
+    """
+
+    leaders: int = 0
+    """Requests and streams that were actually sent to the TEE server."""
+
+    coalesced: int = 0
+    """Requests and streams that joined an identical in-flight one instead of being sent."""
+
+    dropped_subscribers: int = 0
+    """Shared-stream subscribers dropped for falling too far behind the upstream stream."""
+
+    @property
+    def coalesce_rate(self) -> float:
+        """Fraction of requests served by joining another request."""
+        total = self.leaders + self.coalesced
+        return self.coalesced / total if total else 0.0
+
+
+@dataclass
+class PaymentStats:
+    """
+    Counters for x402 payment negotiation, as returned by ``client.llm.payment_stats()``.
+    """
+
+    challenges: int = 0
+    """Requests that went through the 402 challenge because no payment requirements were cached."""
+
+    avoided_challenges: int = 0
+    """Requests paid pre-emptively from cached payment requirements, saving a round trip."""
+
+    stale_requirements: int = 0
+    """Pre-emptive payments rejected with a new 402 (e.g. after a price change) and re-sent."""
+
+
+@dataclass
+class PresignStats:
+    """
+    Counters for the x402 pre-signing pool, as returned by ``client.llm.presign_stats()``.
+    """
+
+    hits: int = 0
+    """Payments served from the buffer of pre-signed payloads."""
+
+    misses: int = 0
+    """Payments that had to be signed on demand because no fresh payload was ready."""
+
+    expired: int = 0
+    """Pre-signed payloads discarded because they were too old to hand out."""
+
+    signed: int = 0
+    """Payloads signed in total, ahead of time and on demand."""
+
+    signing_time: float = 0.0
+    """Total time spent signing, in seconds."""
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of payments served from the buffer."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def mean_signing_time(self) -> float:
+        """Average time to sign one payload, in seconds."""
+        return self.signing_time / self.signed if self.signed else 0.0
+
+
+@dataclass
+class JSONEvent:
+    """
+    A value parsed from a streamed JSON document by ``IncrementalJSONParser`` or ``json_events``.
+    """
+
+    path: Tuple[Union[str, int], ...]
+    """Keys and array indices leading to the value; empty for the whole document."""
+
+    value: Any
+    """The parsed value."""
+
+    complete: bool = True
+    """False for snapshots of a document that is still being streamed."""
+
+
+@dataclass
+class VerificationReport:
+    """
+    Outcome of verifying the TEE signatures of many outputs with ``verify_outputs``.
+    """
+
+    results: List[bool]
+    """Whether each output's signature is valid, in input order."""
+
+    elapsed: float
+    """Wall-clock time of the whole batch, in seconds."""
+
+    processes: int
+    """Worker processes the batch was spread over (1 when verified in-process)."""
+
+    @property
+    def valid(self) -> int:
+        """Number of outputs with a valid signature."""
+        return sum(self.results)
+
+    @property
+    def invalid_indices(self) -> List[int]:
+        """Positions of the outputs whose signature is missing or invalid."""
+        return [index for index, ok in enumerate(self.results) if not ok]
+
+    @property
+    def throughput(self) -> float:
+        """Outputs verified per second."""
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
 
 @dataclass
 class AbiFunction:
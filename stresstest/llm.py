@@ -1,22 +1,50 @@
 import argparse
 import statistics
+import time
+from typing import Optional
 
-from utils import stress_test_wrapper
+from utils import generate_unique_prompt, stress_test_wrapper
 
 import opengradient as og
 
-# Number of requests to run serially
+# Number of requests to run
 NUM_REQUESTS = 100
 MODEL = "anthropic/claude-haiku-4-5"
 
 
-def main(private_key: str):
-    client = og.Client(private_key=private_key)
+def run_concurrent(client: og.Client, concurrency: int):
+    """Fan out all requests through completion_many and record each request's own latency."""
+    requests = [{"model": MODEL, "prompt": generate_unique_prompt(i), "max_tokens": 50} for i in range(NUM_REQUESTS)]
+
+    latencies = []
+    failures = 0
+    for result in client.llm.completion_many(requests, max_concurrency=concurrency, ordered=False):
+        if result.ok:
+            # Measured by the client from when the request was sent, so time spent queued for a slot is excluded
+            latency = result.output.timing.total_duration
+            latencies.append(latency)
+            print(f"Request {result.index + 1}/{NUM_REQUESTS} completed. Latency: {latency:.4f} seconds")
+        else:
+            failures += 1
+            print(f"Request {result.index + 1}/{NUM_REQUESTS} failed. Error: {result.error}")
+
+    return latencies, failures
+
+
+def main(private_key: str, concurrency: int, server_url: Optional[str] = None):
+    # Point server_url at `opengradient mock-server` to measure the client without the live service
+    server_kwargs = {"og_llm_server_url": server_url, "og_llm_streaming_server_url": server_url} if server_url else {}
+    client = og.Client(private_key=private_key, **server_kwargs)
 
     def run_prompt(prompt: str):
         client.llm.completion(MODEL, prompt, max_tokens=50)
 
-    latencies, failures = stress_test_wrapper(run_prompt, num_requests=NUM_REQUESTS, is_llm=True)
+    start_time = time.time()
+    if concurrency > 1:
+        latencies, failures = run_concurrent(client, concurrency)
+    else:
+        latencies, failures = stress_test_wrapper(run_prompt, num_requests=NUM_REQUESTS, is_llm=True)
+    wall_time = time.time() - start_time
 
     # Calculate and print statistics
     total_requests = NUM_REQUESTS
@@ -38,6 +66,9 @@ def main(private_key: str):
     print(f"Successful Requests: {len(latencies)}")
     print(f"Failed Requests: {failures}")
     print(f"Success Rate: {success_rate:.2f}%\n")
+    print(f"Concurrency: {concurrency}")
+    print(f"Wall Time: {wall_time:.4f} seconds")
+    print(f"Throughput: {len(latencies) / wall_time:.2f} requests/second\n")
     print(f"Average Latency: {avg_latency:.4f} seconds")
     print(f"Median Latency: {median_latency:.4f} seconds")
     print(f"Min Latency: {min_latency:.4f} seconds")
@@ -53,6 +84,8 @@ def main(private_key: str):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run LLM inference stress test")
     parser.add_argument("private_key", help="Private key for inference")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of requests in flight at once (1 runs serially)")
+    parser.add_argument("--server-url", default=None, help="TEE LLM server URL, e.g. http://127.0.0.1:8402 for a local mock server")
     args = parser.parse_args()
 
-    main(args.private_key)
+    main(args.private_key, args.concurrency, args.server_url)
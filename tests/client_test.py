@@ -1,15 +1,25 @@
+import asyncio
+import gc
 import json
 import os
 import sys
-from unittest.mock import MagicMock, mock_open, patch
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock, mock_open, patch
 
+import httpx
 import pytest
+from eth_account import Account
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 from src.opengradient.client import Client
+from src.opengradient.client.exceptions import OpenGradientError
+from src.opengradient.client.llm import AsyncLLM
 from src.opengradient.types import (
     TEE_LLM,
+    StreamAccumulator,
     StreamChunk,
     TextGenerationOutput,
     x402SettlementMode,
@@ -18,6 +28,13 @@ from src.opengradient.types import (
 # --- Fixtures ---
 
 
+@pytest.fixture(autouse=True)
+def no_tls_probe():
+    """Keep TLS pinning off the network; unreachable servers fall back to default verification."""
+    with patch("src.opengradient.client._tls._fetch_server_pem", return_value=None):
+        yield
+
+
 @pytest.fixture
 def mock_web3():
     """Create a mock Web3 instance."""
@@ -202,6 +219,16 @@ class TestLLMCompletion:
             assert result.completion_output == "Hello! How can I help?"
             mock_tee.assert_called_once()
 
+    def test_llm_completion_streaming(self, client):
+        """Test that stream=True routes completion through the sync streaming bridge."""
+        with patch.object(client.llm, "_tee_llm_completion_stream_sync") as mock_stream:
+            mock_stream.return_value = iter([StreamChunk(choices=[], model="gpt-5", is_final=True)])
+
+            result = client.llm.completion(model=TEE_LLM.GPT_5, prompt="Hello", stream=True)
+
+            assert len(list(result)) == 1
+            assert mock_stream.call_args.kwargs["model"] == "gpt-5"
+
 
 class TestLLMChat:
     def test_llm_chat_success_non_streaming(self, client):
@@ -243,6 +270,432 @@ class TestLLMChat:
             mock_stream.assert_called_once()
 
 
+class TestAsyncLLM:
+    def test_llm_async_is_separate_instance(self, client):
+        """Test that llm_async shares configuration with llm but not HTTP clients."""
+        assert isinstance(client.llm_async, AsyncLLM)
+        assert client.llm_async is not client.llm._async_llm
+        assert client.llm_async._x402_client is client.llm._async_llm._x402_client
+        assert client.llm_async._request_client is None
+
+    def test_sync_chat_delegates_to_async_llm(self, client):
+        """Test that the sync facade runs AsyncLLM on its background loop."""
+        output = TextGenerationOutput(transaction_hash="external", chat_output={"role": "assistant", "content": "Hi"})
+        with patch.object(client.llm._async_llm, "_tee_llm_chat", new=AsyncMock(return_value=output)) as mock_chat:
+            result = client.llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hello"}])
+
+        assert result is output
+        assert mock_chat.await_args.kwargs["model"] == "gpt-5"
+
+    def test_async_chat_on_caller_loop(self, client):
+        """Test a full non-streaming chat round trip on the caller's event loop."""
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["payload"] = json.loads(request.content)
+            return httpx.Response(
+                200,
+                json={
+                    "choices": [{"message": {"role": "assistant", "content": "Hi there!"}, "finish_reason": "stop"}],
+                    "tee_signature": "sig",
+                    "tee_timestamp": "2025-01-01T00:00:00Z",
+                },
+            )
+
+        async def run():
+            await client.llm_async._initialize_http_clients()
+            client.llm_async._request_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                return await client.llm_async.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hello"}])
+            finally:
+                await client.llm_async.aclose()
+
+        result = asyncio.run(run())
+
+        assert result.chat_output["content"] == "Hi there!"
+        assert result.finish_reason == "stop"
+        assert result.tee_signature == "sig"
+        assert seen["payload"]["model"] == "gpt-5"
+
+    def test_async_stream_on_caller_loop(self, client):
+        """Test streaming chat yields chunks on the caller's event loop."""
+        body = (
+            b'data: {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": "Hel"}}]}\n\n'
+            b'data: {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": "lo"}, "finish_reason": "stop"}]}\n\n'
+            b"data: [DONE]\n\n"
+        )
+
+        async def run():
+            await client.llm_async._initialize_http_clients()
+            client.llm_async._stream_client = httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda request: httpx.Response(200, stream=httpx.ByteStream(body)))
+            )
+            try:
+                stream = await client.llm_async.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}], stream=True)
+                return [chunk async for chunk in stream]
+            finally:
+                await client.llm_async.aclose()
+
+        chunks = asyncio.run(run())
+
+        assert [c.choices[0].delta.content for c in chunks] == ["Hel", "lo"]
+        assert chunks[-1].is_final
+
+    def test_async_completion_stream(self, client):
+        """Test that streaming completions post to /v1/completions and yield text as typed chunks."""
+        body = (
+            b'data: {"model": "gpt-5", "choices": [{"index": 0, "text": "Once"}]}\n\n'
+            b'data: {"model": "gpt-5", "choices": [{"index": 0, "text": " upon", "finish_reason": "length"}]}\n\n'
+            b"data: [DONE]\n\n"
+        )
+        seen = {}
+
+        def handler(request):
+            seen["path"] = request.url.path
+            seen["payload"] = json.loads(request.content)
+            return httpx.Response(200, stream=httpx.ByteStream(body))
+
+        async def run():
+            await client.llm_async._initialize_http_clients()
+            client.llm_async._stream_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                stream = await client.llm_async.completion(model=TEE_LLM.GPT_5, prompt="Tell a story", stream=True)
+                return await StreamAccumulator().aconsume(stream)
+            finally:
+                await client.llm_async.aclose()
+
+        result = asyncio.run(run())
+
+        assert seen["path"] == "/v1/completions"
+        assert seen["payload"] == {"model": "gpt-5", "prompt": "Tell a story", "max_tokens": 100, "temperature": 0.0, "stream": True}
+        assert result.chat_output["content"] == "Once upon"
+        assert result.finish_reason == "length"
+
+    def test_client_aclose_closes_sync_llm_off_the_loop(self, client):
+        """Test that aclose() does not block the event loop on the sync client's shutdown."""
+        threads = []
+        close = client.llm.close
+
+        def recording_close():
+            threads.append(threading.get_ident())
+            close()
+
+        client.llm.close = recording_close
+
+        async def run():
+            await client.aclose()
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+
+        assert len(threads) == 1 and threads[0] != loop_thread
+        assert client.llm._closed
+
+    def test_closed_async_llm_raises(self, client):
+        """Test that requests after aclose() fail with OpenGradientError."""
+        async def run():
+            await client.llm_async.aclose()
+            await client.llm_async.completion(model=TEE_LLM.GPT_5, prompt="Hello")
+
+        with pytest.raises(OpenGradientError):
+            asyncio.run(run())
+
+
+class TestBatchRequests:
+    @staticmethod
+    def _fake_chat(delays, in_flight):
+        async def fake_chat(model, messages, **kwargs):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            try:
+                content = messages[0]["content"]
+                await asyncio.sleep(delays[content])
+                if content == "boom":
+                    raise OpenGradientError("request failed")
+                return TextGenerationOutput(transaction_hash="external", chat_output={"role": "assistant", "content": content})
+            finally:
+                in_flight["now"] -= 1
+
+        return fake_chat
+
+    def test_chat_many_ordered_with_per_item_errors(self, client):
+        """Test that results come back in input order and failures don't abort the batch."""
+        delays = {"slow": 0.05, "boom": 0.0, "fast": 0.0}
+        in_flight = {"now": 0, "max": 0}
+        requests = [{"model": TEE_LLM.GPT_5, "messages": [{"role": "user", "content": c}]} for c in ["slow", "boom", "fast"]]
+
+        with patch.object(client.llm._async_llm, "chat", new=self._fake_chat(delays, in_flight)):
+            results = client.llm.chat_many(requests, max_concurrency=3)
+
+        assert [r.index for r in results] == [0, 1, 2]
+        assert results[0].output.chat_output["content"] == "slow"
+        assert not results[1].ok
+        assert isinstance(results[1].error, OpenGradientError)
+        assert results[2].output.chat_output["content"] == "fast"
+
+    def test_chat_many_as_completed(self, client):
+        """Test that unordered results are yielded in completion order."""
+        delays = {"a": 0.1, "b": 0.0, "c": 0.05}
+        in_flight = {"now": 0, "max": 0}
+        requests = [{"model": TEE_LLM.GPT_5, "messages": [{"role": "user", "content": c}]} for c in ["a", "b", "c"]]
+
+        with patch.object(client.llm._async_llm, "chat", new=self._fake_chat(delays, in_flight)):
+            results = list(client.llm.chat_many(requests, ordered=False))
+
+        assert [r.index for r in results] == [1, 2, 0]
+
+    def test_chat_many_respects_max_concurrency(self, client):
+        """Test that no more than max_concurrency requests run at once."""
+        delays = {str(i): 0.01 for i in range(20)}
+        in_flight = {"now": 0, "max": 0}
+        requests = [{"model": TEE_LLM.GPT_5, "messages": [{"role": "user", "content": str(i)}]} for i in range(20)]
+
+        with patch.object(client.llm._async_llm, "chat", new=self._fake_chat(delays, in_flight)):
+            results = client.llm.chat_many(requests, max_concurrency=4)
+
+        assert all(r.ok for r in results)
+        assert in_flight["max"] == 4
+
+    def test_batch_rejects_invalid_arguments(self, client):
+        """Test validation of max_concurrency and streaming requests."""
+        with pytest.raises(ValueError):
+            client.llm.chat_many([], max_concurrency=0)
+        with pytest.raises(ValueError):
+            client.llm.chat_many([{"model": TEE_LLM.GPT_5, "messages": [], "stream": True}])
+
+
+class TestSingleFlight:
+    @staticmethod
+    def _run_concurrently(llm, handler, contents, cancel_first=False):
+        async def run():
+            with patch.object(llm, "_build_http_client", lambda transport: httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+                try:
+                    tasks = [
+                        asyncio.ensure_future(llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": c}]))
+                        for c in contents
+                    ]
+                    if cancel_first:
+                        await asyncio.sleep(0.01)
+                        tasks[0].cancel()
+                    return await asyncio.gather(*tasks, return_exceptions=True)
+                finally:
+                    await llm.aclose()
+
+        return asyncio.run(run())
+
+    @staticmethod
+    def _slow_handler(calls):
+        async def handler(request):
+            calls.append(json.loads(request.content))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": "shared"}, "finish_reason": "stop"}]})
+
+        return handler
+
+    def test_identical_requests_are_coalesced(self):
+        """Test that concurrent identical requests send one request and share its output."""
+        calls = []
+        llm = AsyncLLM(Account.create(), "http://tee.test", "http://tee.test", single_flight=True)
+
+        results = self._run_concurrently(llm, self._slow_handler(calls), ["same"] * 5 + ["other"])
+
+        assert len(calls) == 2
+        assert all(r.chat_output["content"] == "shared" for r in results)
+        assert len({id(r) for r in results}) == 6
+        stats = llm.single_flight_stats()
+        assert (stats.leaders, stats.coalesced) == (2, 4)
+        assert stats.coalesce_rate == pytest.approx(4 / 6)
+        assert llm._flights == {}
+
+    def test_disabled_by_default(self):
+        """Test that without single_flight every request is sent."""
+        calls = []
+        llm = AsyncLLM(Account.create(), "http://tee.test", "http://tee.test")
+
+        self._run_concurrently(llm, self._slow_handler(calls), ["same"] * 3)
+
+        assert len(calls) == 3
+
+    def test_cancelled_leader_does_not_fail_followers(self):
+        """Test that cancelling the caller that started a request leaves the others waiting on it."""
+        calls = []
+        llm = AsyncLLM(Account.create(), "http://tee.test", "http://tee.test", single_flight=True)
+
+        results = self._run_concurrently(llm, self._slow_handler(calls), ["same"] * 3, cancel_first=True)
+
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert [r.chat_output["content"] for r in results[1:]] == ["shared", "shared"]
+        assert len(calls) == 1
+
+
+class TestSyncStreamBridge:
+    @pytest.fixture
+    def llm(self, mock_web3, mock_abi_files):
+        client = Client(
+            private_key="0x" + "a" * 64,
+            rpc_url="https://test.rpc.url",
+            api_url="https://test.api.url",
+            contract_address="0x" + "b" * 40,
+            llm_stream_buffer_size=4,
+        )
+        yield client.llm
+        client.llm.close()
+
+    @staticmethod
+    def _endless(closed):
+        async def gen():
+            try:
+                while True:
+                    yield 1
+                    await asyncio.sleep(0)
+            finally:
+                closed.set()
+
+        return gen()
+
+    def test_slow_consumer_applies_backpressure(self, llm):
+        """Test that the producer stops pulling once the buffer is full."""
+        produced = []
+
+        async def numbers():
+            for i in range(1000):
+                produced.append(i)
+                yield i
+
+        items = llm._iterate_async(numbers())
+        assert next(items) == 0
+        time.sleep(0.1)
+
+        assert len(produced) <= 4 + 2
+        assert list(items) == list(range(1, 1000))
+
+    def test_break_closes_async_iterator(self, llm):
+        """Test that stopping iteration closes the async iterator before returning."""
+        closed = threading.Event()
+
+        for _ in llm._iterate_async(self._endless(closed)):
+            break
+
+        assert closed.is_set()
+
+    def test_garbage_collection_closes_async_iterator(self, llm):
+        """Test that an abandoned, partially consumed stream is closed when collected."""
+        closed = threading.Event()
+
+        items = llm._iterate_async(self._endless(closed))
+        next(items)
+        del items
+        gc.collect()
+
+        assert closed.is_set()
+
+    def test_break_releases_http_stream(self, llm):
+        """Test that breaking out of a sync chat stream closes the HTTP response."""
+        chunk = b'data: {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": "x"}}]}\n\n'
+
+        class TrackedStream(httpx.AsyncByteStream):
+            closed = False
+            sent = 0
+
+            async def __aiter__(self):
+                for _ in range(10000):
+                    TrackedStream.sent += 1
+                    yield chunk
+
+            async def aclose(self):
+                TrackedStream.closed = True
+
+        def handler(request):
+            return httpx.Response(200, stream=TrackedStream())
+
+        with patch.object(llm._async_llm, "_build_http_client", lambda transport: httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+            for _ in llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}], stream=True):
+                break
+
+        assert TrackedStream.closed
+        assert TrackedStream.sent < 100
+
+    def test_invalid_buffer_size(self, mock_web3, mock_abi_files):
+        with pytest.raises(ValueError):
+            Client(private_key="0x" + "a" * 64, rpc_url="https://test.rpc.url", llm_stream_buffer_size=0)
+
+
+class _SlowCompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(0.1)
+        body = json.dumps({"completion": "ok"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_llm_server():
+    """Plain-HTTP stand-in for the TEE LLM server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowCompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class TestConnectionPool:
+    def test_client_kwargs_configure_pool(self, mock_web3, mock_abi_files):
+        """Test that Client pool kwargs reach the LLM transports."""
+        client = Client(
+            private_key="0x" + "a" * 64,
+            rpc_url="https://test.rpc.url",
+            api_url="https://test.api.url",
+            contract_address="0x" + "b" * 40,
+            llm_max_connections=7,
+            llm_max_keepalive_connections=3,
+            llm_keepalive_expiry=30,
+        )
+
+        # HTTP clients are created lazily on first use
+        assert client.llm.pool_stats() == {}
+        client.llm._run_coroutine(client.llm._async_llm._initialize_http_clients())
+
+        pool = client.llm._async_llm._request_transport._pool
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+        assert pool._keepalive_expiry == 30
+        assert set(client.llm.pool_stats()) == {"request", "stream"}
+
+    def test_http2_requires_h2(self, mock_web3, mock_abi_files):
+        """Test that enabling HTTP/2 without h2 installed fails clearly."""
+        with patch("src.opengradient.client.llm.importlib.util.find_spec", return_value=None):
+            with pytest.raises(ImportError, match="h2"):
+                AsyncLLM(Account.create(), "http://127.0.0.1:1", "http://127.0.0.1:1", http2=True)
+
+    def test_pool_stats_count_waits(self, local_llm_server):
+        """Test that requests beyond max_connections are reported as pool waits."""
+
+        async def run():
+            async with AsyncLLM(
+                Account.create(), local_llm_server, local_llm_server, limits=httpx.Limits(max_connections=1)
+            ) as llm:
+                results = await asyncio.gather(*(llm.completion(model=TEE_LLM.GPT_5, prompt=str(i)) for i in range(3)))
+                return results, llm.pool_stats()["request"]
+
+        results, stats = asyncio.run(run())
+
+        assert [r.completion_output for r in results] == ["ok"] * 3
+        assert stats.requests == 3
+        assert stats.pool_waits == 2
+        assert stats.max_connections == 1
+        assert stats.idle_connections == 1
+        assert stats.active_connections == 0
+
+
 # --- StreamChunk Tests ---
 
 
@@ -304,10 +757,71 @@ class TestStreamChunk:
         assert chunk.usage.total_tokens == 30
         assert chunk.is_final
 
+    def test_from_sse_data_completion_text(self):
+        """Test that completion-style chunks expose their text as the delta content."""
+        chunk = StreamChunk.from_sse_data({"model": "gpt-5", "choices": [{"index": 0, "text": "Hello", "finish_reason": None}]})
+
+        assert chunk.choices[0].delta.content == "Hello"
+        assert not chunk.is_final
+
 
 # --- x402 Settlement Mode Tests ---
 
 
+class TestStreamAccumulator:
+    @staticmethod
+    def _chunk(delta, finish_reason=None, **extra):
+        return StreamChunk.from_sse_data({"model": "gpt-5", "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra})
+
+    def test_accumulates_content_and_metadata(self):
+        """Test that content deltas, usage, finish_reason and the TEE signature are assembled."""
+        chunks = [
+            self._chunk({"role": "assistant", "content": ""}),
+            self._chunk({"content": "Hel"}),
+            self._chunk({"content": "lo"}),
+            self._chunk({}, "stop", usage={"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}, tee_signature="sig", tee_timestamp="ts"),
+        ]
+
+        accumulator = StreamAccumulator()
+        result = accumulator.consume(chunks)
+
+        assert result.chat_output == {"role": "assistant", "content": "Hello"}
+        assert result.finish_reason == "stop"
+        assert (result.tee_signature, result.tee_timestamp) == ("sig", "ts")
+        assert accumulator.usage.completion_tokens == 2
+        assert accumulator.chunks == 4
+
+    def test_merges_tool_call_fragments_by_index(self):
+        """Test that interleaved tool-call argument fragments are merged per index."""
+        chunks = [
+            self._chunk({"tool_calls": [{"index": 0, "id": "call_a", "type": "function", "function": {"name": "get_weather", "arguments": ""}}]}),
+            self._chunk({"tool_calls": [{"index": 1, "id": "call_b", "type": "function", "function": {"name": "get_time", "arguments": '{"tz'}}]}),
+            self._chunk({"tool_calls": [{"index": 0, "function": {"arguments": '{"city": '}}]}),
+            self._chunk({"tool_calls": [{"index": 1, "function": {"arguments": '": "UTC"}'}}]}),
+            self._chunk({"tool_calls": [{"index": 0, "function": {"arguments": '"Paris"}'}}]}),
+            self._chunk({}, "tool_calls"),
+        ]
+
+        result = StreamAccumulator().consume(chunks)
+
+        assert result.finish_reason == "tool_calls"
+        assert result.chat_output["tool_calls"] == [
+            {"id": "call_a", "type": "function", "function": {"name": "get_weather", "arguments": '{"city": "Paris"}'}},
+            {"id": "call_b", "type": "function", "function": {"name": "get_time", "arguments": '{"tz": "UTC"}'}},
+        ]
+
+    def test_async_consume(self):
+        """Test assembling an async stream."""
+
+        async def stream():
+            yield self._chunk({"content": "a"})
+            yield self._chunk({"content": "b"}, "stop")
+
+        result = asyncio.run(StreamAccumulator().aconsume(stream()))
+
+        assert result.chat_output["content"] == "ab"
+
+
 class TestX402SettlementMode:
     def test_settlement_modes_values(self):
         """Test settlement mode enum values."""
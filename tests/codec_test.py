@@ -0,0 +1,73 @@
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from opengradient import _codec
+from opengradient.types import TextGenerationStream
+
+AVAILABLE = [name for name in _codec.BACKENDS if name == "json" or importlib.util.find_spec(name) is not None]
+
+
+@pytest.fixture(params=AVAILABLE)
+def backend(request):
+    previous = _codec.backend
+    _codec.use_backend(request.param)
+    yield request.param
+    _codec.use_backend(previous)
+
+
+def test_round_trip(backend):
+    payload = {"model": "openai/gpt-5", "messages": [{"role": "user", "content": "héllo ✓"}], "temperature": 0.5, "stop": None}
+
+    encoded = _codec.dumps(payload)
+
+    assert isinstance(encoded, bytes)
+    assert encoded == b'{"model":"openai/gpt-5","messages":[{"role":"user","content":"h\xc3\xa9llo \xe2\x9c\x93"}],"temperature":0.5,"stop":null}'
+    assert _codec.loads(encoded) == payload
+    assert _codec.loads(encoded.decode()) == payload
+    assert _codec.loads(memoryview(encoded)) == payload
+
+
+def test_wide_integers_fall_back_to_stdlib(backend):
+    assert _codec.loads(_codec.dumps({"value": 2**70})) == {"value": 2**70}
+
+
+def test_decode_error(backend):
+    with pytest.raises(_codec.DecodeError):
+        _codec.loads(b'{"choices": [')
+
+
+def test_stream_skips_malformed_events(backend):
+    lines = ["data: {not json", "", 'data: {"model": "m", "choices": [{"index": 0, "delta": {"content": "hi"}}]}', "", "data: [DONE]", ""]
+
+    chunks = list(TextGenerationStream(iter(lines)))
+
+    assert [chunk.choices[0].delta.content for chunk in chunks] == ["hi"]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        _codec.use_backend("simplejson")
+
+
+@pytest.mark.parametrize("requested", ["simplejson", "orjson", "msgspec"])
+def test_unavailable_env_backend_falls_back_with_warning(monkeypatch, caplog, requested):
+    monkeypatch.setenv("OPENGRADIENT_JSON_BACKEND", requested)
+
+    with patch.object(_codec.importlib.util, "find_spec", return_value=None), caplog.at_level(logging.WARNING, logger=_codec.__name__):
+        assert _codec._default_backend() == "json"
+    assert "not an installed JSON backend" in caplog.text
+
+
+def test_import_survives_missing_env_backend():
+    env = {**os.environ, "OPENGRADIENT_JSON_BACKEND": "simplejson"}
+
+    result = subprocess.run([sys.executable, "-c", "import opengradient._codec as c; print(c.backend)"], env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "json"
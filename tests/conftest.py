@@ -0,0 +1 @@
+pytest_plugins = ["opengradient.pytest_plugin"]
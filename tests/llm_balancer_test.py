@@ -0,0 +1,229 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from eth_account import Account
+
+from opengradient.client.exceptions import OpenGradientError
+from opengradient.client.llm import AsyncLLM
+from opengradient.client.llm_balancer import BalancingPolicy, EndpointBalancer, RoutingStrategy
+from opengradient.client.llm_retry import RetryPolicy
+from opengradient.types import TEE_LLM
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, initial_backoff=0, max_backoff=0)
+NO_HEALTH_CHECKS = BalancingPolicy(health_check_interval=None)
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+class _StandInServer:
+    """Local stand-in for a TEE LLM node, with switchable failures."""
+
+    def __init__(self, name):
+        self.name = name
+        self.status = 200
+        self.health_status = 200
+        self.delay = 0.0
+        self.requests = []
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._reply(owner.health_status, {"status": "ok"})
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                owner.requests.append(payload)
+                time.sleep(owner.delay)
+                if owner.status != 200:
+                    self._reply(owner.status, {"error": "unavailable"})
+                elif payload.get("stream"):
+                    self._stream()
+                else:
+                    message = {"role": "assistant", "content": owner.name}
+                    self._reply(200, {"choices": [{"message": message, "finish_reason": "stop"}]})
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self):
+                chunk = {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": owner.name}, "finish_reason": "stop"}]}
+                data = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def servers():
+    started = [_StandInServer("a"), _StandInServer("b")]
+    yield started
+    for server in started:
+        server.shutdown()
+
+
+def _balanced_llm(servers, **kwargs):
+    kwargs.setdefault("balancing_policy", NO_HEALTH_CHECKS)
+    return AsyncLLM(Account.create(), "http://unused", "http://unused", server_urls=[s.url for s in servers], **kwargs)
+
+
+class TestEndpointBalancer:
+    def test_least_outstanding(self):
+        """Test that the endpoint with the fewest requests in flight is chosen."""
+        balancer = EndpointBalancer(["http://a", "http://b"])
+        balancer.started("http://a")
+
+        assert all(balancer.choose() == "http://b" for _ in range(20))
+
+        balancer.started("http://b")
+        balancer.started("http://b")
+        assert balancer.choose() == "http://a"
+
+    def test_ewma_prefers_faster_endpoint(self):
+        """Test that latency-aware routing avoids the slower endpoint until it is busy elsewhere."""
+        balancer = EndpointBalancer(["http://a", "http://b"], BalancingPolicy(strategy=RoutingStrategy.EWMA_LATENCY))
+        for url, latency in [("http://a", 0.1), ("http://b", 0.5)]:
+            balancer.started(url)
+            balancer.responded(url, latency, ok=True)
+            balancer.finished(url)
+
+        assert balancer.choose() == "http://a"
+
+        for _ in range(5):
+            balancer.started("http://a")
+        assert balancer.choose() == "http://b"  # 0.1 s x 6 in flight > 0.5 s x 1
+
+    def test_ejection_and_reinstatement(self):
+        """Test that consecutive failures eject an endpoint and a passing health check brings it back."""
+        balancer = EndpointBalancer(["http://a", "http://b"], BalancingPolicy(eject_after=2, ejection_time=60))
+        balancer.health_checked("http://b", ok=False)
+        assert balancer.stats()["http://b"].healthy
+
+        balancer.health_checked("http://b", ok=False)
+        assert not balancer.stats()["http://b"].healthy
+        assert all(balancer.choose() == "http://a" for _ in range(20))
+
+        balancer.health_checked("http://b", ok=True)
+        assert balancer.stats()["http://b"].healthy
+        assert balancer.stats()["http://b"].ejections == 1
+
+    def test_fails_open_when_all_endpoints_ejected(self):
+        balancer = EndpointBalancer(["http://a", "http://b"], BalancingPolicy(eject_after=1))
+        balancer.health_checked("http://a", ok=False)
+        balancer.health_checked("http://b", ok=False)
+
+        assert balancer.choose() == "http://a"  # ejected first, so back first
+
+
+class TestBalancedLLM:
+    def test_requests_are_spread_over_endpoints(self, servers):
+        """Test that concurrent requests use every endpoint and leave nothing outstanding."""
+        for server in servers:
+            server.delay = 0.05
+        llm = _balanced_llm(servers)
+
+        async def run():
+            async with llm:
+                results = await asyncio.gather(*(llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES) for _ in range(20)))
+                return results, llm.pool_stats()
+
+        results, pool_stats = asyncio.run(run())
+
+        answered_by = {result.chat_output["content"] for result in results}
+        assert answered_by == {"a", "b"}
+        stats = llm.endpoint_stats()
+        assert sum(s.requests for s in stats.values()) == 20
+        assert all(s.outstanding == 0 for s in stats.values())
+        assert pool_stats["request"].requests == 20
+
+    def test_failing_endpoint_is_ejected(self, servers):
+        """Test that 5xx responses are retried on the healthy endpoint and the failing one is ejected."""
+        servers[1].status = 503
+        llm = _balanced_llm(servers, retry_policy=FAST_RETRIES, balancing_policy=BalancingPolicy(eject_after=1, health_check_interval=None))
+
+        async def run():
+            async with llm:
+                return [await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES) for _ in range(30)]
+
+        results = asyncio.run(run())
+
+        assert all(result.chat_output["content"] == "a" for result in results)
+        stats = llm.endpoint_stats()[servers[1].url]
+        assert not stats.healthy
+        assert stats.ejections == 1
+        assert len(servers[1].requests) == 1  # ties are broken randomly, so it is tried once before ejection
+
+    def test_health_checks_eject_and_reinstate(self, servers):
+        """Test that background health checks eject an unhealthy endpoint without user traffic and bring it back."""
+        servers[1].health_status = 503
+        policy = BalancingPolicy(eject_after=1, ejection_time=60, health_check_interval=0.05)
+        llm = _balanced_llm(servers, balancing_policy=policy)
+
+        async def wait_for(healthy):
+            for _ in range(100):
+                if llm.endpoint_stats()[servers[1].url].healthy == healthy:
+                    return
+                await asyncio.sleep(0.02)
+            raise AssertionError("health checks did not update the endpoint")
+
+        async def run():
+            async with llm:
+                await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES)
+                await wait_for(healthy=False)
+                servers[1].health_status = 200
+                await wait_for(healthy=True)
+
+        asyncio.run(run())
+
+    def test_stream_is_outstanding_until_closed(self, servers):
+        """Test that a stream counts against its endpoint until the response is closed."""
+        llm = _balanced_llm(servers)
+
+        async def run():
+            async with llm:
+                stream = await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES, stream=True)
+                first = await stream.__anext__()
+                in_flight = sum(s.outstanding for s in llm.endpoint_stats().values())
+                await stream.aclose()
+                return first, in_flight
+
+        first, in_flight = asyncio.run(run())
+
+        assert first.choices[0].delta.content in ("a", "b")
+        assert in_flight == 1
+        assert all(s.outstanding == 0 for s in llm.endpoint_stats().values())
+
+    def test_all_endpoints_down(self, servers):
+        for server in servers:
+            server.status = 503
+        llm = _balanced_llm(servers, retry_policy=FAST_RETRIES)
+
+        async def run():
+            async with llm:
+                await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES)
+
+        with pytest.raises(OpenGradientError, match="503"):
+            asyncio.run(run())
+        assert sum(len(server.requests) for server in servers) == 3
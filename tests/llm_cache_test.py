@@ -0,0 +1,240 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import httpx
+from eth_account import Account
+
+from opengradient.client.llm import AsyncLLM
+from opengradient.client.llm_cache import LLMResponseCache, request_key
+from opengradient.types import TEE_LLM, TextGenerationOutput, x402SettlementMode
+
+
+def _output(content="Hi", signature="sig"):
+    return TextGenerationOutput(
+        transaction_hash="external",
+        finish_reason="stop",
+        chat_output={"role": "assistant", "content": content},
+        tee_signature=signature,
+        tee_timestamp="2025-01-01T00:00:00Z",
+    )
+
+
+class TestRequestKey:
+    def test_key_ignores_dict_order(self):
+        """Test that payloads differing only in key order hash identically."""
+        a = {"model": "gpt-5", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 10}
+        b = {"max_tokens": 10, "messages": [{"content": "hi", "role": "user"}], "model": "gpt-5"}
+
+        assert request_key("/v1/chat/completions", a, x402SettlementMode.SETTLE) == request_key(
+            "/v1/chat/completions", b, x402SettlementMode.SETTLE
+        )
+
+    def test_key_depends_on_settlement_mode_and_endpoint(self):
+        """Test that settlement mode and endpoint are part of the key."""
+        payload = {"model": "gpt-5", "prompt": "hi"}
+
+        keys = {
+            request_key("/v1/completions", payload, x402SettlementMode.SETTLE),
+            request_key("/v1/completions", payload, x402SettlementMode.SETTLE_BATCH),
+            request_key("/v1/chat/completions", payload, x402SettlementMode.SETTLE),
+        }
+        assert len(keys) == 3
+
+
+class TestMemoryTier:
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LLMResponseCache(max_entries=2)
+        cache.put("a", _output("a"))
+        cache.put("b", _output("b"))
+        cache.get("a")
+        cache.put("c", _output("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a").chat_output["content"] == "a"
+        assert cache.get("c").chat_output["content"] == "c"
+
+    def test_returns_copies(self):
+        """Test that mutating a returned output does not corrupt the cache."""
+        cache = LLMResponseCache()
+        cache.put("a", _output("a"))
+        cache.get("a").chat_output["content"] = "mutated"
+
+        assert cache.get("a").chat_output["content"] == "a"
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after ttl seconds."""
+        cache = LLMResponseCache(ttl=10)
+        with patch("opengradient.client.llm_cache.time.time", return_value=1000.0):
+            cache.put("a", _output())
+        with patch("opengradient.client.llm_cache.time.time", return_value=1005.0):
+            assert cache.get("a") is not None
+        with patch("opengradient.client.llm_cache.time.time", return_value=1011.0):
+            assert cache.get("a") is None
+
+    def test_stats(self):
+        """Test hit/miss accounting."""
+        cache = LLMResponseCache()
+        cache.get("a")
+        cache.put("a", _output())
+        cache.get("a")
+
+        assert cache.stats.memory_hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.hit_rate == 0.5
+
+
+class TestDiskTier:
+    def test_persists_across_instances_with_provenance(self, tmp_path):
+        """Test that the disk tier survives restarts and keeps the TEE signature."""
+        path = tmp_path / "cache.sqlite"
+        first = LLMResponseCache(disk_path=path)
+        first.put("a", _output("a", signature="original-sig"))
+        first.close()
+
+        second = LLMResponseCache(disk_path=path)
+        result = second.get("a")
+
+        assert result == _output("a", signature="original-sig")
+        assert second.stats.disk_hits == 1
+        # Promoted into memory
+        second.get("a")
+        assert second.stats.memory_hits == 1
+
+    def test_entries_from_other_versions_are_evicted_misses(self, tmp_path):
+        """Test that entries written for other output fields, or that do not decode, are treated as misses and removed."""
+        path = tmp_path / "cache.sqlite"
+        cache = LLMResponseCache(disk_path=path)
+        cache.put("current", _output("current"))
+        legacy = {**_output("legacy").__dict__, "removed_field": 1}
+        for key, value in [("legacy", json.dumps(legacy)), ("renamed", json.dumps({"format": "old", "output": {}})), ("broken", "not json")]:
+            cache._db.execute("INSERT INTO llm_responses VALUES (?, ?, 0, 0, ?)", (key, value, len(value)))
+        cache.close()
+
+        reopened = LLMResponseCache(disk_path=path)
+
+        assert [reopened.get(key) for key in ("legacy", "renamed", "broken")] == [None, None, None]
+        assert reopened.get("current") == _output("current")
+        assert reopened._db.execute("SELECT key FROM llm_responses").fetchall() == [("current",)]
+
+    def test_size_eviction(self, tmp_path):
+        """Test that the disk tier is trimmed to max_disk_bytes, oldest access first."""
+        probe = LLMResponseCache(disk_path=tmp_path / "probe.sqlite")
+        probe.put("x", _output("x" * 100))
+        (entry_size,) = probe._db.execute("SELECT size FROM llm_responses").fetchone()
+        probe.close()
+        cache = LLMResponseCache(max_entries=0, disk_path=tmp_path / "cache.sqlite", max_disk_bytes=int(entry_size * 2.5))
+
+        with patch("opengradient.client.llm_cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0, 5.0]):
+            cache.put("a", _output("x" * 100))
+            cache.put("b", _output("y" * 100))
+            cache.get("a")
+            cache.put("c", _output("z" * 100))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_running_size_total(self, tmp_path):
+        """Test that the stored size total tracks replacements, expiry and clear, including for files from older versions."""
+        path = tmp_path / "cache.sqlite"
+        legacy = sqlite3.connect(str(path))
+        legacy.execute(
+            "CREATE TABLE llm_responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        legacy.execute("INSERT INTO llm_responses VALUES ('old', '{}', 0, 0, 7)")
+        legacy.commit()
+        legacy.close()
+
+        cache = LLMResponseCache(disk_path=path, ttl=10)
+
+        def totals():
+            return cache._db.execute("SELECT (SELECT total FROM llm_responses_size), (SELECT COALESCE(SUM(size), 0) FROM llm_responses)").fetchone()
+
+        assert totals() == (7, 7)
+        with patch("opengradient.client.llm_cache.time.time", return_value=100.0):
+            cache.put("a", _output("short"))
+            cache.put("a", _output("a much longer answer"))
+            cache.put("b", _output("b"))
+        total, actual = totals()
+        assert total == actual and total > 0
+        assert cache._db.execute("SELECT COUNT(*) FROM llm_responses").fetchone() == (2,)  # "old" expired
+
+        cache.clear()
+        assert totals() == (0, 0)
+
+    def test_async_disk_io_runs_off_the_event_loop(self, tmp_path):
+        """Test that aget/aput reach SQLite from a worker thread and serve memory hits inline."""
+        cache = LLMResponseCache(max_entries=1, disk_path=tmp_path / "cache.sqlite")
+        threads = []
+        disk_get, disk_put = cache._disk_get, cache._disk_put
+        cache._disk_get = lambda *args: threads.append(threading.get_ident()) or disk_get(*args)
+        cache._disk_put = lambda *args: threads.append(threading.get_ident()) or disk_put(*args)
+
+        async def run():
+            await cache.aput("a", _output("a"))
+            await cache.aput("b", _output("b"))  # evicts "a" from memory
+            disk_hit = await cache.aget("a")
+            memory_hit = await cache.aget("a")
+            return disk_hit, memory_hit
+
+        disk_hit, memory_hit = asyncio.run(run())
+
+        assert disk_hit == memory_hit == _output("a")
+        assert len(threads) == 3 and threading.get_ident() not in threads
+        assert (cache.stats.disk_hits, cache.stats.memory_hits) == (1, 1)
+
+
+class TestLLMIntegration:
+    @staticmethod
+    def _run_chats(cache, temperatures):
+        calls = []
+
+        def handler(request):
+            calls.append(json.loads(request.content))
+            return httpx.Response(
+                200,
+                json={
+                    "choices": [{"message": {"role": "assistant", "content": f"answer {len(calls)}"}, "finish_reason": "stop"}],
+                    "tee_signature": f"sig-{len(calls)}",
+                },
+            )
+
+        async def run():
+            llm = AsyncLLM(Account.create(), "http://127.0.0.1:1", "http://127.0.0.1:1", cache=cache)
+            await llm._initialize_http_clients()
+            llm._request_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            results = []
+            for temperature in temperatures:
+                results.append(
+                    await llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "hi"}], temperature=temperature)
+                )
+            await llm.aclose()
+            return results
+
+        return asyncio.run(run()), calls
+
+    def test_deterministic_requests_hit_cache(self):
+        """Test that a repeated temperature=0 chat is served from the cache with its original signature."""
+        results, calls = self._run_chats(LLMResponseCache(), [0.0, 0.0])
+
+        assert len(calls) == 1
+        assert results[1].chat_output["content"] == "answer 1"
+        assert results[1].tee_signature == "sig-1"
+
+    def test_sampled_requests_bypass_cache(self):
+        """Test that temperature > 0 requests are never cached."""
+        cache = LLMResponseCache()
+        results, calls = self._run_chats(cache, [0.7, 0.7])
+
+        assert len(calls) == 2
+        assert cache.stats.misses == 0
+
+    def test_no_cache_by_default(self):
+        """Test that caching is opt-in."""
+        _, calls = self._run_chats(None, [0.0, 0.0])
+
+        assert len(calls) == 2
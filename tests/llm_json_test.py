@@ -0,0 +1,177 @@
+import asyncio
+import json
+import random
+import time
+
+import pytest
+
+from opengradient.client.llm_json import IncrementalJSONParser, ajson_events, json_events
+from opengradient.types import JSONEvent, StreamChunk
+
+DOCUMENT = {
+    "title": 'Quote " and \\ backslash, café 中',
+    "score": -12.5e3,
+    "items": [1, {"nested": [True, None]}, "last"],
+    "ok": False,
+    "zero": 0,
+    "empty": {},
+}
+
+
+def _chunk(text):
+    return StreamChunk.from_sse_data({"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": text}}]})
+
+
+class _Stream:
+    """Iterable of chunks that records how far it was read and whether it was closed."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            self.read += 1
+            yield _chunk(piece)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_any_split_parses_to_the_same_document(ensure_ascii):
+    text = "Sure, here it is:\n```json\n" + json.dumps(DOCUMENT, ensure_ascii=ensure_ascii) + "\n```"
+    rng = random.Random(0)
+
+    for _ in range(100):
+        parser = IncrementalJSONParser()
+        events, pos = [], 0
+        while pos < len(text):
+            size = rng.randint(1, 5)
+            events += parser.feed(text[pos : pos + size])
+            parser.partial()  # valid at every point of the stream
+            pos += size
+        events += parser.close()
+
+        assert parser.value == DOCUMENT
+        assert [event.path for event in events] == [("title",), ("score",), ("items",), ("ok",), ("zero",), ("empty",), ()]
+        assert events[-1].value == DOCUMENT
+
+
+def test_fields_are_reported_as_soon_as_they_close():
+    parser = IncrementalJSONParser()
+
+    assert parser.feed('{"a": "done", "b": [1, 2') == [JSONEvent(path=("a",), value="done")]
+    assert parser.feed("]") == [JSONEvent(path=("b",), value=[1, 2])]
+    assert parser.feed(', "c": 1') == []  # more digits may follow
+    assert parser.feed("0}") == [JSONEvent(path=("c",), value=10), JSONEvent(path=(), value={"a": "done", "b": [1, 2], "c": 10})]
+    assert parser.done
+
+
+def test_deeper_levels_with_max_depth():
+    parser = IncrementalJSONParser(max_depth=2)
+
+    events = parser.feed('[{"x": 1}, [2]]')
+
+    assert [event.path for event in events] == [(0, "x"), (0,), (1, 0), (1,), ()]
+
+
+def test_partial_includes_the_string_being_streamed():
+    parser = IncrementalJSONParser()
+    parser.feed('{"done": [1], "text": "caf\\u00')
+    assert parser.partial() == {"done": [1], "text": "caf"}
+
+    parser.feed('e9 au lait\\')
+    assert parser.partial() == {"done": [1], "text": "café au lait"}
+
+    # Open containers are copied; completed values are shared
+    parser.partial()["extra"] = 1
+    assert "extra" not in parser.partial()
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_partial_string_is_a_prefix_at_every_character(ensure_ascii):
+    value = 'Quote " and \\ backslash, café 😀 end' * 3
+    text = json.dumps({"text": value}, ensure_ascii=ensure_ascii)
+    parser = IncrementalJSONParser()
+
+    for char in text:
+        parser.feed(char)
+        snapshot = parser.partial()
+        assert snapshot is None or value.startswith(snapshot.get("text", ""))
+
+    assert parser.value == {"text": value}
+
+
+def test_long_string_fed_one_character_at_a_time_is_linear():
+    value = "x" * 1_000_000
+    parser = IncrementalJSONParser()
+
+    started = time.monotonic()
+    for char in '{"text": "' + value + '"}':
+        parser.feed(char)
+    elapsed = time.monotonic() - started
+
+    assert parser.value == {"text": value}
+    assert elapsed < 10  # re-copying the buffer on every delta takes far longer
+
+
+def test_invalid_and_truncated_documents():
+    with pytest.raises(json.JSONDecodeError, match="':' delimiter"):
+        IncrementalJSONParser().feed('{"a" 1}')
+
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": [1, 2')
+    with pytest.raises(json.JSONDecodeError, match="Unterminated"):
+        parser.close()
+
+
+def test_scalar_root_without_prefix_skipping():
+    parser = IncrementalJSONParser(skip_prefix=False)
+    assert parser.feed("4") == []
+    assert parser.close() == [JSONEvent(path=(), value=4)]
+
+
+def test_json_events_stops_early_and_closes_stream():
+    stream = _Stream(['{"answer": ', '"yes"', ', "reasoning": "long', " text", '..."}'])
+
+    for event in json_events(stream):
+        if event.path == ("answer",):
+            break
+
+    assert stream.read == 2  # a string is complete at its closing quote
+    assert stream.closed
+
+
+def test_json_events_with_partial_snapshots():
+    stream = _Stream(['{"a": "x', 'y", "b": 1}'])
+
+    events = list(json_events(stream, partial=True))
+
+    assert events == [
+        JSONEvent(path=(), value={"a": "x"}, complete=False),
+        JSONEvent(path=("a",), value="xy"),
+        JSONEvent(path=("b",), value=1),
+        JSONEvent(path=(), value={"a": "xy", "b": 1}),
+    ]
+    assert stream.closed
+
+
+def test_ajson_events():
+    closed = []
+
+    async def stream():
+        try:
+            for piece in ['[1, {"k"', ": 2}]"]:
+                yield _chunk(piece)
+        finally:
+            closed.append(True)
+
+    async def run():
+        return [event async for event in ajson_events(stream())]
+
+    events = asyncio.run(run())
+
+    assert [(event.path, event.value) for event in events] == [((0,), 1), ((1,), {"k": 2}), ((), [1, {"k": 2}])]
+    assert closed == [True]
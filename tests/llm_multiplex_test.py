@@ -0,0 +1,202 @@
+import asyncio
+
+import pytest
+from eth_account import Account
+
+from opengradient.client.exceptions import OpenGradientError
+from opengradient.client.llm import AsyncLLM
+from opengradient.client.llm_multiplex import StreamMultiplexer
+from opengradient.types import TEE_LLM
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+class _Source:
+    """Upstream stream whose items are released one at a time by the test."""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = False
+        self.items: asyncio.Queue = asyncio.Queue()
+
+    def open(self):
+        self.opened += 1
+        return self._iterate()
+
+    async def _iterate(self):
+        try:
+            while True:
+                item = await self.items.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.closed = True
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def _collect(stream):
+    return [item async for item in stream]
+
+
+class TestStreamMultiplexer:
+    def test_late_joiner_replays_then_follows(self):
+        async def run():
+            source, multiplexer = _Source(), StreamMultiplexer()
+            first = asyncio.ensure_future(_collect(multiplexer.subscribe("k", source.open)))
+            for item in (1, 2):
+                source.items.put_nowait(item)
+            await _settle()
+
+            second = asyncio.ensure_future(_collect(multiplexer.subscribe("k", source.open)))
+            source.items.put_nowait(3)
+            source.items.put_nowait(None)
+            return await first, await second, source, multiplexer
+
+        first, second, source, multiplexer = asyncio.run(run())
+
+        assert first == second == [1, 2, 3]
+        assert source.opened == 1
+        assert (multiplexer.stats.leaders, multiplexer.stats.coalesced) == (1, 1)
+
+    def test_slow_subscriber_is_dropped_without_stalling_others(self):
+        async def run():
+            source, multiplexer = _Source(), StreamMultiplexer(subscriber_buffer_size=2)
+            fast = asyncio.ensure_future(_collect(multiplexer.subscribe("k", source.open)))
+            slow = multiplexer.subscribe("k", source.open)  # not read until the burst is over
+            for item in range(5):
+                source.items.put_nowait(item)
+                await _settle()
+            source.items.put_nowait(None)
+            fast_items = await asyncio.wait_for(fast, 2)
+            with pytest.raises(OpenGradientError, match="fell more than 2 chunks behind"):
+                await _collect(slow)
+            return fast_items, multiplexer
+
+        fast_items, multiplexer = asyncio.run(run())
+
+        assert fast_items == [0, 1, 2, 3, 4]
+        assert multiplexer.stats.dropped_subscribers == 1
+
+    def test_upstream_pauses_while_every_subscriber_is_full(self):
+        async def run():
+            source, multiplexer = _Source(), StreamMultiplexer(subscriber_buffer_size=2)
+            stream = multiplexer.subscribe("k", source.open)
+            for item in range(10):
+                source.items.put_nowait(item)
+            source.items.put_nowait(None)
+            await _settle()
+            assert await stream.__anext__() == 0
+            await _settle()
+            consumed = 11 - source.items.qsize()
+            rest = await _collect(stream)
+            return consumed, rest, multiplexer
+
+        consumed, rest, multiplexer = asyncio.run(run())
+
+        assert consumed <= 1 + 2  # one chunk read, plus a full buffer
+        assert rest == list(range(1, 10))
+        assert multiplexer.stats.dropped_subscribers == 0
+
+    def test_upstream_error_reaches_every_subscriber(self):
+        async def run():
+            source, multiplexer = _Source(), StreamMultiplexer()
+            streams = [asyncio.ensure_future(_collect(multiplexer.subscribe("k", source.open))) for _ in range(2)]
+            source.items.put_nowait(1)
+            source.items.put_nowait(RuntimeError("upstream failed"))
+            return await asyncio.gather(*streams, return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, OpenGradientError) for result in results)
+        assert all(isinstance(result.__cause__, RuntimeError) for result in results)
+        assert results[0] is not results[1]
+        assert results[0].__cause__ is results[1].__cause__
+
+    def test_upstream_closed_when_all_subscribers_leave(self):
+        async def run():
+            source, multiplexer = _Source(), StreamMultiplexer()
+            streams = [multiplexer.subscribe("k", source.open) for _ in range(2)]
+            source.items.put_nowait(1)
+            for stream in streams:
+                assert await stream.__anext__() == 1
+
+            await streams[0].aclose()
+            await _settle()
+            still_open = not source.closed
+            await streams[1].aclose()
+            await _settle()
+            return still_open, source
+
+        still_open, source = asyncio.run(run())
+
+        assert still_open
+        assert source.closed
+
+    def test_stream_cancelled_by_last_subscriber_is_not_joined(self):
+        async def run():
+            source, multiplexer = _Source(), StreamMultiplexer()
+            first = multiplexer.subscribe("k", source.open)
+            source.items.put_nowait(1)
+            assert await first.__anext__() == 1
+            await first.aclose()
+
+            # Joins before the cancelled pump has run again
+            other = _Source()
+            second = multiplexer.subscribe("k", other.open)
+            other.items.put_nowait("fresh")
+            other.items.put_nowait(None)
+            return await _collect(second), multiplexer
+
+        second, multiplexer = asyncio.run(run())
+
+        assert second == ["fresh"]
+        assert (multiplexer.stats.leaders, multiplexer.stats.coalesced) == (2, 0)
+
+    def test_stream_past_replay_size_is_not_joined(self):
+        async def run():
+            source, multiplexer = _Source(), StreamMultiplexer(replay_size=2)
+            first = multiplexer.subscribe("k", source.open)
+            for item in (1, 2, 3):
+                source.items.put_nowait(item)
+            await _settle()
+
+            other = _Source()
+            second = multiplexer.subscribe("k", other.open)
+            other.items.put_nowait("fresh")
+            other.items.put_nowait(None)
+            source.items.put_nowait(None)
+            return await _collect(first), await _collect(second)
+
+        first, second = asyncio.run(run())
+
+        assert first == [1, 2, 3]
+        assert second == ["fresh"]
+
+
+def test_identical_streams_share_one_upstream_request(mock_tee_server):
+    mock_tee_server.config.tokens_per_second = 200
+    llm = AsyncLLM(Account.create(), mock_tee_server.url, mock_tee_server.url, single_flight=True)
+
+    async def read_stream():
+        stream = await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES, stream=True)
+        return "".join([chunk.choices[0].delta.content or "" async for chunk in stream])
+
+    async def run():
+        async with llm:
+            first = asyncio.ensure_future(read_stream())
+            await asyncio.sleep(0.03)  # join mid-stream
+            return await asyncio.gather(first, read_stream(), read_stream())
+
+    texts = asyncio.run(run())
+
+    assert len(set(texts)) == 1 and len(texts[0].split()) == 16
+    assert mock_tee_server.stats.streams == 1
+    stats = llm.single_flight_stats()
+    assert (stats.leaders, stats.coalesced) == (1, 2)
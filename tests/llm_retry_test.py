@@ -0,0 +1,236 @@
+import asyncio
+import ssl
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from eth_account import Account
+
+from opengradient.client.exceptions import OpenGradientError
+from opengradient.client.llm import AsyncLLM
+from opengradient.client.llm_retry import NO_RETRY, Attempt, HedgePolicy, LatencyTracker, RetryPolicy
+from opengradient.types import TEE_LLM
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, initial_backoff=0, max_backoff=0)
+CHAT_RESPONSE = {"choices": [{"message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}]}
+
+
+def _status_error(status_code, headers=None):
+    request = httpx.Request("POST", "http://tee.test/v1/chat/completions")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def _run_chat(handler, **llm_kwargs):
+    llm = AsyncLLM(Account.create(), "http://tee.test", "http://tee.test", **llm_kwargs)
+
+    async def run():
+        with patch.object(llm, "_build_http_client", lambda transport: httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+            try:
+                return await llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}])
+            finally:
+                await llm.aclose()
+
+    return asyncio.run(run())
+
+
+class TestRetryPolicy:
+    def test_unpaid_failures_are_retryable(self):
+        """Test that connection problems and retryable statuses are retried before payment."""
+        policy = RetryPolicy()
+
+        assert policy.is_retryable(httpx.ConnectError("refused"), paid=False)
+        assert policy.is_retryable(httpx.ReadError("reset"), paid=False)
+        assert policy.is_retryable(_status_error(503), paid=False)
+        assert policy.is_retryable(_status_error(429), paid=False)
+        assert not policy.is_retryable(_status_error(400), paid=False)
+        assert not policy.is_retryable(ValueError("bad json"), paid=False)
+
+    def test_paid_failures_only_retry_when_not_settled(self):
+        """Test that a paid attempt is only resent when it never reached the server or was rejected before settlement."""
+        policy = RetryPolicy()
+
+        assert policy.is_retryable(httpx.ConnectTimeout("timeout"), paid=True)
+        assert not policy.is_retryable(httpx.ReadError("reset"), paid=True)
+        assert policy.is_retryable(_status_error(503), paid=True)
+        assert not policy.is_retryable(_status_error(503, {"PAYMENT-RESPONSE": "settled"}), paid=True)
+        assert not policy.is_retryable(_status_error(502, {"X-PAYMENT-RESPONSE": "settled"}), paid=True)
+        assert not policy.is_retryable(_status_error(400), paid=True)
+
+    def test_certificate_errors_are_not_retried(self):
+        """Test that pin mismatches are left to re-pinning rather than retried."""
+        try:
+            try:
+                raise ssl.SSLCertVerificationError("certificate verify failed")
+            except ssl.SSLError as e:
+                raise httpx.ConnectError("handshake failed") from e
+        except httpx.ConnectError as error:
+            assert not RetryPolicy().is_retryable(error, paid=False)
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test full-jitter exponential backoff bounds and Retry-After handling."""
+        policy = RetryPolicy(initial_backoff=1.0, max_backoff=3.0)
+
+        assert all(0 <= policy.backoff(1) <= 1.0 for _ in range(100))
+        assert all(0 <= policy.backoff(5) <= 3.0 for _ in range(100))
+        assert policy.backoff(1, _status_error(429, {"Retry-After": "2"})) >= 2.0
+        assert policy.backoff(1, _status_error(429, {"Retry-After": "60"})) <= 3.0
+
+    def test_attempt_observes_payment_header(self):
+        """Test that an attempt becomes paid once a payment signature is sent."""
+        attempt = Attempt()
+        attempt.observe(httpx.Request("POST", "http://tee.test"))
+        assert not attempt.paid
+
+        attempt.observe(httpx.Request("POST", "http://tee.test", headers={"PAYMENT-SIGNATURE": "sig"}))
+        assert attempt.paid
+
+    def test_invalid_max_attempts(self):
+        with pytest.raises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+
+class TestLatencyTracker:
+    def test_percentile(self):
+        """Test nearest-rank percentiles over the sliding window."""
+        tracker = LatencyTracker(window=100)
+        assert tracker.percentile(0.95) is None
+
+        for i in range(1, 201):
+            tracker.record(float(i))
+
+        assert len(tracker) == 100
+        assert tracker.percentile(0.95) == 195.0
+        assert tracker.percentile(0.5) == 150.0
+
+
+class TestRetries:
+    def test_retries_transient_status(self):
+        """Test that a 503 before payment is retried and the retry's answer returned."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                return httpx.Response(503)
+            return httpx.Response(200, json=CHAT_RESPONSE)
+
+        result = _run_chat(handler, retry_policy=FAST_RETRIES)
+
+        assert result.chat_output["content"] == "ok"
+        assert len(calls) == 3
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that the last failure is raised once attempts are exhausted."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+
+        with pytest.raises(OpenGradientError, match="502"):
+            _run_chat(handler, retry_policy=FAST_RETRIES)
+        assert len(calls) == 3
+
+    def test_paid_request_is_not_resent(self):
+        """Test that a connection reset after payment was sent is not retried."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            request.extensions[Attempt.EXTENSION].paid = True
+            raise httpx.ReadError("connection reset", request=request)
+
+        with pytest.raises(OpenGradientError, match="connection reset"):
+            _run_chat(handler, retry_policy=FAST_RETRIES)
+        assert len(calls) == 1
+
+    def test_no_retry_policy(self):
+        """Test that retries can be disabled."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        with pytest.raises(OpenGradientError):
+            _run_chat(handler, retry_policy=NO_RETRY)
+        assert len(calls) == 1
+
+    def test_stream_open_is_retried(self):
+        """Test that a retryable status when opening a stream is retried."""
+        body = b'data: {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": "ok"}, "finish_reason": "stop"}]}\n\n'
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(503, content=b"busy")
+            return httpx.Response(200, stream=httpx.ByteStream(body))
+
+        llm = AsyncLLM(Account.create(), "http://tee.test", "http://tee.test", retry_policy=FAST_RETRIES)
+
+        async def run():
+            with patch.object(llm, "_build_http_client", lambda transport: httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+                try:
+                    stream = await llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}], stream=True)
+                    return [chunk async for chunk in stream]
+                finally:
+                    await llm.aclose()
+
+        chunks = asyncio.run(run())
+
+        assert [c.choices[0].delta.content for c in chunks] == ["ok"]
+        assert len(calls) == 2
+
+
+class TestHedging:
+    def test_hedge_wins_over_slow_primary(self):
+        """Test that a slow request is hedged and the faster copy's answer is returned."""
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                await asyncio.sleep(2)
+                return httpx.Response(200, json={"choices": [{"message": {"content": "slow"}}]})
+            return httpx.Response(200, json=CHAT_RESPONSE)
+
+        start = time.monotonic()
+        result = _run_chat(handler, retry_policy=NO_RETRY, hedge_policy=HedgePolicy(initial_delay=0.05))
+
+        assert result.chat_output["content"] == "ok"
+        assert len(calls) == 2
+        assert time.monotonic() - start < 1.5
+
+    def test_fast_request_is_not_hedged(self):
+        """Test that requests answering before the hedge delay are sent once."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=CHAT_RESPONSE)
+
+        _run_chat(handler, hedge_policy=HedgePolicy(initial_delay=5))
+
+        assert len(calls) == 1
+
+    def test_hedge_delay_follows_latency_percentile(self):
+        """Test that recorded latencies replace the initial hedge delay."""
+        llm = AsyncLLM(Account.create(), "http://tee.test", "http://tee.test", hedge_policy=HedgePolicy(min_samples=5))
+        calls = []
+
+        async def call():
+            calls.append(time.monotonic())
+            await asyncio.sleep(0.3 if len(calls) == 6 else 0.01)
+            return len(calls)
+
+        async def run():
+            for _ in range(5):
+                await llm._hedged(("/v1/chat/completions", "gpt-5"), call)
+            # Initial delay is 5 s, but p95 of the samples is ~10 ms, so this one is hedged
+            return await llm._hedged(("/v1/chat/completions", "gpt-5"), call)
+
+        assert asyncio.run(run()) == 7
+        assert len(calls) == 7
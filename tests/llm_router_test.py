@@ -0,0 +1,257 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from eth_account import Account
+
+from opengradient.client.exceptions import OpenGradientError
+from opengradient.client.llm import LLM
+from opengradient.client.llm_router import AsyncModelRouter, ModelRouter, RouterPolicy
+from opengradient.types import TEE_LLM, StreamChunk, TextGenerationOutput
+
+FAST, SLOW, FLAKY = TEE_LLM.GEMINI_2_5_FLASH, TEE_LLM.GPT_5_MINI, TEE_LLM.CLAUDE_HAIKU_4_5
+MESSAGES = [{"role": "user", "content": "Hi"}]
+NO_EXPLORATION = RouterPolicy(exploration=0.0)
+
+
+class _FakeLLM:
+    """Answers after a fixed delay per model; models in ``failing`` raise."""
+
+    def __init__(self, delays, failing=()):
+        self.delays = delays
+        self.failing = set(failing)
+        self.calls = []
+        self.cancelled = []
+        self.closed_streams = []
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        self.calls.append(model)
+        if stream:
+            return self._stream(model)
+        try:
+            await asyncio.sleep(self.delays[model])
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if model in self.failing:
+            raise OpenGradientError(f"{model.value} failed")
+        return TextGenerationOutput(transaction_hash="external", chat_output={"role": "assistant", "content": model.value})
+
+    async def _stream(self, model):
+        try:
+            await asyncio.sleep(self.delays[model])
+            if model in self.failing:
+                raise OpenGradientError(f"{model.value} failed")
+            for word in ("a", "b"):
+                yield StreamChunk.from_sse_data({"model": model.value, "choices": [{"index": 0, "delta": {"content": word}}]})
+        finally:
+            self.closed_streams.append(model)
+
+
+def _router(llm, models=(FAST, SLOW), **kwargs):
+    kwargs.setdefault("state_path", None)
+    kwargs.setdefault("policy", NO_EXPLORATION)
+    return AsyncModelRouter(llm, list(models), **kwargs)
+
+
+def test_routes_to_fastest_model_after_trying_each():
+    llm = _FakeLLM({FAST: 0.001, SLOW: 0.05})
+    router = _router(llm)
+
+    async def run():
+        for _ in range(5):
+            await router.chat(messages=MESSAGES)
+
+    asyncio.run(run())
+
+    assert set(llm.calls[:2]) == {FAST, SLOW}  # unmeasured models are tried first
+    assert llm.calls[2:] == [FAST] * 3
+    stats = router.stats()
+    assert stats[FAST.value].ewma_latency < stats[SLOW.value].ewma_latency
+    assert stats[FAST.value].requests == 4
+
+
+def test_failures_push_a_model_down_the_ranking():
+    llm = _FakeLLM({FAST: 0.001, FLAKY: 0.001}, failing={FLAKY})
+    router = _router(llm, models=(FAST, FLAKY))
+
+    async def run():
+        for _ in range(4):
+            try:
+                await router.chat(messages=MESSAGES)
+            except OpenGradientError:
+                pass
+
+    asyncio.run(run())
+
+    assert llm.calls.count(FLAKY) == 1
+    assert router.ranking() == [FAST, FLAKY]
+    assert router.stats()[FLAKY.value].failures == 1
+
+
+def test_stats_persist_across_routers(tmp_path):
+    state_path = tmp_path / "router.json"
+    llm = _FakeLLM({FAST: 0.001, SLOW: 0.05})
+    first = _router(llm, state_path=state_path)
+
+    async def run():
+        for _ in range(3):
+            await first.chat(messages=MESSAGES)
+
+    asyncio.run(run())
+    first.save()
+
+    restored = _router(llm, state_path=state_path)
+    assert restored.ranking() == [FAST, SLOW]
+    assert restored.stats()[FAST.value].requests == first.stats()[FAST.value].requests
+
+    # Statistics older than max_age are ignored
+    time.sleep(0.01)
+    stale = _router(llm, state_path=state_path, policy=RouterPolicy(exploration=0.0, max_age=0.001))
+    assert stale.stats()[FAST.value].requests == 0
+
+
+def test_save_keeps_other_routers_models(tmp_path):
+    state_path = tmp_path / "router.json"
+    state_path.write_text(json.dumps({"version": 1, "models": {"x-ai/grok-4": {"requests": 7, "updated_at": time.time()}}}))
+    router = _router(_FakeLLM({FAST: 0.001, SLOW: 0.001}), state_path=state_path)
+
+    asyncio.run(router.chat(messages=MESSAGES))
+
+    models = json.loads(state_path.read_text())["models"]
+    assert models["x-ai/grok-4"]["requests"] == 7
+    assert sum(record["requests"] for name, record in models.items() if name != "x-ai/grok-4") == 1
+
+
+def test_autosave_is_debounced_and_runs_off_the_event_loop(tmp_path, monkeypatch):
+    router = _router(_FakeLLM({FAST: 0.001, SLOW: 0.001}), state_path=tmp_path / "router.json")
+    saves = []
+    original_save = router._scores.save
+
+    def save(*args, **kwargs):
+        saves.append(threading.get_ident())
+        original_save(*args, **kwargs)
+
+    monkeypatch.setattr(router._scores, "save", save)
+
+    async def run():
+        for _ in range(5):
+            await router.chat(messages=MESSAGES)
+        await router._scores._save_task
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert len(saves) == 1  # the default save_interval covers the later requests
+    assert saves[0] != loop_thread
+    assert (tmp_path / "router.json").exists()
+
+
+def test_race_keeps_first_answer_and_cancels_loser():
+    llm = _FakeLLM({FAST: 0.001, SLOW: 0.5})
+    router = _router(llm)
+
+    started = time.monotonic()
+    output = asyncio.run(router.chat(messages=MESSAGES, race=True))
+
+    assert output.chat_output["content"] == FAST.value
+    assert time.monotonic() - started < 0.4
+    assert llm.cancelled == [SLOW]
+    assert router.stats()[SLOW.value].requests == 0  # the loser is not counted as a failure
+
+
+def test_race_falls_back_when_the_faster_model_fails():
+    llm = _FakeLLM({FLAKY: 0.001, SLOW: 0.02}, failing={FLAKY})
+    router = _router(llm, models=(FLAKY, SLOW))
+
+    output = asyncio.run(router.chat(messages=MESSAGES, race=True))
+
+    assert output.chat_output["content"] == SLOW.value
+    assert router.stats()[FLAKY.value].failures == 1
+
+
+def test_race_streams_closes_losing_stream():
+    llm = _FakeLLM({FAST: 0.001, SLOW: 0.5})
+    router = _router(llm)
+
+    async def run():
+        stream = await router.chat(messages=MESSAGES, stream=True, race=True)
+        return [chunk async for chunk in stream]
+
+    chunks = asyncio.run(run())
+
+    assert {chunk.model for chunk in chunks} == {FAST.value}
+    assert "".join(chunk.choices[0].delta.content for chunk in chunks) == "ab"
+    assert sorted(llm.closed_streams) == sorted([FAST, SLOW])
+    stats = router.stats()[FAST.value]
+    assert stats.ewma_ttft is not None and stats.ewma_latency >= stats.ewma_ttft
+
+
+class _SlowTeardownLLM(_FakeLLM):
+    """Streams of ``slow_close`` models take a while to shut down once cancelled."""
+
+    def __init__(self, delays, slow_close):
+        super().__init__(delays)
+        self.slow_close = slow_close
+
+    async def _stream(self, model):
+        try:
+            async for chunk in super()._stream(model):
+                yield chunk
+        finally:
+            if model == self.slow_close:
+                await asyncio.sleep(0.3)
+
+
+def test_race_streams_ttft_excludes_loser_teardown():
+    router = _router(_SlowTeardownLLM({FAST: 0.001, SLOW: 5}, slow_close=SLOW))
+
+    async def run():
+        stream = await router.chat(messages=MESSAGES, stream=True, race=True)
+        return [chunk async for chunk in stream]
+
+    asyncio.run(run())
+
+    assert router.stats()[FAST.value].ewma_ttft < 0.3
+
+
+def test_race_streams_records_ttft_when_consumer_stops_early():
+    router = _router(_FakeLLM({FAST: 0.001, SLOW: 0.5}))
+
+    async def run():
+        stream = await router.chat(messages=MESSAGES, stream=True, race=True)
+        async for _ in stream:
+            break
+        await stream.aclose()
+
+    asyncio.run(run())
+
+    stats = router.stats()[FAST.value]
+    assert stats.requests == 1 and stats.failures == 0
+    assert stats.ewma_ttft is not None and stats.ewma_latency is None
+
+
+def test_sync_router_against_mock_server(mock_tee_server, tmp_path):
+    llm = LLM(Account.create(), mock_tee_server.url, mock_tee_server.url)
+    router = ModelRouter(llm, [TEE_LLM.GPT_5, TEE_LLM.GPT_5_MINI], state_path=tmp_path / "router.json", policy=NO_EXPLORATION)
+    try:
+        output = router.chat(messages=MESSAGES, max_tokens=3)
+        chunks = list(router.chat(messages=MESSAGES, max_tokens=3, stream=True))
+    finally:
+        llm.close()
+
+    assert output.chat_output["content"] == "the enclave verified "
+    assert "".join(chunk.choices[0].delta.content or "" for chunk in chunks) == "the enclave verified "
+    assert sum(stats.requests for stats in router.stats().values()) == 2
+    # Written by the background save the first request triggered
+    deadline = time.monotonic() + 2
+    while not (tmp_path / "router.json").exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert (tmp_path / "router.json").exists()
+
+
+def test_requires_candidates():
+    with pytest.raises(ValueError):
+        AsyncModelRouter(_FakeLLM({}), [], state_path=None)
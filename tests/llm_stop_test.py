@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+from eth_account import Account
+
+from opengradient.client.llm import LLM, AsyncLLM
+from opengradient.client.llm_stop import (
+    CLIENT_STOP_FINISH_REASON,
+    stop_after_tokens,
+    stop_on_json_complete,
+    stop_on_match,
+    stop_stream,
+)
+from opengradient.types import TEE_LLM, StreamChunk
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def _chunk(text):
+    return StreamChunk.from_sse_data({"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": text}}]})
+
+
+def _feed(condition, pieces):
+    """Return the number of pieces read before ``condition`` fired, or None."""
+    for count, piece in enumerate(pieces, 1):
+        if condition(_chunk(piece)):
+            return count
+    return None
+
+
+def test_stop_on_match_across_deltas():
+    assert _feed(stop_on_match(r"ANSWER: \d+"), ["The ", "ANS", "WER: ", "4", "2 because"]) == 4
+    assert _feed(stop_on_match("never"), ["a", "b"]) is None
+
+
+def test_stop_after_tokens_estimates_from_text_length():
+    assert _feed(stop_after_tokens(2), ["abc", "def", "gh", "ij"]) == 3
+
+
+def test_stop_on_json_complete_ignores_prefix_and_invalid_json():
+    assert _feed(stop_on_json_complete(), ["Here: ", '{"a": ', "[1]}", " trailing"]) == 3
+    assert _feed(stop_on_json_complete(), ["{oops", '"a": 1}']) is None
+
+
+def test_stop_stream_closes_source_before_yielding_trigger():
+    closed = []
+
+    async def source():
+        try:
+            for piece in ["a", "b", "STOP", "c"]:
+                yield _chunk(piece)
+        finally:
+            closed.append(True)
+
+    async def run():
+        seen = []
+        async for chunk in stop_stream(source(), stop_on_match("STOP")):
+            seen.append((chunk.choices[0].delta.content, chunk.choices[0].finish_reason, bool(closed)))
+        return seen
+
+    seen = asyncio.run(run())
+
+    assert seen == [("a", None, False), ("b", None, False), ("STOP", None, True), (None, CLIENT_STOP_FINISH_REASON, True)]
+
+
+def test_async_chat_stops_and_releases_stream(mock_tee_server):
+    mock_tee_server.config.tokens_per_second = 50
+    reported = []
+    llm = AsyncLLM(Account.create(), mock_tee_server.url, mock_tee_server.url, metrics_callback=reported.append)
+
+    async def run():
+        async with llm:
+            stream = await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES, stream=True, stop_when=stop_on_match("verified"))
+            chunks = [chunk async for chunk in stream]
+            return chunks, llm.pool_stats()["stream"]
+
+    started = time.monotonic()
+    chunks, pool = asyncio.run(run())
+
+    assert time.monotonic() - started < 15 / 50  # well before the 16 tokens would have streamed
+    assert "".join(chunk.choices[0].delta.content or "" for chunk in chunks) == "the enclave verified "
+    assert chunks[-1].is_final and chunks[-1].choices[0].finish_reason == CLIENT_STOP_FINISH_REASON
+    assert pool.active_connections == 0
+    assert len(reported) == 1 and not reported[0].complete and reported[0].chunks == 3
+
+    deadline = time.monotonic() + 2
+    while mock_tee_server.stats.abandoned_streams == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert mock_tee_server.stats.abandoned_streams == 1
+
+
+def test_sync_completion_stream_with_stop_when(mock_tee_server):
+    llm = LLM(Account.create(), mock_tee_server.url, mock_tee_server.url)
+    try:
+        chunks = list(llm.completion(model=TEE_LLM.GPT_5, prompt="Hi", stream=True, stop_when=stop_after_tokens(2, chars_per_token=4)))
+    finally:
+        llm.close()
+
+    assert [chunk.choices[0].delta.content for chunk in chunks[:-1]] == ["the ", "enclave "]
+    assert chunks[-1].choices[0].finish_reason == CLIENT_STOP_FINISH_REASON
+
+
+def test_stop_when_requires_streaming():
+    llm = AsyncLLM(Account.create(), "http://127.0.0.1:1", "http://127.0.0.1:1")
+
+    with pytest.raises(ValueError, match="stream=True"):
+        asyncio.run(llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES, stop_when=stop_on_match("x")))
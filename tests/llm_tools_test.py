@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from opengradient.client.exceptions import OpenGradientError
+from opengradient.client.llm_tools import ToolCallAssembler, adispatch_tool_calls, dispatch_tool_calls
+from opengradient.types import StreamAccumulator, StreamChunk
+
+
+def _tool_chunk(*fragments, finish_reason=None):
+    choice = {"index": 0, "delta": {"tool_calls": list(fragments)}, "finish_reason": finish_reason}
+    return StreamChunk.from_sse_data({"model": "gpt-5", "choices": [choice]})
+
+
+def _fragment(index, arguments, name=None, call_id=None):
+    fragment = {"index": index, "function": {"arguments": arguments}}
+    if name:
+        fragment["id"] = call_id or f"call_{index}"
+        fragment["function"]["name"] = name
+    return fragment
+
+
+def _two_call_stream():
+    """Two parallel calls whose argument fragments interleave; the weather call completes first."""
+    return [
+        _tool_chunk(_fragment(0, "", name="get_weather")),
+        _tool_chunk(_fragment(0, '{"city": "Pa')),
+        _tool_chunk(_fragment(1, '{"query": ', name="search")),
+        _tool_chunk(_fragment(0, 'ris"}')),
+        _tool_chunk(_fragment(1, '"flights"}')),
+        _tool_chunk(finish_reason="tool_calls"),
+    ]
+
+
+def test_calls_are_reported_when_their_arguments_close():
+    assembler = ToolCallAssembler()
+
+    reported = [[call.name for call in assembler.add(chunk)] for chunk in _two_call_stream()]
+
+    assert reported == [[], [], [], ["get_weather"], ["search"], []]
+    assert assembler.close() == []
+
+
+def test_completed_call_and_result_match_accumulator():
+    assembler, accumulator = ToolCallAssembler(), StreamAccumulator()
+    calls = []
+    for chunk in _two_call_stream():
+        calls += assembler.add(chunk)
+        accumulator.add(chunk)
+
+    assert calls[0].arguments == {"city": "Paris"}
+    assert calls[0].id == "call_0"
+    assert [call.to_dict() for call in calls] == accumulator.result().chat_output["tool_calls"]
+    assert assembler.result().chat_output == accumulator.result().chat_output
+
+
+def test_whole_calls_without_index_and_empty_arguments():
+    seen = []
+    assembler = ToolCallAssembler(on_call=seen.append)
+
+    assembler.add(_tool_chunk({"id": "a", "function": {"name": "now", "arguments": ""}}))
+    assembler.add(_tool_chunk({"id": "b", "function": {"name": "echo", "arguments": '{"text": "hi"}'}}))
+
+    assert [call.name for call in seen] == ["echo"]
+    assert [(call.name, call.arguments) for call in assembler.close()] == [("now", {})]
+    assert [call.index for call in seen] == [1, 0]
+
+
+def test_truncated_arguments_raise_on_close():
+    assembler = ToolCallAssembler()
+    assembler.add(_tool_chunk(_fragment(0, '{"city": "Pa', name="get_weather")))
+
+    with pytest.raises(json.JSONDecodeError):
+        assembler.close()
+
+
+def test_dispatch_runs_tools_while_stream_continues():
+    started = threading.Event()
+
+    def stream():
+        chunks = _two_call_stream()
+        yield from chunks[:4]
+        # The weather call is complete; its tool must start before the model finishes generating
+        assert started.wait(5)
+        yield from chunks[4:]
+
+    def get_weather(city):
+        started.set()
+        return f"Sunny in {city}"
+
+    def search(query):
+        raise RuntimeError("search is down")
+
+    output, results = dispatch_tool_calls(stream(), {"get_weather": get_weather, "search": search})
+
+    assert output.finish_reason == "tool_calls"
+    assert results[0].ok and results[0].output == "Sunny in Paris"
+    assert isinstance(results[1].error, RuntimeError)
+
+
+def test_dispatch_reports_unknown_tools():
+    _, results = dispatch_tool_calls(iter(_two_call_stream()), {"get_weather": lambda city: city})
+
+    assert results[0].output == "Paris"
+    assert isinstance(results[1].error, OpenGradientError)
+
+
+def test_dispatch_reports_arguments_that_are_not_an_object():
+    chunks = [
+        _tool_chunk(_fragment(0, "[1, 2]", name="get_weather")),
+        _tool_chunk(_fragment(1, '{"query": "flights"}', name="search")),
+        _tool_chunk(finish_reason="tool_calls"),
+    ]
+    tools = {"get_weather": lambda city: city, "search": lambda query: query}
+
+    _, results = dispatch_tool_calls(iter(chunks), tools)
+    _, async_results = asyncio.run(adispatch_tool_calls(_aiter(chunks), tools))
+
+    for result in (results, async_results):
+        assert isinstance(result[0].error, OpenGradientError) and "not a JSON object" in str(result[0].error)
+        assert result[1].output == "flights"
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def test_adispatch_schedules_coroutines_early():
+    async def run():
+        started = asyncio.Event()
+
+        async def stream():
+            chunks = _two_call_stream()
+            for chunk in chunks[:4]:
+                yield chunk
+            await asyncio.wait_for(started.wait(), 5)
+            for chunk in chunks[4:]:
+                yield chunk
+
+        async def get_weather(city):
+            started.set()
+            return f"Sunny in {city}"
+
+        def search(query):
+            return [query]
+
+        return await adispatch_tool_calls(stream(), {"get_weather": get_weather, "search": search})
+
+    output, results = asyncio.run(run())
+
+    assert [result.output for result in results] == ["Sunny in Paris", ["flights"]]
+    assert len(output.chat_output["tool_calls"]) == 2
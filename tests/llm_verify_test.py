@@ -0,0 +1,227 @@
+import asyncio
+import base64
+import hashlib
+
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa, utils
+
+from opengradient.client.exceptions import OpenGradientError, SignatureVerificationError
+from opengradient.client.llm_verify import EnclaveKeyCache, StreamVerifier, averified_stream, verified_stream, verify_output, verify_outputs
+from opengradient.types import StreamChunk, TextGenerationOutput
+
+TIMESTAMP = "2026-01-01T00:00:00Z"
+PARTS = ["The answer", " is", " 42."]
+
+
+@pytest.fixture(scope="module")
+def key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture(scope="module")
+def public_pem(key):
+    return key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+
+
+def _sign(key, text, timestamp=TIMESTAMP):
+    # The payload layout llm_verify assumes; these tests show self-consistency, not agreement with real enclaves
+    digest = hashlib.sha256(text.encode() + timestamp.encode()).digest()
+    pss = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+    return key.sign(digest, pss, utils.Prehashed(hashes.SHA256()))
+
+
+def _chunks(signature, parts=PARTS):
+    chunks = [
+        StreamChunk.from_sse_data({"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": part}}]}) for part in parts
+    ]
+    final = {"model": "gpt-5", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "tee_timestamp": TIMESTAMP}
+    if signature is not None:
+        final["tee_signature"] = signature
+    chunks.append(StreamChunk.from_sse_data(final))
+    return chunks
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+class TestOptIn:
+    def test_verification_requires_assuming_the_payload_format(self, key, public_pem):
+        output = TextGenerationOutput(transaction_hash="external", completion_output="Hi", tee_signature="00", tee_timestamp=TIMESTAMP)
+
+        with pytest.raises(OpenGradientError, match="assume_payload_format=True"):
+            StreamVerifier(public_pem)
+        with pytest.raises(OpenGradientError, match="assume_payload_format=True"):
+            verify_output(output, public_pem)
+        with pytest.raises(OpenGradientError, match="assume_payload_format=True"):
+            list(verified_stream(_chunks(_sign(key, "".join(PARTS)).hex()), public_pem))
+        with pytest.raises(OpenGradientError, match="assume_payload_format=True"):
+            verify_outputs([output], public_pem, processes=1)
+
+
+class TestStreamVerifier:
+    def test_valid_stream(self, key, public_pem):
+        verifier = StreamVerifier(public_pem, assume_payload_format=True)
+        for chunk in _chunks(_sign(key, "".join(PARTS)).hex()):
+            verifier.add(chunk)
+
+        assert verifier.verify()
+        assert verifier.tee_timestamp == TIMESTAMP
+
+    def test_tampered_stream(self, key, public_pem):
+        verifier = StreamVerifier(public_pem, assume_payload_format=True)
+        for chunk in _chunks(_sign(key, "".join(PARTS)).hex(), parts=["The answer", " is", " 43."]):
+            verifier.add(chunk)
+
+        assert not verifier.verify()
+
+    def test_missing_or_malformed_signature(self, public_pem):
+        verifier = StreamVerifier(public_pem, assume_payload_format=True)
+        for chunk in _chunks(None):
+            verifier.add(chunk)
+        assert not verifier.verify()
+
+        verifier.tee_signature = "not a signature!"
+        assert not verifier.verify()
+
+    def test_averify(self, key, public_pem):
+        verifier = StreamVerifier(key.public_key(), assume_payload_format=True)
+        for chunk in _chunks(base64.b64encode(_sign(key, "".join(PARTS))).decode()):
+            verifier.add(chunk)
+
+        assert asyncio.run(verifier.averify())
+
+    def test_rejects_non_rsa_key(self):
+        from cryptography.hazmat.primitives.asymmetric import ec
+
+        with pytest.raises(ValueError, match="RSA"):
+            StreamVerifier(ec.generate_private_key(ec.SECP256R1()).public_key(), assume_payload_format=True)
+
+
+class TestVerifyOutput:
+    def test_chat_output(self, key, public_pem):
+        output = TextGenerationOutput(
+            transaction_hash="external",
+            chat_output={"role": "assistant", "content": "Hello"},
+            tee_signature="0x" + _sign(key, "Hello").hex(),
+            tee_timestamp=TIMESTAMP,
+        )
+        assert verify_output(output, public_pem, assume_payload_format=True)
+
+        output.chat_output["content"] = "Hello!"
+        assert not verify_output(output, public_pem, assume_payload_format=True)
+
+    def test_completion_output(self, key, public_pem):
+        output = TextGenerationOutput(
+            transaction_hash="external",
+            completion_output="Hello",
+            tee_signature=base64.urlsafe_b64encode(_sign(key, "Hello")).decode().rstrip("="),
+            tee_timestamp=TIMESTAMP,
+        )
+        assert verify_output(output, public_pem, assume_payload_format=True)
+        assert not verify_output(TextGenerationOutput(transaction_hash="external", completion_output="Hello"), public_pem, assume_payload_format=True)
+
+
+class TestVerifiedStream:
+    def test_passes_chunks_through(self, key, public_pem):
+        chunks = _chunks(_sign(key, "".join(PARTS)).hex())
+        assert list(verified_stream(chunks, public_pem, assume_payload_format=True)) == chunks
+
+    def test_raises_before_yielding_bad_final_chunk(self, key, public_pem):
+        seen = []
+        with pytest.raises(SignatureVerificationError, match="does not match"):
+            for chunk in verified_stream(_chunks(_sign(key, "something else").hex()), public_pem, assume_payload_format=True):
+                seen.append(chunk)
+        assert len(seen) == len(PARTS)
+
+    def test_raises_without_signature(self, public_pem):
+        with pytest.raises(SignatureVerificationError, match="without a TEE signature"):
+            list(verified_stream(_chunks(None), public_pem, assume_payload_format=True))
+
+    def test_async(self, key, public_pem):
+        async def collect(signature):
+            return [chunk async for chunk in averified_stream(_aiter(_chunks(signature)), public_pem, assume_payload_format=True)]
+
+        assert len(asyncio.run(collect(_sign(key, "".join(PARTS)).hex()))) == len(PARTS) + 1
+        with pytest.raises(SignatureVerificationError):
+            asyncio.run(collect(_sign(key, "tampered").hex()))
+
+
+def _signed_output(key, text):
+    return TextGenerationOutput(
+        transaction_hash="external",
+        completion_output=text,
+        tee_signature=_sign(key, text).hex(),
+        tee_timestamp=TIMESTAMP,
+    )
+
+
+class TestEnclaveKeyCache:
+    def test_fetches_once_and_persists(self, tmp_path, key, public_pem):
+        fetched = []
+
+        def fetch(identity):
+            fetched.append(identity)
+            return public_pem, "attestation-doc"
+
+        cache = EnclaveKeyCache(tmp_path, fetch=fetch)
+        assert cache.get("enclave-1").public_numbers() == key.public_key().public_numbers()
+        cache.get("enclave-1")
+        assert fetched == ["enclave-1"]
+
+        # A new cache over the same directory reads the key from disk
+        reopened = EnclaveKeyCache(tmp_path, fetch=fetch)
+        assert reopened.attestation("enclave-1") == "attestation-doc"
+        assert fetched == ["enclave-1"]
+
+    def test_max_age_refetches(self, tmp_path, public_pem):
+        fetched = []
+        cache = EnclaveKeyCache(tmp_path, fetch=lambda identity: fetched.append(identity) or public_pem, max_age=0)
+        cache.get("enclave-1")
+        cache.get("enclave-1")
+        assert len(fetched) == 2
+
+    def test_miss_without_fetch(self, tmp_path, public_pem):
+        cache = EnclaveKeyCache(tmp_path)
+        with pytest.raises(OpenGradientError, match="enclave-1"):
+            cache.get("enclave-1")
+
+        cache.put("enclave-1", public_pem)
+        assert cache.get("enclave-1") is not None
+        assert cache.attestation("enclave-1") is None
+
+        cache.remove("enclave-1")
+        with pytest.raises(OpenGradientError):
+            cache.get("enclave-1")
+
+
+class TestVerifyOutputs:
+    def test_in_process(self, key, public_pem):
+        outputs = [_signed_output(key, f"answer {i}") for i in range(5)]
+        outputs[2].completion_output = "tampered"
+        outputs[4].tee_signature = None
+
+        report = verify_outputs(outputs, public_pem, processes=1, assume_payload_format=True)
+
+        assert report.results == [True, True, False, True, False]
+        assert report.valid == 3
+        assert report.invalid_indices == [2, 4]
+        assert report.processes == 1
+        assert report.throughput > 0
+
+    def test_process_pool_with_per_output_keys(self, key, public_pem):
+        other = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        outputs = [_signed_output(key if i % 2 else other, f"answer {i}") for i in range(40)]
+        keys = [public_pem if i % 2 else other.public_key() for i in range(40)]
+        keys[3] = other.public_key()  # signed by the other enclave
+
+        report = verify_outputs(outputs, keys, processes=2, chunk_size=8, assume_payload_format=True)
+
+        assert report.processes == 2
+        assert report.invalid_indices == [3]
+
+    def test_key_count_mismatch(self, public_pem):
+        with pytest.raises(ValueError, match="one public key per output"):
+            verify_outputs([TextGenerationOutput(transaction_hash="external")], [public_pem, public_pem], assume_payload_format=True)
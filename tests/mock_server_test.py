@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+from eth_account import Account
+from x402v2.http.utils import decode_payment_required_header
+
+from opengradient.client.exceptions import OpenGradientError
+from opengradient.client.llm import AsyncLLM
+from opengradient.client.llm_retry import RetryPolicy
+from opengradient.client.llm_verify import verify_output
+from opengradient.mock_server import MockServerConfig, MockTEEServer
+from opengradient.types import TEE_LLM
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def _llm(server, **kwargs):
+    return AsyncLLM(Account.create(), server.url, server.url, **kwargs)
+
+
+def test_unpaid_request_gets_x402_challenge(mock_tee_server):
+    response = httpx.post(mock_tee_server.url + "/v1/chat/completions", json={"model": "openai/gpt-5", "messages": MESSAGES})
+
+    assert response.status_code == 402
+    required = decode_payment_required_header(response.headers["PAYMENT-REQUIRED"])
+    assert required.accepts[0].amount == "1000"
+    assert mock_tee_server.stats.challenges == 1
+
+
+def test_chat_and_completion_with_payment(mock_tee_server):
+    llm = _llm(mock_tee_server)
+
+    async def run():
+        async with llm:
+            chat = await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES, max_tokens=4)
+            completion = await llm.completion(model=TEE_LLM.GPT_5, prompt="Hi", max_tokens=3)
+            return chat, completion
+
+    chat, completion = asyncio.run(run())
+
+    assert chat.chat_output["content"] == "the enclave verified this "
+    assert chat.finish_reason == "stop"
+    assert completion.completion_output == "the enclave verified "
+    assert mock_tee_server.stats.payments == 2
+    assert mock_tee_server.stats.challenges == 2  # one per endpoint, then requirements are reused
+
+
+def test_streaming_timing(mock_tee_server):
+    mock_tee_server.config.ttft = 0.1
+    mock_tee_server.config.tokens_per_second = 100
+    llm = _llm(mock_tee_server)
+
+    async def run():
+        async with llm:
+            stream = await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES, stream=True)
+            return [chunk async for chunk in stream]
+
+    chunks = asyncio.run(run())
+
+    assert len("".join(chunk.choices[0].delta.content or "" for chunk in chunks).split()) == 16
+    timing = chunks[-1].timing
+    assert timing.time_to_first_token >= 0.1
+    assert timing.total_duration >= 0.1 + 15 / 100
+    assert chunks[-1].usage.completion_tokens == 16
+    assert mock_tee_server.stats.streams == 1
+
+
+def test_error_injection(mock_tee_server):
+    mock_tee_server.config.error_rate = 1.0
+    mock_tee_server.config.error_status = 400
+    llm = _llm(mock_tee_server, retry_policy=RetryPolicy(max_attempts=2, initial_backoff=0, max_backoff=0))
+
+    async def run():
+        async with llm:
+            await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES)
+
+    with pytest.raises(OpenGradientError, match="400"):
+        asyncio.run(run())
+    assert mock_tee_server.stats.injected_errors == 1
+
+
+def test_prepaid_unsettled_errors_are_retried(mock_tee_server):
+    llm = _llm(mock_tee_server, retry_policy=RetryPolicy(max_attempts=3, initial_backoff=0, max_backoff=0))
+
+    async def run():
+        async with llm:
+            await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES)
+            # Later requests carry a payment from their first attempt
+            mock_tee_server.config.error_rate = 1.0
+            mock_tee_server.config.error_status = 503
+            await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES)
+
+    with pytest.raises(OpenGradientError, match="503"):
+        asyncio.run(run())
+    # The 503s carry no settlement header, so each prepaid attempt is retried with a fresh payment
+    assert mock_tee_server.stats.injected_errors == 3
+    assert mock_tee_server.stats.challenges == 1
+
+
+def test_without_payment_flow():
+    with MockTEEServer(MockServerConfig(price=None)) as server:
+        response = httpx.post(server.url + "/v1/completions", json={"model": "openai/gpt-5", "prompt": "Hi", "max_tokens": 2})
+
+    assert response.status_code == 200
+    assert response.json()["completion"] == "the enclave "
+    assert server.stats.challenges == 0
+
+
+def test_signed_outputs_verify():
+    pytest.importorskip("cryptography")
+    with MockTEEServer(MockServerConfig(sign=True)) as server:
+        llm = _llm(server)
+
+        async def run():
+            async with llm:
+                return await llm.chat(model=TEE_LLM.GPT_5, messages=MESSAGES)
+
+        output = asyncio.run(run())
+
+    assert verify_output(output, server.public_key_pem, assume_payload_format=True)
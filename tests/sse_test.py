@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from opengradient._sse import SSEDecoder, SSEEvent
+from opengradient.types import TextGenerationStream
+
+
+def _decode_all(chunks):
+    decoder = SSEDecoder()
+    events = []
+    for chunk in chunks:
+        events.extend(decoder.feed(chunk))
+    events.extend(decoder.flush())
+    return events
+
+
+def _chunk_payload(content, finish_reason=None):
+    return json.dumps({"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": finish_reason}]})
+
+
+class TestSSEDecoder:
+    def test_single_event(self):
+        """Test a basic data event terminated by a blank line."""
+        events = _decode_all([b"data: hello\n\n"])
+
+        assert events == [SSEEvent(data="hello")]
+
+    @pytest.mark.parametrize("newline", [b"\n", b"\r\n", b"\r"])
+    def test_line_endings(self, newline):
+        """Test that LF, CRLF and CR line endings are all recognised."""
+        body = b"data: a" + newline + newline + b"data: b" + newline + newline
+
+        assert [e.data for e in _decode_all([body])] == ["a", "b"]
+
+    def test_crlf_split_across_chunks(self):
+        """Test that a CR at the end of one chunk and LF at the start of the next form one terminator."""
+        events = _decode_all([b"data: a\r", b"\n\r", b"\ndata: b\r\n\r\n"])
+
+        assert [e.data for e in events] == ["a", "b"]
+
+    def test_cr_terminated_line_followed_by_partial_line(self):
+        """Test that a CR before a partial line does not swallow the LF of a later chunk."""
+        decoder = SSEDecoder()
+
+        assert [e.data for e in decoder.feed(b"data: x\r\rdata: y")] == ["x"]
+        assert [e.data for e in decoder.feed(b"\n\n")] == ["y"]
+        assert decoder.flush() == []
+
+    def test_multiline_data(self):
+        """Test that consecutive data lines are joined with newlines."""
+        events = _decode_all([b"data: first\ndata: second\ndata\n\n"])
+
+        assert events[0].data == "first\nsecond\n"
+
+    def test_event_id_retry_and_comments(self):
+        """Test event/id/retry fields and that comments are ignored."""
+        body = b": keep-alive\nevent: usage\nid: 42\nretry: 1500\ndata:{\"x\": 1}\n\ndata: next\n\n"
+
+        events = _decode_all([body])
+
+        assert events[0] == SSEEvent(data='{"x": 1}', event="usage", id="42", retry=1500)
+        # Last event ID persists, event type and retry reset
+        assert events[1] == SSEEvent(data="next", event="message", id="42", retry=None)
+
+    def test_blank_lines_without_data_do_not_dispatch(self):
+        """Test that empty events and comment-only blocks produce nothing."""
+        assert _decode_all([b"\n\n: ping\n\nevent: x\n\n"]) == []
+
+    def test_byte_by_byte_matches_whole_body(self):
+        """Test that arbitrary chunking does not change the decoded events."""
+        body = "".join(f"data: {_chunk_payload(f'token-{i} é')}\r\n\r\n" for i in range(50)).encode()
+
+        whole = _decode_all([body])
+        split = _decode_all([body[i : i + 1] for i in range(len(body))])
+
+        assert len(whole) == 50
+        assert split == whole
+
+    def test_flush_dispatches_unterminated_event(self):
+        """Test that a final event without a trailing blank line is not lost."""
+        assert [e.data for e in _decode_all([b"data: a\n\ndata: tail"])] == ["a", "tail"]
+
+    def test_buffer_is_compacted(self):
+        """Test that consumed bytes are released from the internal buffer."""
+        decoder = SSEDecoder()
+        for _ in range(1000):
+            decoder.feed(b"data: x\n\n")
+        decoder.feed(b"data: partial")
+
+        assert bytes(decoder._buffer) == b"data: partial"
+
+
+class TestTextGenerationStream:
+    def test_iterates_chunks_until_done(self):
+        """Test that the sync stream parses chunks and stops at [DONE]."""
+        lines = [
+            f"data: {_chunk_payload('Hel')}",
+            "",
+            ": comment",
+            f"data: {_chunk_payload('lo', 'stop')}",
+            "",
+            "data: [DONE]",
+            "",
+            f"data: {_chunk_payload('ignored')}",
+            "",
+        ]
+
+        chunks = list(TextGenerationStream(iter(lines)))
+
+        assert [c.choices[0].delta.content for c in chunks] == ["Hel", "lo"]
+        assert chunks[-1].is_final
+
+    def test_skips_malformed_json(self):
+        """Test that malformed payloads are skipped."""
+        lines = ["data: {not json", "", f"data: {_chunk_payload('ok')}", ""]
+
+        chunks = list(TextGenerationStream(iter(lines)))
+
+        assert [c.choices[0].delta.content for c in chunks] == ["ok"]
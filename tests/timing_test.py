@@ -0,0 +1,252 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+import pytest
+from eth_account import Account
+
+from opengradient.client import _timing
+from opengradient.client._timing import RequestTimer
+from opengradient.client.llm import AsyncLLM
+from opengradient.client.llm_cache import LLMResponseCache
+from opengradient.client.llm_retry import RetryPolicy
+from opengradient.types import INTER_CHUNK_GAP_BUCKETS, StreamChunk, TEE_LLM, TextGenerationOutput
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _chunk(content=None, finish_reason=None, usage=None):
+    data = {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": finish_reason}]}
+    if usage:
+        data["usage"] = usage
+    return StreamChunk.from_sse_data(data)
+
+
+class _Request:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class TestRequestTimer:
+    def test_connect_and_payment_time_from_trace(self):
+        """Test that connection phases and the x402 challenge round trip are measured."""
+        clock = _Clock()
+        with patch.object(_timing.time, "monotonic", clock):
+            timer = RequestTimer("gpt-5", streaming=False)
+
+            async def replay():
+                for delay, event, info in [
+                    (0.0, "connection.connect_tcp.started", {}),
+                    (0.1, "connection.connect_tcp.complete", {}),
+                    (0.0, "connection.start_tls.started", {}),
+                    (0.2, "connection.start_tls.complete", {}),
+                    (0.0, "http11.send_request_headers.started", {"request": _Request([(b"Host", b"tee")])}),
+                    (0.3, "http11.receive_response_headers.complete", {}),
+                    (0.1, "http11.send_request_headers.started", {"request": _Request([(b"PAYMENT-SIGNATURE", b"x")])}),
+                    (0.5, "http11.receive_response_headers.complete", {}),
+                ]:
+                    clock.now += delay
+                    await timer.trace(event, info)
+
+            asyncio.run(replay())
+            clock.now += 0.1
+            timing = timer.finish(completion_tokens=60)
+
+        assert timing.connect_time == pytest.approx(0.3)
+        assert timing.payment_time == pytest.approx(0.4)
+        assert timing.time_to_first_token == pytest.approx(1.2)
+        assert timing.total_duration == pytest.approx(1.3)
+        assert timing.tokens_per_second == pytest.approx(60 / 1.3)
+
+    def test_stream_chunks(self):
+        """Test TTFT, the inter-chunk gap histogram and generation throughput of a stream."""
+        clock = _Clock()
+        with patch.object(_timing.time, "monotonic", clock):
+            timer = RequestTimer("gpt-5", streaming=True)
+            for delay, chunk in [
+                (0.5, _chunk()),  # role-only chunk doesn't count as the first token
+                (0.5, _chunk("a")),
+                (0.003, _chunk("b")),
+                (0.2, _chunk("c")),
+                (3.0, _chunk(finish_reason="stop", usage={"completion_tokens": 32})),
+            ]:
+                clock.now += delay
+                timer.chunk(chunk)
+            timing = timer.finish(completion_tokens=32)
+
+        assert timing.chunks == 5
+        assert timing.time_to_first_token == pytest.approx(1.0)
+        assert sum(timing.inter_chunk_gaps) == 4
+        assert timing.inter_chunk_gaps[0] == 1  # 3 ms
+        assert timing.inter_chunk_gaps[INTER_CHUNK_GAP_BUCKETS.index(0.25)] == 1  # 200 ms
+        assert timing.inter_chunk_gaps[INTER_CHUNK_GAP_BUCKETS.index(0.5)] == 1  # 500 ms
+        assert timing.inter_chunk_gaps[-1] == 1  # 3 s
+        assert timing.max_inter_chunk_gap == pytest.approx(3.0)
+        assert timing.tokens_per_second == pytest.approx(32 / 3.203)
+
+    def test_finish_stamps_duration_once(self):
+        """Test that a later usage chunk adds tokens without moving the total duration."""
+        clock = _Clock()
+        with patch.object(_timing.time, "monotonic", clock):
+            timer = RequestTimer("gpt-5", streaming=False)
+            clock.now += 2.0
+            timing = timer.finish()
+            clock.now += 1.0
+            assert timer.finish(completion_tokens=10) is timing
+
+        assert timing.total_duration == pytest.approx(2.0)
+        assert timing.tokens_per_second == pytest.approx(5.0)
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps(
+            {
+                "choices": [{"message": {"role": "assistant", "content": "hi"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 12, "total_tokens": 17},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def chat_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class TestLLMTiming:
+    def test_non_streaming_output_has_timing(self, chat_server):
+        """Test that a real round trip reports connect time, TTFT and throughput."""
+        reported = []
+        llm = AsyncLLM(Account.create(), chat_server, chat_server, metrics_callback=reported.append)
+
+        async def run():
+            async with llm:
+                first = await llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}])
+                second = await llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}])
+                return first, second
+
+        first, second = asyncio.run(run())
+
+        timing = first.timing
+        assert timing.model == "gpt-5" and not timing.streaming
+        assert timing.connect_time > 0
+        assert second.timing.connect_time == 0  # pooled connection reused
+        assert 0 < timing.time_to_first_token <= timing.total_duration
+        assert timing.completion_tokens == 12
+        assert timing.tokens_per_second == pytest.approx(12 / timing.total_duration)
+        assert reported == [first.timing, second.timing]
+
+    def test_stream_final_chunk_has_timing(self):
+        """Test that the final chunk carries timing and the callback fires once at the end."""
+        body = (
+            b'data: {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": "Hel"}}]}\n\n'
+            b'data: {"model": "gpt-5", "choices": [{"index": 0, "delta": {"content": "lo"}}]}\n\n'
+            b'data: {"model": "gpt-5", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": {"completion_tokens": 2}}\n\n'
+            b"data: [DONE]\n\n"
+        )
+        reported = []
+        llm = AsyncLLM(Account.create(), "http://tee.test", "http://tee.test", metrics_callback=reported.append)
+
+        def handler(request):
+            return httpx.Response(200, stream=httpx.ByteStream(body))
+
+        async def run(consume_all):
+            with patch.object(llm, "_build_http_client", lambda transport: httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+                stream = await llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}], stream=True)
+                chunks = []
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    if not consume_all:
+                        break
+                await stream.aclose()
+                await llm._close_http_clients()
+                return chunks
+
+        chunks = asyncio.run(run(consume_all=True))
+
+        assert [c.timing is not None for c in chunks] == [False, False, True]
+        timing = chunks[-1].timing
+        assert timing.streaming and timing.chunks == 3
+        assert timing.completion_tokens == 2
+        assert sum(timing.inter_chunk_gaps) == 2
+        assert reported == [timing]
+
+        chunks = asyncio.run(run(consume_all=False))
+        assert len(reported) == 2
+        assert reported[1].chunks == 1 and not reported[1].complete
+        assert timing.complete
+
+    def test_retried_request_reports_only_the_successful_attempt(self):
+        """Test that a failed attempt's time is not counted in the reported timing."""
+        reported, attempts = [], []
+        llm = AsyncLLM(
+            Account.create(), "http://tee.test", "http://tee.test", retry_policy=RetryPolicy(initial_backoff=0.01), metrics_callback=reported.append
+        )
+
+        async def handler(request):
+            attempts.append(request)
+            if len(attempts) == 1:
+                await asyncio.sleep(0.3)
+                return httpx.Response(503)
+            return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": "hi"}, "finish_reason": "stop"}]})
+
+        async def run():
+            with patch.object(llm, "_build_http_client", lambda transport: httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+                output = await llm.chat(model=TEE_LLM.GPT_5, messages=[{"role": "user", "content": "Hi"}])
+                await llm._close_http_clients()
+                return output
+
+        output = asyncio.run(run())
+
+        assert len(attempts) == 2
+        assert output.timing.total_duration < 0.3
+        assert reported == [output.timing]
+
+    def test_failing_callback_does_not_fail_request(self, chat_server):
+        """Test that an exception in the metrics callback is logged, not raised."""
+
+        def callback(timing):
+            raise RuntimeError("metrics backend down")
+
+        llm = AsyncLLM(Account.create(), chat_server, chat_server, metrics_callback=callback)
+
+        async def run():
+            async with llm:
+                return await llm.completion(model=TEE_LLM.GPT_5, prompt="Hi")
+
+        assert asyncio.run(run()).timing is not None
+
+    def test_cache_drops_timing(self):
+        """Test that cached outputs don't claim the original request's timing."""
+        cache = LLMResponseCache()
+        output = TextGenerationOutput(transaction_hash="external", completion_output="hi")
+        output.timing = RequestTimer("gpt-5", streaming=False).finish()
+
+        cache.put("key", output)
+
+        assert cache.get("key").timing is None
+        assert output.timing is not None
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import ssl
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+from eth_account import Account
+
+from opengradient.client import _tls
+from opengradient.client._tls import TLSPinStore, is_certificate_error
+from opengradient.client.llm import AsyncLLM
+from opengradient.types import TEE_LLM
+
+SERVER_URL = "https://10.0.0.1:8443"
+
+# Self-signed test certificate (CN=tee.test)
+PEM = """-----BEGIN CERTIFICATE-----
+MIIBfTCCASOgAwIBAgIUUl5tFzURYvZHUUPPZj07jniT1l0wCgYIKoZIzj0EAwIw
+EzERMA8GA1UEAwwIdGVlLnRlc3QwIBcNMjYxMDE3MDYwMjMxWhgPMjEyNjA5MjMw
+NjAyMzFaMBMxETAPBgNVBAMMCHRlZS50ZXN0MFkwEwYHKoZIzj0CAQYIKoZIzj0D
+AQcDQgAET+xuIYpZf9h2L2PmbVvpxefuzTA3rBw33+/qnn1a6AK3H2DFnxPknCFT
+Gh94idVrTCoDi4LIsuFjBTJ2Pu3V3KNTMFEwHQYDVR0OBBYEFBq4RUmgae5XA7Qe
+Gia5H1PsMWUJMB8GA1UdIwQYMBaAFBq4RUmgae5XA7QeGia5H1PsMWUJMA8GA1Ud
+EwEB/wQFMAMBAf8wCgYIKoZIzj0EAwIDSAAwRQIgIt5bFiyH7bf+tflT1UCKRdfe
+S04sO/zqrKVQe+PK65wCIQD4CRnwnNn9bWefHV6r4v6QZevYaDo6iLJUfhHwKZr6
+aw==
+-----END CERTIFICATE-----
+"""
+
+
+class _FakeProbe:
+    """Stands in for the network probe, counting calls per (host, port)."""
+
+    def __init__(self, pem=PEM, delay=0.0):
+        self.pem = pem
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, hostname, port):
+        with self._lock:
+            self.calls.append((hostname, port))
+        time.sleep(self.delay)
+        return self.pem
+
+
+class TestTLSPinStore:
+    def test_non_https_is_not_pinned(self):
+        """Test that plain HTTP servers use default verification without probing."""
+        probe = _FakeProbe()
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            assert TLSPinStore(disk_path=None).ssl_context("http://localhost:8000") is True
+        assert probe.calls == []
+
+    def test_pins_in_memory_without_temp_files(self, tmp_path):
+        """Test that the context trusts only the pinned cert and later lookups don't probe."""
+        probe = _FakeProbe()
+        store = TLSPinStore(disk_path=None)
+
+        with patch.object(_tls, "_fetch_server_pem", probe), patch("tempfile.NamedTemporaryFile") as temp_file:
+            ctx = store.ssl_context(SERVER_URL)
+            assert store.ssl_context(SERVER_URL) is ctx
+
+        assert isinstance(ctx, ssl.SSLContext)
+        assert ctx.verify_mode == ssl.CERT_REQUIRED
+        assert len(ctx.get_ca_certs()) == 1
+        assert probe.calls == [("10.0.0.1", 8443)]
+        temp_file.assert_not_called()
+
+    def test_concurrent_lookups_probe_once(self):
+        """Test that concurrent lookups of the same host:port share one probe."""
+        probe = _FakeProbe(delay=0.05)
+        store = TLSPinStore(disk_path=None)
+
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            threads = [threading.Thread(target=store.ssl_context, args=(SERVER_URL + "/v1",)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(probe.calls) == 1
+
+    def test_unreachable_server_is_not_cached(self):
+        """Test that a failed probe falls back to default verification and is retried later."""
+        probe = _FakeProbe(pem=None)
+        store = TLSPinStore(disk_path=None)
+
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            assert store.ssl_context(SERVER_URL) is True
+            assert store.ssl_context(SERVER_URL) is True
+
+        assert len(probe.calls) == 2
+
+    def test_disk_cache_survives_restart(self, tmp_path):
+        """Test that a new store (e.g. a new process) reuses pins written to disk."""
+        path = tmp_path / "pins" / "tls_pins.json"
+        probe = _FakeProbe()
+
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            TLSPinStore(disk_path=path).ssl_context(SERVER_URL)
+            ctx = TLSPinStore(disk_path=path).ssl_context(SERVER_URL)
+
+        assert isinstance(ctx, ssl.SSLContext)
+        assert len(probe.calls) == 1
+        assert json.loads(path.read_text()) == {"10.0.0.1:8443": PEM}
+        assert [p.name for p in path.parent.iterdir()] == ["tls_pins.json"]
+
+    def test_refresh_reprobes(self, tmp_path):
+        """Test that refresh drops the stored pin and fetches the server's cert again."""
+        path = tmp_path / "tls_pins.json"
+        probe = _FakeProbe()
+        store = TLSPinStore(disk_path=path)
+
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            first = store.ssl_context(SERVER_URL)
+            second = store.refresh(SERVER_URL)
+
+        assert second is not first
+        assert len(probe.calls) == 2
+        assert "10.0.0.1:8443" in json.loads(path.read_text())
+
+    def test_is_certificate_error_follows_cause_chain(self):
+        """Test detection of a certificate failure wrapped by httpx."""
+        try:
+            try:
+                raise ssl.SSLCertVerificationError("certificate verify failed")
+            except ssl.SSLError as e:
+                raise httpx.ConnectError("handshake failed") from e
+        except httpx.ConnectError as wrapped:
+            assert is_certificate_error(wrapped)
+
+        assert not is_certificate_error(httpx.ConnectError("connection refused"))
+
+
+class TestLazyPinning:
+    def test_construction_does_not_probe(self):
+        """Test that creating an AsyncLLM does no network I/O."""
+        probe = _FakeProbe()
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            AsyncLLM(Account.create(), SERVER_URL, SERVER_URL, tls_pin_store=TLSPinStore(disk_path=None))
+
+        assert probe.calls == []
+
+    def test_first_request_pins_both_urls(self):
+        """Test that both server URLs are pinned when the HTTP clients are first created."""
+        probe = _FakeProbe()
+        llm = AsyncLLM(Account.create(), SERVER_URL, "https://10.0.0.2", tls_pin_store=TLSPinStore(disk_path=None))
+
+        async def run():
+            await llm._initialize_http_clients()
+            await llm.aclose()
+
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            asyncio.run(run())
+
+        assert sorted(probe.calls) == [("10.0.0.1", 8443), ("10.0.0.2", 443)]
+        assert isinstance(llm._tls_verify, ssl.SSLContext)
+        assert isinstance(llm._streaming_tls_verify, ssl.SSLContext)
+
+    def test_handshake_failure_repins_and_retries(self):
+        """Test that a certificate mismatch re-pins, rebuilds the clients and retries once."""
+        probe = _FakeProbe()
+        llm = AsyncLLM(Account.create(), SERVER_URL, SERVER_URL, tls_pin_store=TLSPinStore(disk_path=None))
+        attempts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            if len(attempts) == 1:
+                try:
+                    raise ssl.SSLCertVerificationError("certificate verify failed")
+                except ssl.SSLError as e:
+                    raise httpx.ConnectError("handshake failed", request=request) from e
+            return httpx.Response(200, json={"completion": "ok"})
+
+        async def run():
+            with patch.object(llm, "_build_http_client", lambda transport: httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+                try:
+                    return await llm.completion(model=TEE_LLM.GPT_5, prompt="Hello")
+                finally:
+                    await llm.aclose()
+
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            result = asyncio.run(run())
+
+        assert result.completion_output == "ok"
+        assert len(attempts) == 2
+        assert len(probe.calls) == 2
+
+    def test_concurrent_handshake_failures_repin_once_without_closing_busy_clients(self):
+        """Test that requests failing together share one re-pin and that the old clients stay open for requests still using them."""
+        probe = _FakeProbe()
+        llm = AsyncLLM(Account.create(), SERVER_URL, SERVER_URL, tls_pin_store=TLSPinStore(disk_path=None))
+        clients = []
+        failing = 4
+
+        in_flight = set()
+
+        async def run():
+            arrived = asyncio.Event()
+            seen = []
+
+            async def handler(request: httpx.Request) -> httpx.Response:
+                prompt = json.loads(request.content)["prompt"]
+                seen.append(prompt)
+                if len(seen) == failing + 1:
+                    arrived.set()
+                await arrived.wait()
+                if prompt == "slow":
+                    # Still in flight on the old client while the others re-pin and send more requests
+                    in_flight.add(prompt)
+                    while llm._pin_generation == 0 or seen.count("p0") < 2:
+                        await asyncio.sleep(0.01)
+                    in_flight.discard(prompt)
+                    return httpx.Response(200, json={"completion": f"old client closed: {clients[0].is_closed}"})
+                if seen.count(prompt) == 1:
+                    try:
+                        raise ssl.SSLCertVerificationError("certificate verify failed")
+                    except ssl.SSLError as e:
+                        raise httpx.ConnectError("handshake failed", request=request) from e
+                return httpx.Response(200, json={"completion": "ok"})
+
+            def build_client(transport):
+                clients.append(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+                return clients[-1]
+
+            # The mock clients bypass the connection pools that report activity
+            busy = patch("opengradient.client.llm._transport_busy", lambda transport: bool(in_flight))
+            with patch.object(llm, "_build_http_client", build_client), busy:
+                try:
+                    prompts = ["slow"] + [f"p{i}" for i in range(failing)]
+                    return await asyncio.gather(*(llm.completion(model=TEE_LLM.GPT_5, prompt=prompt) for prompt in prompts))
+                finally:
+                    await llm.aclose()
+
+        with patch.object(_tls, "_fetch_server_pem", probe):
+            results = asyncio.run(run())
+
+        assert [result.completion_output for result in results] == ["old client closed: False"] + ["ok"] * failing
+        assert len(probe.calls) == 2  # initial pin and a single refresh
+        assert len(clients) == 4  # request and stream clients, built twice
+        assert all(client.is_closed for client in clients)
@@ -0,0 +1,299 @@
+import asyncio
+import inspect
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from x402v2 import x402Client
+from x402v2.http import x402HTTPClient
+from x402v2.http.clients.httpx import PaymentError
+
+from eth_account import Account
+
+from opengradient.client._x402 import PaymentRequirementsCache, PrepaidX402Transport, PresigningPool
+from opengradient.client.exceptions import OpenGradientError
+from opengradient.client.llm import AsyncLLM
+
+
+class _FakeX402Client:
+    def __init__(self):
+        self.signed = []
+
+    async def create_payment_payload(self, payment_required):
+        self.signed.append(payment_required)
+        return payment_required
+
+
+class _FakeHTTPClient:
+    def get_payment_required_response(self, get_header, body):
+        return body["price"]
+
+    def encode_payment_signature_header(self, payload):
+        return {"PAYMENT-SIGNATURE": str(payload)}
+
+
+class _Server:
+    """Charges ``price`` per request and answers 402 unless paid exactly that."""
+
+    def __init__(self, price="1"):
+        self.price = price
+        self.requests = []
+        self.session = None
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.session and request.headers.get("X-Upto-Session") == self.session:
+            return httpx.Response(200, json={"ok": True})
+        if request.headers.get("PAYMENT-SIGNATURE") != self.price:
+            return httpx.Response(402, json={"price": self.price})
+        headers = {"X-Upto-Session": self.session} if self.session else {}
+        return httpx.Response(200, json={"ok": True}, headers=headers)
+
+
+def _make_transport(server, requirements=None, presigner=None):
+    requirements = requirements or PaymentRequirementsCache()
+    transport = PrepaidX402Transport(_FakeX402Client(), requirements, transport=httpx.MockTransport(server), presigner=presigner)
+    transport._http_client = _FakeHTTPClient()
+    return transport, requirements
+
+
+def _post(transport, model="gpt-5", max_tokens=100):
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.post("http://tee.test/v1/chat/completions", json={"model": model, "max_tokens": max_tokens})
+
+    return asyncio.run(run())
+
+
+class TestUpstreamContract:
+    """PrepaidX402Transport relies on private x402v2 members; these tests fail loudly when an upgrade changes them."""
+
+    def test_private_members_exist_with_expected_signatures(self):
+        transport = PrepaidX402Transport(x402Client(), PaymentRequirementsCache(), transport=httpx.MockTransport(_Server()))
+
+        assert isinstance(transport.RETRY_KEY, str) and isinstance(transport.SESSION_HEADER, str)
+        assert list(inspect.signature(transport._get_session).parameters) == ["request"]
+        assert list(inspect.signature(transport._store_session).parameters) == ["request", "session_id"]
+        assert isinstance(transport._http_client, x402HTTPClient)
+        assert list(inspect.signature(transport._http_client.get_payment_required_response).parameters) == ["get_header", "body"]
+        assert list(inspect.signature(transport._http_client.encode_payment_signature_header).parameters) == ["payload"]
+        assert inspect.iscoroutinefunction(transport._client.create_payment_payload)
+        assert isinstance(transport._transport, httpx.MockTransport)
+
+    def test_missing_member_fails_at_construction(self):
+        with patch("opengradient.client._x402._BASE_TRANSPORT_MEMBERS", ("_removed_upstream",)):
+            with pytest.raises(OpenGradientError, match="_removed_upstream"):
+                PrepaidX402Transport(x402Client(), PaymentRequirementsCache(), transport=httpx.MockTransport(_Server()))
+
+
+class TestPrepaidX402Transport:
+    def test_second_request_skips_challenge(self):
+        """Test that cached requirements let the next request go out paid in one round trip."""
+        server = _Server()
+        transport, requirements = _make_transport(server)
+
+        assert _post(transport).status_code == 200
+        assert len(server.requests) == 2
+
+        assert _post(transport).status_code == 200
+        assert len(server.requests) == 3
+        assert server.requests[-1].headers["PAYMENT-SIGNATURE"] == "1"
+        assert requirements.stats.challenges == 1
+        assert requirements.stats.avoided_challenges == 1
+
+    def test_stale_requirements_fall_back_to_challenge(self):
+        """Test that a 402 to a pre-emptive payment re-pays with the fresh requirements."""
+        server = _Server()
+        transport, requirements = _make_transport(server)
+        _post(transport)
+
+        server.price = "2"
+        response = _post(transport)
+
+        assert response.status_code == 200
+        assert [r.headers.get("PAYMENT-SIGNATURE") for r in server.requests[2:]] == ["1", "2"]
+        assert requirements.stats.stale_requirements == 1
+
+        _post(transport)
+        assert requirements.stats.avoided_challenges == 1
+
+    def test_requirements_are_keyed_by_request_shape(self):
+        """Test that a different model or max_tokens goes through its own challenge."""
+        server = _Server()
+        transport, requirements = _make_transport(server)
+
+        _post(transport, model="gpt-5")
+        _post(transport, model="claude-sonnet-4-6")
+        _post(transport, max_tokens=4000)
+
+        assert requirements.stats.challenges == 3
+        assert requirements.stats.avoided_challenges == 0
+
+    def test_requirements_expire(self):
+        """Test that requirements older than the TTL are re-learned."""
+        server = _Server()
+        transport, requirements = _make_transport(server, PaymentRequirementsCache(ttl=0))
+
+        _post(transport)
+        _post(transport)
+
+        assert requirements.stats.challenges == 2
+        assert len(server.requests) == 4
+
+    def test_active_session_is_left_to_base_transport(self):
+        """Test that requests on an upto session carry the session instead of a payment."""
+        server = _Server()
+        server.session = "session-1"
+        transport, requirements = _make_transport(server)
+
+        _post(transport)
+        assert _post(transport).status_code == 200
+
+        assert server.requests[-1].headers["X-Upto-Session"] == "session-1"
+        assert "PAYMENT-SIGNATURE" not in server.requests[-1].headers
+        assert requirements.stats.avoided_challenges == 0
+
+    def test_free_endpoint_is_not_paid(self):
+        """Test that responses other than 402 are returned without payment."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"ok": True})
+
+        transport, requirements = _make_transport(handler)
+        _post(transport)
+
+        assert len(requests) == 1
+        assert requirements.stats.challenges == 0
+
+    def test_unparseable_challenge_raises_payment_error(self):
+        """Test that a 402 without usable requirements surfaces as a payment error."""
+        transport, _ = _make_transport(lambda request: httpx.Response(402, content=b"nope"))
+
+        with pytest.raises(PaymentError, match="Failed to handle payment"):
+            _post(transport)
+
+
+class _NonceX402Client:
+    """Signs payloads that are unique per call, like real EIP-712 authorizations."""
+
+    def __init__(self):
+        self.calls = 0
+        self.threads = set()
+
+    async def create_payment_payload(self, payment_required):
+        self.calls += 1
+        self.threads.add(threading.current_thread().name)
+        return f"{payment_required}#{self.calls}"
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestPresigningPool:
+    def test_buffer_is_filled_after_first_request(self):
+        """Test that a miss is signed on demand and later payments come from the buffer."""
+        client = _NonceX402Client()
+        pool = PresigningPool(client, buffer_size=3)
+        try:
+            first = asyncio.run(pool.take("price-1"))
+            _wait_for(lambda: pool.stats.signed == 4)
+
+            rest = [asyncio.run(pool.take("price-1")) for _ in range(3)]
+        finally:
+            pool.close()
+
+        assert len({first, *rest}) == 4  # every payload is handed out once
+        assert pool.stats.misses == 1
+        assert pool.stats.hits == 3
+        assert pool.stats.hit_rate == 0.75
+        assert pool.stats.mean_signing_time > 0
+        assert all(name.startswith("og-x402-presign") for name in client.threads)
+
+    def test_buffers_are_per_requirements(self):
+        """Test that payloads signed for one price are never used for another."""
+        pool = PresigningPool(_NonceX402Client(), buffer_size=2)
+        try:
+            asyncio.run(pool.take("price-1"))
+            _wait_for(lambda: pool.stats.signed == 3)
+
+            payload = asyncio.run(pool.take("price-2"))
+        finally:
+            pool.close()
+
+        assert payload.startswith("price-2#")
+        assert pool.stats.misses == 2
+
+    def test_old_payloads_are_discarded(self):
+        """Test that payloads past their maximum age are not handed out."""
+        pool = PresigningPool(_NonceX402Client(), buffer_size=2, max_age=0)
+        try:
+            asyncio.run(pool.take("price-1"))
+            _wait_for(lambda: pool.stats.signed == 3)
+            time.sleep(0.01)
+
+            asyncio.run(pool.take("price-1"))
+        finally:
+            pool.close()
+
+        assert pool.stats.hits == 0
+        assert pool.stats.expired == 2
+
+    def test_transport_pays_from_pool(self):
+        """Test that the prepaid transport takes its payloads from the pool."""
+        server = _Server()
+        pool = PresigningPool(_FakeX402Client(), buffer_size=1)
+        transport, _ = _make_transport(server, presigner=pool)
+        try:
+            _post(transport)
+            _wait_for(lambda: pool.stats.signed == 2)
+            assert _post(transport).status_code == 200
+        finally:
+            pool.close()
+
+        assert pool.stats.hits == 1
+
+    def test_requires_prepay(self):
+        with pytest.raises(ValueError):
+            AsyncLLM(Account.create(), "http://tee.test", "http://tee.test", prepay=False, presign_buffer_size=2)
+
+
+class TestPaymentRequirementsCache:
+    def test_key_ignores_query_and_unrelated_fields(self):
+        def request(url, **body):
+            return httpx.Request("POST", url, content=json.dumps(body).encode())
+
+        key = PaymentRequirementsCache.key
+        assert key(request("http://tee.test/v1/chat?x=1", model="a", messages=[1])) == key(
+            request("http://tee.test/v1/chat", model="a", messages=[2])
+        )
+        assert key(request("http://tee.test/v1/chat", model="a")) != key(request("http://tee.test/v1/chat", model="b"))
+
+    def test_key_uses_request_shape_extension_without_parsing_body(self):
+        shape = PaymentRequirementsCache.request_shape({"model": "a", "max_tokens": 5, "messages": []})
+        request = httpx.Request("POST", "http://tee.test/v1/chat", content=b"not json", extensions={PaymentRequirementsCache.EXTENSION: shape})
+
+        with patch("opengradient.client._x402._codec.loads") as loads:
+            key = PaymentRequirementsCache.key(request)
+
+        loads.assert_not_called()
+        assert key == PaymentRequirementsCache.key(httpx.Request("POST", "http://tee.test/v1/chat", json={"model": "a", "max_tokens": 5}))
+
+    def test_key_of_non_json_body(self):
+        request = httpx.Request("POST", "http://tee.test/v1/chat", content=b"\xff not json")
+
+        with patch("opengradient.client._x402._codec.DecodeError", (KeyError,)), patch(
+            "opengradient.client._x402._codec.loads", side_effect=KeyError("decode")
+        ):
+            # A backend whose decode error is not a ValueError
+            key = PaymentRequirementsCache.key(request)
+
+        assert key[2:4] == (None, None)